@@ -0,0 +1,60 @@
+"""
+Scaling benchmark for lending_assistant.detect_external_loans.
+
+Generates a synthetic multi-account corporate debit history (bank EMIs, OD interest, supplier
+payments, payroll, with invoice numbers so descriptions are not all identical) and times the
+detector at growing sizes. Linear scaling shows up as a flat ns/row column.
+
+    python -m benchmarks.bench_detect_external_loans --max-rows 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.lending_assistant import detect_external_loans
+
+_DESCS = np.array([
+    "EMI DEDUCTION ENBD", "LOAN REPAY FAB", "HSBC INSTALLMENT", "MASHREQ OD INTEREST",
+    "Supplier Payment - Imports", "Payroll - WPS", "Utilities DEWA", "Rent - Warehouse",
+    "Customs Duty", "Freight Charges",
+])
+_CPS = np.array(["ENBD", "FAB", "HSBC", "Mashreq", "Sea Bridge Logistics", "WPS", "DEWA", "Landlord"])
+
+def synthetic_debits(n: int, n_invoices: int = 5_000, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    desc = _DESCS[rng.integers(0, len(_DESCS), n)]
+    inv = rng.integers(0, n_invoices, n).astype(str)
+    return pd.DataFrame({
+        "date": pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365, n), "D"),
+        "amount": -np.round(rng.lognormal(10, 1.2, n), 2),
+        "description": pd.Series(desc, dtype=object) + " #" + pd.Series(inv, dtype=object),
+        "counterparty": _CPS[rng.integers(0, len(_CPS), n)],
+    })
+
+def run(sizes, repeat: int = 3):
+    print(f"{'rows':>12} {'best s':>9} {'ns/row':>8} {'lenders':>8}")
+    results = []
+    for n in sizes:
+        tx = synthetic_debits(n)
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            out = detect_external_loans(tx)
+            best = min(best, time.perf_counter() - t0)
+        results.append({"rows": n, "seconds": best, "ns_per_row": best / n * 1e9, "lenders": len(out)})
+        print(f"{n:>12,} {best:>9.3f} {best / n * 1e9:>8.0f} {len(out):>8}")
+        del tx
+    return results
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--max-rows", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= args.max_rows]
+    run(sizes, args.repeat)
+
+if __name__ == "__main__":
+    main()
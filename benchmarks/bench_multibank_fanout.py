@@ -0,0 +1,82 @@
+"""
+Serial vs concurrent multi-bank fetch against the local Nebras stand-in.
+
+Writes synthetic clients with one account at each of several banks, gives every bank a different
+simulated latency, and loads all clients three ways: bank by bank (the old serial loaders), one
+client at a time with its banks fanned out, and in bulk (one accounts call, every bank of every
+client under one concurrency bound).
+
+    python -m benchmarks.bench_multibank_fanout --clients 40 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.multibank import fetch_clients_async
+from modules.nebras_api import AsyncNebrasClient
+from modules.nebras_server import API_PREFIX, NebrasServer
+
+BANK_LATENCY_MS = {"Emirates NBD": 40.0, "First Abu Dhabi Bank": 80.0, "Mashreq": 160.0, "ADCB": 120.0}
+
+def write_clients(data_dir: Path, n_clients: int, rows: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    banks = list(BANK_LATENCY_MS)
+    for c in range(n_clients):
+        cid = f"C{c:04d}"
+        accounts = [{"bank": b, "iban": f"AE{c:08d}{i:012d}", "currency": "AED"} for i, b in enumerate(banks)]
+        recs = [{"date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}", "amount": float(a), "description": "Payment",
+                 "iban": accounts[i % len(accounts)]["iban"], "currency": "AED"}
+                for i, a in enumerate(np.round(rng.normal(0, 50_000, rows), 2))]
+        (data_dir / f"transactions_{cid}.json").write_text(json.dumps(recs), encoding="utf-8")
+        (data_dir / f"account_summary_{cid}.json").write_text(json.dumps({"accounts": accounts}), encoding="utf-8")
+
+async def serial(client, ids):
+    for cid in ids:
+        for a in await client.accounts(cid):
+            await client.account_transactions(a["account_id"])
+
+async def per_client(client, ids, concurrency):
+    for cid in ids:
+        await fetch_clients_async(client, [(cid, None)], max_concurrency=concurrency)
+
+async def run(data_dir: Path, n_clients: int, latency_ms: float, concurrency: int):
+    server = await NebrasServer(data_dir, latency_ms=latency_ms, bank_latency_ms=BANK_LATENCY_MS).start()
+    base_url = f"http://127.0.0.1:{server.port}{API_PREFIX}"
+    ids = [f"C{c:04d}" for c in range(n_clients)]
+    modes = [
+        ("serial", lambda c: serial(c, ids)),
+        ("fan-out per client", lambda c: per_client(c, ids, concurrency)),
+        ("bulk", lambda c: fetch_clients_async(c, [(i, None) for i in ids], max_concurrency=concurrency)),
+    ]
+    print(f"{'mode':<20} {'seconds':>8} {'requests':>9} {'conns':>6}")
+    results = []
+    try:
+        for name, fn in modes:
+            async with AsyncNebrasClient(base_url, max_connections=concurrency) as client:
+                t0 = time.perf_counter()
+                await fn(client)
+                secs = time.perf_counter() - t0
+            results.append({"mode": name, "seconds": secs, **client.stats})
+            print(f"{name:<20} {secs:>8.2f} {client.stats['requests']:>9} {client.stats['connections_opened']:>6}")
+    finally:
+        await server.close()
+    return results
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--clients", type=int, default=40)
+    ap.add_argument("--rows", type=int, default=400)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--concurrency", type=int, default=16)
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_clients(Path(tmp), args.clients, args.rows)
+        asyncio.run(run(Path(tmp), args.clients, args.latency_ms, args.concurrency))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Page size and connection pool benchmark against the local Nebras stand-in.
+
+Writes synthetic transaction histories for a number of clients into a temporary data dir, serves
+them with modules.nebras_server at a fixed simulated latency, and fetches every client's history
+concurrently with AsyncNebrasClient for each (page size, pool size) combination. Reports wall
+time, requests and how many TCP connections were opened (the rest were keep-alive reuses).
+
+    python -m benchmarks.bench_nebras_pagination --clients 50 --rows 5000 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from modules.nebras_api import AsyncNebrasClient
+from modules.nebras_server import API_PREFIX, NebrasServer
+
+def write_clients(data_dir: Path, n_clients: int, rows: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    dates = (np.datetime64("2024-01-01") + np.sort(rng.integers(0, 365, rows))).astype(str).tolist()
+    for c in range(n_clients):
+        amounts = np.round(rng.normal(0, 50_000, rows), 2).tolist()
+        recs = [{"date": d, "amount": a, "description": "Supplier Payment" if a < 0 else "Customer Receipt",
+                 "counterparty": f"CP{i % 97}", "currency": "AED"} for i, (d, a) in enumerate(zip(dates, amounts))]
+        (data_dir / f"transactions_C{c:04d}.json").write_text(json.dumps(recs), encoding="utf-8")
+        (data_dir / f"account_summary_C{c:04d}.json").write_text(
+            json.dumps({"account_holder": f"Client {c}", "accounts": [{"iban": f"AE{c:020d}", "currency": "AED"}]}),
+            encoding="utf-8")
+
+async def fetch_all(base_url: str, n_clients: int, page_size: int, pool: int):
+    async with AsyncNebrasClient(base_url, max_connections=pool) as client:
+        t0 = time.perf_counter()
+        out = await asyncio.gather(*(client.client_transactions(f"C{c:04d}", page_size=page_size) for c in range(n_clients)))
+        return time.perf_counter() - t0, sum(map(len, out)), dict(client.stats)
+
+async def run(data_dir: Path, n_clients: int, latency_ms: float, page_sizes, pools):
+    server = await NebrasServer(data_dir, latency_ms=latency_ms).start()
+    base_url = f"http://127.0.0.1:{server.port}{API_PREFIX}"
+    print(f"{'page':>6} {'pool':>5} {'seconds':>8} {'requests':>9} {'conns':>6} {'rows/s':>10}")
+    results = []
+    try:
+        for page_size in page_sizes:
+            for pool in pools:
+                secs, rows, stats = await fetch_all(base_url, n_clients, page_size, pool)
+                results.append({"page_size": page_size, "pool": pool, "seconds": secs, "rows": rows, **stats})
+                print(f"{page_size:>6} {pool:>5} {secs:>8.2f} {stats['requests']:>9} {stats['connections_opened']:>6} {rows / secs:>10,.0f}")
+    finally:
+        await server.close()
+    return results
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--clients", type=int, default=50)
+    ap.add_argument("--rows", type=int, default=5_000)
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--page-sizes", type=int, nargs="+", default=[100, 500, 1000])
+    ap.add_argument("--pools", type=int, nargs="+", default=[1, 8, 32])
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_clients(Path(tmp), args.clients, args.rows)
+        asyncio.run(run(Path(tmp), args.clients, args.latency_ms, args.page_sizes, args.pools))
+
+if __name__ == "__main__":
+    main()
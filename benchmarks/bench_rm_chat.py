@@ -0,0 +1,58 @@
+"""
+RM Copilot chat under concurrent sessions, against the local OpenAI-compatible stand-in.
+
+Starts the stand-in with a first-token and per-token delay, then fires --sessions chat requests
+at once through one ChatBackend (as that many RMs pressing enter together) and reports time to
+first token, queue wait and how many requests fell back to the canned reply.
+
+    python -m benchmarks.bench_rm_chat --sessions 64 --concurrency 8 --queue 32 --ttft-ms 300 --token-ms 10
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+from benchmarks import synthetic
+from modules.client_registry import ClientRegistry
+from modules.llm_stub import LLMStubServer
+from modules.rm_chat import ChatBackend, client_context, simulate_response
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sessions", type=int, default=64)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--queue", type=int, default=32)
+    ap.add_argument("--ttft-ms", type=float, default=300.0)
+    ap.add_argument("--token-ms", type=float, default=10.0)
+    args = ap.parse_args(argv)
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    server = asyncio.run_coroutine_threadsafe(LLMStubServer(args.ttft_ms, args.token_ms).start(), loop).result()
+    backend = ChatBackend(f"http://127.0.0.1:{server.port}/v1", "local", "rm-copilot-stub", loop,
+                          max_concurrency=args.concurrency, max_queue=args.queue, timeout=120)
+    registry = ClientRegistry(synthetic.clients(args.sessions))
+
+    def session(i):
+        client = registry.record(i)
+        messages = [{"role": "system", "content": client_context(i, client, "Low")},
+                    {"role": "user", "content": "What should I offer?"}]
+        "".join(backend.stream(messages, fallback=lambda: simulate_response(client, "Low")))
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    m = backend.metrics_summary()
+    print(f"{args.sessions} sessions, concurrency {args.concurrency}, queue {args.queue}: {wall:.2f}s wall")
+    print(f"  time to first token p50 {m['ttft_p50_ms'] or 0:.0f} ms, p95 {m['ttft_p95_ms'] or 0:.0f} ms")
+    print(f"  queue wait          p50 {m['queue_wait_p50_ms'] or 0:.0f} ms, p95 {m['queue_wait_p95_ms'] or 0:.0f} ms")
+    print(f"  fallbacks {m['fallbacks']} / {m['requests']}; stand-in served {server.stats['streams']} streams "
+          f"over {server.stats['connections']} connections")
+
+if __name__ == "__main__":
+    main()
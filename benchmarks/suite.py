@@ -0,0 +1,347 @@
+"""
+Benchmark suite for the hot paths of every module, on synthetic data of growing size.
+
+Each case times one core function (best of --repeat runs) at every requested size, writes the
+results as JSON and compares them with a stored baseline: a case is a regression when it is
+more than --tolerance slower than its baseline time (and slower by more than the noise floor).
+
+The baseline is recorded once per case and size. --update-baseline only adds the cases and sizes
+it does not have yet (a new case); existing entries are never overwritten by a plain run, so a
+slowdown cannot be absorbed into the baseline. Re-recording an existing case (its workload
+changed, or the machine did) is an explicit step: --rebaseline CASE ... --reason TEXT, which is
+logged with the old time under "rebaselined" in the baseline file.
+
+    python -m benchmarks.suite                                  # sizes small, medium
+    python -m benchmarks.suite --sizes small medium large --out results.json
+    python -m benchmarks.suite --cases fx_ticks --update-baseline              # add a new case
+    python -m benchmarks.suite --cases fx_ticks --rebaseline fx_ticks --reason "..."
+    python -m benchmarks.suite --fail-on-regression             # exit 1 on regressions (CI)
+
+Sizes (clients / transactions): small 1k / 100k, medium 10k / 1M, large 100k / 10M, xl 100k / 50M.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from modules.aml_monitor import CorridorMonitor, simulate_events
+from modules.anomaly import AnomalyDetector
+from modules.client_registry import ClientRegistry
+from modules.counterparty_graph import CounterpartyGraph
+from modules.customer_index import build_customer_360
+from modules.fx_engine import FXEngine, backtest
+from modules.identity_index import IdentityIndex
+from modules.lending_assistant import assess_obligor, detect_external_loans, monthly_aggregates
+from modules.lending_batch import DEFAULT_POLICIES, DEFAULT_TIER1_CAPITAL
+from modules.nba_rules import CUSTOMER_360_RULES
+from modules.risk_scoring import risk_profile, score_population
+from modules.screening import Screener
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+SIZES = {
+    "small": {"clients": 1_000, "tx": 100_000},
+    "medium": {"clients": 10_000, "tx": 1_000_000},
+    "large": {"clients": 100_000, "tx": 10_000_000},
+    "xl": {"clients": 100_000, "tx": 50_000_000},
+}
+NOISE_FLOOR_S = 0.005
+
+# =========================
+# Cases: setup(size) -> (args, items); run(*args)
+# =========================
+_data = {}
+
+def _dataset(size: str, name: str, make):
+    """Synthetic data shared by the cases of one size."""
+    key = (size, name)
+    if key not in _data:
+        _data[key] = make(SIZES[size])
+    return _data[key]
+
+def _tx(size):
+    return _dataset(size, "tx", lambda s: synthetic.transactions(s["tx"], s["clients"]))
+
+def _snapshots(size):
+    """One cashflow snapshot per obligor; every fifth has a detected external loan."""
+    def make(s):
+        rng = np.random.default_rng(3)
+        n = s["clients"]
+        avg_in = rng.lognormal(14, 1, n)
+        avg_out = avg_in * rng.uniform(0.6, 1.1, n)
+        loan = pd.DataFrame([{"lender": "ENBD", "emi": 120000.0, "estimated_outstanding": 2_400_000.0}])
+        empty = pd.DataFrame(columns=["lender", "emi", "estimated_outstanding"])
+        return [{"avg_in": float(avg_in[i]), "avg_out": float(avg_out[i]), "inflow_vol": float(v), "bounced": int(b),
+                 "loans_df": loan if i % 5 == 0 else empty}
+                for i, (v, b) in enumerate(zip(rng.uniform(0, 0.5, n), rng.integers(0, 3, n)))]
+    return _dataset(size, "snapshots", make)
+
+def _lifestyle(size):
+    def make(s):
+        life = synthetic.lifestyle(s["clients"])
+        banks = synthetic.bank_profile(life).groupby("UAE ID", sort=False)["Bank"].nunique()
+        return life, banks
+    return _dataset(size, "lifestyle", make)
+
+def _registry(size):
+    return _dataset(size, "registry", lambda s: ClientRegistry(synthetic.clients(s["clients"])))
+
+def run_assess(snapshots):
+    return [assess_obligor(snap, DEFAULT_POLICIES, DEFAULT_TIER1_CAPITAL) for snap in snapshots]
+
+def run_c360(life, banks):
+    counts = banks.reindex(life["UAE ID"]).fillna(0).astype(int).to_numpy()
+    return [risk_profile(row, counts[i]) for i, row in enumerate(life.to_dict("records"))]
+
+def run_c360_population(life, banks):
+    return score_population(life, banks.reindex(life["UAE ID"]).fillna(0).to_numpy(dtype=int))
+
+def run_nba(life, banks):
+    return CUSTOMER_360_RULES.book(life, key="UAE ID")
+
+def _c360_index(size):
+    def make(s):
+        life = synthetic.lifestyle(s["clients"])
+        return build_customer_360(synthetic.bank_profile(life), life), life["UAE ID"].tolist()
+    return _dataset(size, "c360_index", make)
+
+def run_c360_lookup(idx, ids):
+    """Every client selected once: core rows, lifestyle record and relationship summary."""
+    for uid in ids:
+        idx["core"].rows(uid)
+        idx["lifestyle"].first(uid)
+        idx["relationships"].rows(uid)
+
+def _identity(size):
+    def make(s):
+        life = synthetic.lifestyle(s["clients"])
+        ident = IdentityIndex({"multi_bank_profile": synthetic.bank_profile(life), "lifestyle": life,
+                               "clients": synthetic.clients(s["clients"])})
+        return ident, life["UAE ID"].tolist() + life["Client Name"].tolist()
+    return _dataset(size, "identity", make)
+
+def run_identity(ident, keys):
+    """Resolve every client by UAE ID and by name, then fetch its rows from two sources."""
+    for key in keys:
+        cid = ident.resolve(key)
+        ident.rows("multi_bank_profile", cid)
+        ident.first("clients", cid)
+
+SCREEN_QUERIES = 1_000
+
+def _screener(size):
+    def make(s):
+        n = s["clients"]
+        names = synthetic.lifestyle(n)["Client Name"]
+        watchlist = pd.DataFrame({"entry_id": [f"W{i}" for i in range(n)], "name": names, "list": "PEP"})
+        queries = synthetic.clients(SCREEN_QUERIES, seed=3)
+        return Screener(watchlist), [c["name"] for c in queries]
+    return _dataset(size, "screener", make)
+
+def run_screening(screener, names):
+    return [screener.screen(name) for name in names]
+
+def run_rm_filter(registry):
+    """One RM Copilot page render per client: find it by name, materialize it, filter the book by its role."""
+    found = 0
+    for name in registry.names:
+        client = registry.record(registry.find(name))
+        found += len(registry.ids_for_role(client["rm_role"])) > 0
+    return found
+
+def _remittances(size):
+    def make(s):
+        names = [c["name"] for c in synthetic.clients(s["clients"])]
+        return simulate_events(s["tx"] // 10, names, start_ts=1.75e9, rate_per_s=2.0)
+    return _dataset(size, "remittances", make)
+
+def run_aml_stream(events):
+    """Feed the events one at a time into a fresh monitor, as from a transaction stream."""
+    monitor = CorridorMonitor()
+    for ts, country, client, amount in zip(events["ts"].tolist(), events["country"].tolist(),
+                                           events["client"].tolist(), events["amount"].tolist()):
+        monitor.update(ts, country, client, amount)
+    return monitor.high_risk_corridors("24h")
+
+def run_anomaly_scoring(events):
+    """Score every event against its account's running statistics, in arrival order."""
+    return AnomalyDetector().score_many(events["account"], events["counterparty"], events["amount"])
+
+def run_counterparty_clusters(events):
+    """Build the sender <-> beneficiary graph and find the senders linked through shared beneficiaries."""
+    graph = CounterpartyGraph().add_transactions(events["client"], events["counterparty"], -events["amount"])
+    return graph.clusters()
+
+FX_DAYS = 3650
+
+def _fx(size):
+    return _dataset(size, "fx", lambda s: synthetic.fx_rates(max(1, s["clients"] // 100), FX_DAYS))
+
+def run_fx_ticks(rates):
+    """Every daily rate of every corridor as a tick, with the recommendation statistics read after each."""
+    engine = FXEngine()
+    dates = rates.index.tolist()
+    for pair in rates.columns:
+        for date, rate in zip(dates, rates[pair].tolist()):
+            engine.tick(pair, date, rate)
+            engine.stats(pair)
+    return engine
+
+def run_fx_backtest(rates):
+    """The monthly timing rule over ten years of every corridor."""
+    return [backtest(rates.index, rates[pair].to_numpy()) for pair in rates.columns]
+
+CASES = {
+    "monthly_aggregates": (lambda size: ((_tx(size),), SIZES[size]["tx"]), monthly_aggregates),
+    "detect_external_loans": (lambda size: ((_tx(size),), SIZES[size]["tx"]), detect_external_loans),
+    "compute_eligibility": (lambda size: ((_snapshots(size),), SIZES[size]["clients"]), run_assess),
+    "customer_360_scoring": (lambda size: (_lifestyle(size), SIZES[size]["clients"]), run_c360),
+    "customer_360_population": (lambda size: (_lifestyle(size), SIZES[size]["clients"]), run_c360_population),
+    "next_best_action_book": (lambda size: (_lifestyle(size), SIZES[size]["clients"]), run_nba),
+    "customer_360_lookup": (lambda size: (_c360_index(size), SIZES[size]["clients"]), run_c360_lookup),
+    "identity_resolve": (lambda size: (_identity(size), 2 * SIZES[size]["clients"]), run_identity),
+    "watchlist_screening": (lambda size: (_screener(size), SCREEN_QUERIES), run_screening),
+    "rm_copilot_filtering": (lambda size: ((_registry(size),), SIZES[size]["clients"]), run_rm_filter),
+    "aml_corridor_stream": (lambda size: ((_remittances(size),), SIZES[size]["tx"] // 10), run_aml_stream),
+    "transaction_anomaly_scoring": (lambda size: ((_remittances(size),), SIZES[size]["tx"] // 10), run_anomaly_scoring),
+    "counterparty_clusters": (lambda size: ((_remittances(size),), SIZES[size]["tx"] // 10), run_counterparty_clusters),
+    "fx_ticks": (lambda size: ((_fx(size),), _fx(size).size), run_fx_ticks),
+    "fx_backtest": (lambda size: ((_fx(size),), _fx(size).size), run_fx_backtest),
+}
+
+# =========================
+# Runner
+# =========================
+def time_case(name: str, size: str, repeat: int) -> dict:
+    setup, fn = CASES[name]
+    args, items = setup(size)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return {"case": name, "size": size, "items": items, "seconds": best, "ns_per_item": best / items * 1e9}
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=BENCH_DIR).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Adds baseline_seconds / ratio / regression to each result; returns the regressions."""
+    base = {(r["case"], r["size"]): r["seconds"] for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get((r["case"], r["size"]))
+        if b is None:
+            continue
+        r["baseline_seconds"] = b
+        r["ratio"] = r["seconds"] / b if b else float("inf")
+        r["regression"] = r["seconds"] > b * (1 + tolerance) and r["seconds"] - b > NOISE_FLOOR_S
+        if r["regression"]:
+            regressions.append(r)
+    return regressions
+
+def update_baseline(baseline: dict, report: dict, rebaseline=(), reason: str = None):
+    """
+    Baseline with the entries it lacks taken from report; entries of the rebaseline cases are
+    replaced and logged. Returns (baseline, added, replaced) as lists of (case, size).
+    """
+    env = report["environment"]
+    baseline = baseline or {"environment": env, "tolerance": report["tolerance"], "results": []}
+    index = {(r["case"], r["size"]): i for i, r in enumerate(baseline["results"])}
+    added, replaced = [], []
+    for r in report["results"]:
+        key = (r["case"], r["size"])
+        entry = {k: r[k] for k in ("case", "size", "items", "seconds", "ns_per_item")}
+        entry["commit"] = env["commit"]
+        if key not in index:
+            index[key] = len(baseline["results"])
+            baseline["results"].append(entry)
+            added.append(key)
+        elif r["case"] in rebaseline:
+            old = baseline["results"][index[key]]
+            baseline["results"][index[key]] = entry
+            baseline.setdefault("rebaselined", []).append({
+                "case": r["case"], "size": r["size"], "commit": env["commit"], "timestamp": env["timestamp"],
+                "previous_seconds": old["seconds"], "seconds": r["seconds"], "reason": reason})
+            replaced.append(key)
+    return baseline, added, replaced
+
+def run(cases, sizes, repeat: int = 3):
+    results = []
+    print(f"{'case':<24} {'size':<7} {'items':>11} {'seconds':>9} {'ns/item':>9}")
+    for size in sizes:
+        for name in cases:
+            r = time_case(name, size, repeat)
+            results.append(r)
+            print(f"{name:<24} {size:<7} {r['items']:>11,} {r['seconds']:>9.3f} {r['ns_per_item']:>9.0f}")
+        _data.clear()
+    return results
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    ap.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", type=Path, default=RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    ap.add_argument("--update-baseline", action="store_true", help="add the cases and sizes the baseline lacks")
+    ap.add_argument("--rebaseline", nargs="+", choices=list(CASES), default=[], metavar="CASE",
+                    help="re-record these existing cases (needs --reason)")
+    ap.add_argument("--reason", help="why the --rebaseline cases are re-recorded (kept in the baseline file)")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args(argv)
+    if args.rebaseline and not args.reason:
+        ap.error("--rebaseline needs --reason")
+    if not set(args.rebaseline) <= set(args.cases):
+        ap.error("--rebaseline cases must be among --cases")
+
+    results = run(args.cases, args.sizes, args.repeat)
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline.exists() else None
+    regressions = []
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['case']} [{r['size']}]: {r['seconds']:.3f}s vs baseline {r['baseline_seconds']:.3f}s "
+                  f"({r['ratio']:.2f}x)")
+        if not regressions:
+            print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    report = {"environment": environment(), "tolerance": args.tolerance, "results": results,
+              "regressions": [(r["case"], r["size"]) for r in regressions]}
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Results -> {args.out}")
+    if args.update_baseline or args.rebaseline:
+        baseline, added, replaced = update_baseline(baseline, report, args.rebaseline, args.reason)
+        args.baseline.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+        print(f"Baseline {args.baseline}: {len(added)} entries added, {len(replaced)} re-recorded"
+              + (f" ({args.reason})" if replaced else ""))
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
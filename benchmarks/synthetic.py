@@ -0,0 +1,177 @@
+"""
+Deterministic synthetic data in the schemas of the data/ fixtures, at any size.
+
+Everything is generated with NumPy from a fixed seed, so the same arguments always give the same
+data. Transactions are produced in chunks (each chunk seeded by its index) and their text columns
+are categoricals over a small vocabulary, so 50M rows stay within a few GB.
+
+    clients(n)                 data/clients.json records (name, income, products, cars, rm_role, ...)
+    lifestyle(n)               the Customer 360 lifestyle table (UAE ID, nationality, property, ...)
+    bank_profile(lifestyle)    data/multi_bank_profile.csv rows, 1-4 banks per client
+    transactions(rows, n)      data/transactions.json rows plus an integer client_id
+    iter_transactions(...)     the same, chunk by chunk
+    fx_rates(n_pairs, days)    daily AED_XXX rates in the data/fx_trends.csv layout (one column per corridor)
+"""
+import numpy as np
+import pandas as pd
+
+FIRST_NAMES = np.array([
+    "Ahmed", "Fatima", "Omar", "Laila", "Salim", "Zara", "Yousef", "Noor", "Khalid", "Dana", "Mohammed",
+    "Aisha", "Rahul", "Priya", "John", "Maria", "Allison", "James", "Hassan", "Mariam", "Ali", "Sara",
+    "Imran", "Ravi", "Anjali", "David", "Emma", "Tariq", "Huda", "Rashid",
+])
+LAST_NAMES = np.array([
+    "Al Mansouri", "Al Fardan", "Khan", "Hassan", "Al Qasimi", "Noor", "Al Shamsi", "Al Mazrouei",
+    "Al Suwaidi", "Hill", "Miller", "Sharma", "Patel", "Smith", "Garcia", "Al Falasi", "Qureshi",
+    "Mansoor", "Nair", "Fernandes", "Al Hashimi", "Rahman", "Thomas", "Al Ketbi", "Iyer",
+])
+SEGMENTS = np.array(["Emerging Affluent", "Mass Affluent", "High Net Worth"])
+RM_ROLES = np.array([
+    "Remittance RM / FX Sales RM", "Retail RM / Community RM", "Bancassurance RM / Insurance Advisor",
+    "Loan Sales RM / Mortgage Specialist", "Private Banker / Wealth RM", "Credit Card RM / Cards Product Manager",
+    "Mass Affluent General RM", "Cards Product Manager", "Priority Banking RM",
+])
+RM_ROLE_WEIGHTS = np.array([15, 9, 9, 9, 7, 5, 3, 2, 1], dtype=float)
+PRODUCTS = np.array(["Investment", "Remittance", "Insurance", "Mortgage", "Savings", "Credit Card"])
+CAR_MODELS = np.array(["BMW 7 Series", "Ferrari", "Range Rover", "Land Cruiser", "Tesla Model S"])
+FUELS = np.array(["Petrol", "Diesel", "EV"])
+BANKS = np.array(["Emirates NBD", "First Abu Dhabi Bank", "Mashreq", "ADCB", "RAKBANK", "HSBC", "Standard Chartered", "DIB"])
+BANK_PRODUCTS = np.array(["Current Account", "Term Loan", "Overdraft", "Credit Card", "Mortgage", "Insurance Plan", "FX Facility"])
+LOCATIONS = np.array(["Dubai Marina", "Sharjah Al Khan", "Business Bay", "Abu Dhabi Saadiyat", "JLT", "Al Barsha", "Khalifa City"])
+CARD_ACTIVITY = np.array(["Air Tickets", "Online Shopping", "Dining", "Travel", "Groceries", "Fuel"])
+
+# (description, counterparty, sign, weight); a few rows carry loan or bounce wording
+TX_KINDS = [
+    ("Customer Receipts", "Top Customers", 1, 20),
+    ("POS Settlement", "Network International", 1, 10),
+    ("Supplier Payment - Imports", "Sea Bridge Logistics", -1, 18),
+    ("Payroll - WPS", "WPS", -1, 8),
+    ("Utilities DEWA", "DEWA", -1, 6),
+    ("Rent - Warehouse", "Landlord", -1, 4),
+    ("Customs Duty", "Dubai Customs", -1, 3),
+    ("Freight Charges", "Aramex", -1, 5),
+    ("EMI DEDUCTION ENBD", "ENBD", -1, 3),
+    ("LOAN REPAY FAB", "FAB", -1, 2),
+    ("MASHREQ OD INTEREST", "Mashreq", -1, 2),
+    ("HSBC INSTALLMENT", "HSBC", -1, 1),
+    ("CHEQUE RETURN - INSUFFICIENT FUNDS", "Clearing", -1, 1),
+]
+_TX_DESC = np.array([k[0] for k in TX_KINDS])
+_TX_CP = np.array([k[1] for k in TX_KINDS])
+_TX_SIGN = np.array([k[2] for k in TX_KINDS], dtype=float)
+_TX_P = np.array([k[3] for k in TX_KINDS], dtype=float) / sum(k[3] for k in TX_KINDS)
+
+def _names(n: int) -> np.ndarray:
+    """Unique "First Last" names; a numeric suffix is added once the combinations run out."""
+    i = np.arange(n)
+    f, l = len(FIRST_NAMES), len(LAST_NAMES)
+    base = pd.Series(FIRST_NAMES[i % f]) + " " + pd.Series(LAST_NAMES[(i // f) % l])
+    rnd = i // (f * l)
+    return np.where(rnd > 0, base + " " + pd.Series(rnd).astype(str), base).astype(object)
+
+def uae_ids(n: int, seed: int = 11) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    mid = rng.permutation(10**6)[:n] if n <= 10**6 else np.arange(n) % 10**6
+    s = ("784-" + pd.Series(1950 + rng.integers(0, 60, n)).astype(str) + "-"
+         + pd.Series(mid).astype(str).str.zfill(6) + "-" + pd.Series(np.arange(n) % 10).astype(str))
+    return s.to_numpy(dtype=object)
+
+def clients(n: int, seed: int = 7) -> list:
+    rng = np.random.default_rng(seed)
+    # .tolist() throughout so records hold plain Python values, as json.load would give
+    names = _names(n).tolist()
+    income = rng.integers(10_000, 85_000, n)
+    segment = SEGMENTS[np.digitize(income, [30_000, 60_000])].tolist()
+    roles = RM_ROLES[rng.choice(len(RM_ROLES), n, p=RM_ROLE_WEIGHTS / RM_ROLE_WEIGHTS.sum())].tolist()
+    risk = np.array(["Low", "Moderate", "High"])[rng.integers(0, 3, n)].tolist()
+    income = income.tolist()
+    n_products = rng.integers(1, 4, n)
+    product_idx = np.argsort(rng.random((n, len(PRODUCTS))), axis=1)
+    n_cars = rng.integers(2, 4, n)
+    car_model = CAR_MODELS[rng.integers(0, len(CAR_MODELS), (n, 3))].tolist()
+    car_fuel = FUELS[rng.integers(0, len(FUELS), (n, 3))].tolist()
+    car_year = rng.integers(2015, 2026, (n, 3)).tolist()
+    scores = rng.integers(1, 6, (n, 3)).tolist()
+    return [
+        {
+            "name": names[i],
+            "monthly_income": income[i],
+            "products": PRODUCTS[product_idx[i, :n_products[i]]].tolist(),
+            "segment": segment[i],
+            "risk_score": risk[i],
+            "cars": [{"model": car_model[i][j], "fuel": car_fuel[i][j], "year": car_year[i][j]}
+                     for j in range(n_cars[i])],
+            "risk_breakdown": {"income_score": scores[i][0], "product_mix_score": scores[i][1],
+                               "remittance_behavior_score": scores[i][2]},
+            "rm_role": roles[i],
+        }
+        for i in range(n)
+    ]
+
+def lifestyle(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "UAE ID": uae_ids(n, seed),
+        "Client Name": _names(n),
+        "Nationality": np.where(rng.random(n) < 0.35, "UAE", "Expat"),
+        "Property Location": LOCATIONS[rng.integers(0, len(LOCATIONS), n)],
+        "Property Value": rng.integers(6, 70, n) * 100_000,
+        "Utility Bill": rng.integers(300, 2500, n),
+        "Medical Insurance": np.where(rng.random(n) < 0.4, "None", "Yes"),
+        "Credit Card Activity": CARD_ACTIVITY[rng.integers(0, len(CARD_ACTIVITY), n)],
+    })
+
+def bank_profile(life: pd.DataFrame, seed: int = 7) -> pd.DataFrame:
+    """1-4 banks per client, 1-2 products per bank."""
+    rng = np.random.default_rng(seed)
+    n = len(life)
+    n_banks = rng.integers(1, 5, n)
+    owner = np.repeat(np.arange(n), n_banks)
+    bank = np.argsort(rng.random((n, len(BANKS))), axis=1)[:, :4]
+    bank = bank[owner, np.arange(len(owner)) - np.repeat(np.cumsum(n_banks) - n_banks, n_banks)]
+    n_prod = rng.integers(1, 3, len(owner))
+    row_owner = np.repeat(owner, n_prod)
+    m = len(row_owner)
+    return pd.DataFrame({
+        "UAE ID": life["UAE ID"].to_numpy()[row_owner],
+        "Client Name": life["Client Name"].to_numpy()[row_owner],
+        "Bank": BANKS[np.repeat(bank, n_prod)],
+        "Products Used": BANK_PRODUCTS[rng.integers(0, len(BANK_PRODUCTS), m)],
+        "Primary": rng.random(m) < 0.3,
+        "Avg Balance 6m (AED)": np.round(rng.lognormal(12, 1.2, m), -3),
+        "Loans Outstanding Est (AED)": np.where(rng.random(m) < 0.3, np.round(rng.lognormal(13, 1, m), -3), 0.0),
+    })
+
+def iter_transactions(rows: int, n_clients: int, chunk_rows: int = 5_000_000, seed: int = 7,
+                      start: str = "2023-01-01", days: int = 730):
+    """Yield transaction frames of up to chunk_rows rows; chunk k is generated from (seed, k)."""
+    t0 = np.datetime64(start, "D")
+    for k, lo in enumerate(range(0, rows, chunk_rows)):
+        m = min(chunk_rows, rows - lo)
+        rng = np.random.default_rng([seed, k])
+        kind = rng.choice(len(TX_KINDS), m, p=_TX_P)
+        amount = np.round(_TX_SIGN[kind] * rng.lognormal(9.5, 1.3, m), 2)
+        desc = pd.Categorical.from_codes(kind, categories=_TX_DESC)
+        yield pd.DataFrame({
+            "client_id": rng.integers(0, n_clients, m).astype(np.int32),
+            "date": (t0 + rng.integers(0, days, m).astype("timedelta64[D]")).astype("datetime64[ns]"),
+            "amount": amount,
+            "desc": desc,
+            "description": desc,
+            "counterparty": pd.Categorical.from_codes(kind, categories=_TX_CP),
+            "type": pd.Categorical.from_codes((amount < 0).astype(np.int8), categories=["CREDIT", "DEBIT"]),
+            "currency": pd.Categorical.from_codes(np.zeros(m, dtype=np.int8), categories=["AED"]),
+        })
+
+def transactions(rows: int, n_clients: int = 1, seed: int = 7, chunk_rows: int = 5_000_000) -> pd.DataFrame:
+    chunks = list(iter_transactions(rows, n_clients, chunk_rows, seed))
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+
+def fx_rates(n_pairs: int, days: int = 3650, seed: int = 7, start: str = "2015-01-01") -> pd.DataFrame:
+    """Daily geometric random walks, one AED_XXX column per corridor, indexed by Date."""
+    rng = np.random.default_rng(seed)
+    level = rng.uniform(0.5, 300, n_pairs)
+    steps = rng.normal(0, 0.004, (days, n_pairs))
+    cols = [f"AED_{chr(65 + i // 676 % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}" for i in range(n_pairs)]
+    return pd.DataFrame(level * np.exp(np.cumsum(steps, axis=0)), columns=cols,
+                        index=pd.date_range(start, periods=days, freq="D", name="Date"))
@@ -1,8 +1,62 @@
 import streamlit as st
 import pandas as pd
 
+from modules import anomaly, counterparty_graph
+from modules.aml_monitor import ingest, shared_monitor, simulate_events
+from modules.client_registry import load_client_registry
+
 def run_aml_alerts():
     st.header("🚨 AML & Risk Alert Dashboard")
-    df = pd.read_csv("data/aml_alerts.csv")
-    st.bar_chart(df.set_index("Country"))
-    st.warning("3 high-risk corridors detected. Review recommended before PISP authorization.")
+
+    # Live state of the process-wide corridor monitor (no re-reading of files on rerun)
+    monitor = shared_monitor()
+    window = st.radio("Window", monitor.windows, index=1, horizontal=True)
+    corridors = monitor.corridors(window)
+    high = corridors[corridors["high_risk"]]
+
+    if monitor.now is not None:
+        st.caption(f"{monitor.events:,} events processed · as of "
+                   f"{pd.Timestamp(monitor.now, unit='s', tz='UTC'):%Y-%m-%d %H:%M} UTC")
+
+    if high.empty:
+        st.success(f"No high-risk corridor activity in the last {window}.")
+    else:
+        st.bar_chart(high.set_index("country")["transfers"].rename("High-Risk Transactions"))
+        st.warning(f"{len(high)} high-risk corridors detected in the last {window}. "
+                   "Review recommended before PISP authorization.")
+
+    with st.expander("🌍 All corridors"):
+        st.dataframe(corridors, use_container_width=True)
+    with st.expander("👤 Top clients by volume"):
+        st.dataframe(monitor.clients(window, top=20), use_container_width=True)
+
+    # Each transfer is scored on arrival against its account's running statistics
+    feed = anomaly.shared_detector()
+    with st.expander(f"🧭 Unusual transfers ({feed.detector.flagged:,} of {feed.detector.events:,} flagged)"):
+        alerts = feed.recent_alerts(top=50)
+        if alerts.empty:
+            st.info("No unusual transfers so far.")
+        else:
+            alerts["ts"] = pd.to_datetime(alerts["ts"], unit="s", utc=True)
+            st.dataframe(alerts[["ts", "client", "counterparty", "country", "amount", "score", "reasons"]],
+                         use_container_width=True)
+
+    # Senders linked through beneficiaries they share (busy beneficiaries excluded as hubs)
+    rings = counterparty_graph.shared_remittance_graph().clusters()
+    with st.expander(f"🕸 Shared beneficiaries — possible mule rings ({len(rings)})"):
+        if rings.empty:
+            st.info("No group of senders shares beneficiaries.")
+        else:
+            st.dataframe(rings.assign(clients=rings["clients"].map(", ".join),
+                                      counterparties=rings["counterparties"].map(", ".join)),
+                         use_container_width=True)
+            st.caption(f"Beneficiaries paid by more than {counterparty_graph.HUB_MIN_CLIENTS} senders are "
+                       "treated as hubs and do not link senders.")
+
+    if st.button("▶ Ingest 10,000 simulated events"):
+        start = monitor.now or pd.Timestamp.now(tz="UTC").timestamp()
+        events = simulate_events(10_000, load_client_registry().names, start, rate_per_s=2.0, seed=monitor.events)
+        ingest(events)
+        anomaly.ingest(events)
+        counterparty_graph.ingest(events)
+        st.rerun()
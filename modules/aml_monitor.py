@@ -0,0 +1,271 @@
+"""
+Streaming AML corridor monitor.
+
+Consumes transaction events (time, destination country, client, amount) and keeps, per
+corridor and per client, the number and volume of transfers over sliding windows of 1 hour,
+24 hours and 30 days. Each window is a ring of time buckets stored as [key, bucket] arrays
+(corridors, few keys: 1 minute / 15 minutes / 1 hour buckets; clients, up to millions of keys:
+10 minutes / 1 hour / 1 day); an event adds to one bucket per window and key space, so
+ingestion is O(1) per event. When time moves into a new bucket the expired
+bucket column is zeroed for all keys at once. Window totals are summed over the ring at read
+time, so a window is exact to one bucket width.
+
+Time is event time: "now" is the latest event seen, and events older than a window are simply
+not counted in it. update() takes one event; update_many() takes arrays (a feed batch or a
+replay) and is vectorized. Only updates move the rings forward; corridors() and clients() never
+modify the monitor, so pages can read it while a batch is being ingested.
+
+    monitor = shared_monitor()            # process-wide, replayed from data/remittance_events.csv
+    monitor.corridors("24h")              # country, transfers, volume_aed, high_risk
+    monitor.clients("30d", top=20)
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+EVENTS_PATH = DATA_DIR / "remittance_events.csv"
+
+# name -> (span seconds, number of buckets)
+CORRIDOR_WINDOWS = {
+    "1h": (3_600, 60),
+    "24h": (86_400, 96),
+    "30d": (30 * 86_400, 720),
+}
+CLIENT_WINDOWS = {
+    "1h": (3_600, 6),
+    "24h": (86_400, 24),
+    "30d": (30 * 86_400, 30),
+}
+HIGH_RISK_COUNTRIES = ["Iran", "North Korea", "Russia", "Sudan", "Syria", "Yemen"]
+DEFAULT_CAPACITY = 1024
+
+class KeyIndex:
+    """name <-> dense integer id."""
+    __slots__ = ("ids", "names")
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def id(self, name) -> int:
+        i = self.ids.get(name)
+        if i is None:
+            i = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return i
+
+    def codes(self, values) -> np.ndarray:
+        """Ids of an array of names: one dict lookup per distinct name, new names added in bulk."""
+        values = np.asarray(values)
+        codes, uniques = pd.factorize(values if values.dtype.kind in "iu" else values.astype(object))
+        uniques = uniques.tolist()
+        get = self.ids.get
+        ids = np.fromiter((get(u, -1) for u in uniques), dtype=np.int64, count=len(uniques))
+        new = np.flatnonzero(ids < 0)
+        if len(new):
+            start = len(self.names)
+            fresh = [uniques[i] for i in new]
+            ids[new] = np.arange(start, start + len(new))
+            self.ids.update(zip(fresh, range(start, start + len(new))))
+            self.names.extend(fresh)
+        return ids[codes]
+
+class _Ring:
+    """Count and volume per [key, bucket] for one window; head is the newest absolute bucket."""
+    __slots__ = ("width", "n", "count", "volume", "_count_flat", "_volume_flat", "head")
+
+    def __init__(self, span: int, buckets: int, capacity: int):
+        self.width = span // buckets
+        self.n = buckets
+        self.count = np.zeros((capacity, buckets), dtype=np.int32)
+        self.volume = np.zeros((capacity, buckets), dtype=np.float64)
+        self._views()
+        self.head = None
+
+    def _views(self):
+        self._count_flat = self.count.reshape(-1)
+        self._volume_flat = self.volume.reshape(-1)
+
+    def grow(self, capacity: int):
+        extra = capacity - len(self.count)
+        self.count = np.vstack([self.count, np.zeros((extra, self.n), dtype=self.count.dtype)])
+        self.volume = np.vstack([self.volume, np.zeros((extra, self.n), dtype=self.volume.dtype)])
+        self._views()
+
+    def advance(self, bucket: int):
+        """Move head to bucket, zeroing the buckets that fall out of the window."""
+        if self.head is None:
+            self.head = bucket
+            return
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+        if steps >= self.n:
+            self.count[:] = 0
+            self.volume[:] = 0
+        else:
+            cols = np.arange(self.head + 1, bucket + 1) % self.n
+            self.count[:, cols] = 0
+            self.volume[:, cols] = 0
+        self.head = bucket
+
+    def totals(self, n_keys: int):
+        return self.count[:n_keys].sum(axis=1), self.volume[:n_keys].sum(axis=1)
+
+class CorridorMonitor:
+    def __init__(self, corridor_windows: dict = None, client_windows: dict = None, capacity: int = DEFAULT_CAPACITY,
+                 high_risk=HIGH_RISK_COUNTRIES):
+        corridor_windows = corridor_windows or CORRIDOR_WINDOWS
+        client_windows = client_windows or CLIENT_WINDOWS
+        if set(corridor_windows) != set(client_windows):
+            raise ValueError("corridor and client windows must have the same names")
+        self.windows = list(corridor_windows)
+        self.high_risk = set(high_risk)
+        self.corridor_keys, self.client_keys = KeyIndex(), KeyIndex()
+        self._corridor = {w: _Ring(*corridor_windows[w], 64) for w in self.windows}
+        self._client = {w: _Ring(*client_windows[w], capacity) for w in self.windows}
+        # (ring, 0 for corridor keys / 1 for client keys), for the per-event loop
+        self._rings = [(r, j) for w in self.windows for j, r in enumerate((self._corridor[w], self._client[w]))]
+        self.now = None
+        self.events = 0
+        self.late = 0       # events older than every window when they arrived
+
+    def _ensure(self, rings: dict, n_keys: int):
+        cap = len(next(iter(rings.values())).count)
+        if n_keys > cap:
+            while cap < n_keys:
+                cap *= 2
+            for ring in rings.values():
+                ring.grow(cap)
+
+    def update(self, ts: float, country: str, client: str, amount: float):
+        """Add one event (ts in epoch seconds)."""
+        c = self.corridor_keys.id(country)
+        k = self.client_keys.id(client)
+        self._ensure(self._corridor, c + 1)
+        self._ensure(self._client, k + 1)
+        if self.now is None or ts > self.now:
+            self.now = ts
+        self.events += 1
+        counted = False
+        keys = (c, k)
+        for ring, j in self._rings:
+            bucket = int(ts // ring.width)
+            if ring.head is None or bucket > ring.head:
+                ring.advance(bucket)
+            elif bucket <= ring.head - ring.n:
+                continue
+            counted = True
+            i = keys[j] * ring.n + bucket % ring.n
+            ring._count_flat[i] += 1
+            ring._volume_flat[i] += amount
+        self.late += not counted
+
+    def update_many(self, ts, country, client, amount):
+        """Add a batch of events; arrays of equal length, in any order within the batch."""
+        ts = np.asarray(ts, dtype=np.float64)
+        if not len(ts):
+            return
+        amount = np.asarray(amount, dtype=np.float64)
+        c = self.corridor_keys.codes(country)
+        k = self.client_keys.codes(client)
+        self._ensure(self._corridor, len(self.corridor_keys.names))
+        self._ensure(self._client, len(self.client_keys.names))
+        newest = float(ts.max())
+        self.now = newest if self.now is None else max(self.now, newest)
+        self.events += len(ts)
+        counted = np.zeros(len(ts), dtype=bool)
+        for w in self.windows:
+            for ring, key in ((self._corridor[w], c), (self._client[w], k)):
+                bucket = (ts // ring.width).astype(np.int64)
+                ring.advance(int(bucket.max()))
+                live = bucket > ring.head - ring.n
+                counted |= live
+                flat = key[live] * ring.n + bucket[live] % ring.n
+                np.add.at(ring._count_flat, flat, 1)
+                np.add.at(ring._volume_flat, flat, amount[live])
+        self.late += int((~counted).sum())
+
+    def _table(self, rings: dict, keys: KeyIndex, window: str) -> pd.DataFrame:
+        # read-only: update*() keep every ring's head at the bucket of now. Keys added by a batch
+        # still being ingested may not have rows yet, so only keys with rows are read.
+        ring = rings[window]
+        n = min(len(keys.names), len(ring.count))
+        count, volume = ring.totals(n)
+        return pd.DataFrame({"transfers": count, "volume_aed": volume}, index=pd.Index(keys.names[:n], name="key"))
+
+    def corridors(self, window: str = "24h") -> pd.DataFrame:
+        """Per destination country over the window, busiest first."""
+        df = self._table(self._corridor, self.corridor_keys, window).rename_axis("country").reset_index()
+        df["high_risk"] = df["country"].isin(self.high_risk)
+        return df[df["transfers"] > 0].sort_values(["transfers", "volume_aed"], ascending=False).reset_index(drop=True)
+
+    def clients(self, window: str = "24h", top: int = None) -> pd.DataFrame:
+        """Per client over the window, by volume."""
+        df = self._table(self._client, self.client_keys, window).rename_axis("client").reset_index()
+        df = df[df["transfers"] > 0].sort_values("volume_aed", ascending=False)
+        return (df.head(top) if top else df).reset_index(drop=True)
+
+    def high_risk_corridors(self, window: str = "24h") -> pd.DataFrame:
+        df = self.corridors(window)
+        return df[df["high_risk"]].reset_index(drop=True)
+
+# =========================
+# Events
+# =========================
+DEST_COUNTRIES = ["India", "Pakistan", "Philippines", "Egypt", "UK", "Bangladesh", "Sri Lanka", "Nepal",
+                  "Jordan", "Lebanon", "Russia", "Iran", "Syria", "Yemen", "Sudan", "North Korea"]
+DEST_WEIGHTS = [30, 18, 14, 9, 8, 7, 4, 3, 2, 2, 1.2, 0.6, 0.4, 0.4, 0.3, 0.1]
+
+def simulate_events(n: int, clients, start_ts: float, rate_per_s: float = 1.0, seed: int = 0) -> pd.DataFrame:
+    """
+    n remittance events from start_ts at about rate_per_s: ts (epoch s), client, account,
+    counterparty, country, amount (AED). Deterministic for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    clients = np.asarray(list(clients), dtype=object)
+    who = rng.integers(0, len(clients), n)
+    p = np.array(DEST_WEIGHTS) / sum(DEST_WEIGHTS)
+    country = np.array(DEST_COUNTRIES, dtype=object)[rng.choice(len(DEST_COUNTRIES), n, p=p)]
+    beneficiary = who * 4 + rng.integers(0, 4, n)   # a few regular beneficiaries per client and country
+    return pd.DataFrame({
+        "ts": start_ts + np.cumsum(rng.exponential(1 / rate_per_s, n)),
+        "client": clients[who],
+        "account": pd.Series(who).map(lambda i: f"AE{i:020d}").to_numpy(dtype=object),
+        "counterparty": pd.Series(country).astype(str) + " beneficiary " + pd.Series(beneficiary).astype(str),
+        "country": country,
+        "amount": np.round(rng.lognormal(7.5, 1.0, n), 2),
+    })
+
+def read_events(path: Path = EVENTS_PATH) -> pd.DataFrame:
+    if not path.exists():
+        return pd.DataFrame(columns=["ts", "client", "account", "counterparty", "country", "amount"])
+    df = pd.read_csv(path)
+    df["ts"] = (pd.to_datetime(df["ts"], utc=True) - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)
+    return df
+
+# =========================
+# Shared monitor for the Streamlit modules
+# =========================
+_lock = threading.Lock()
+_shared = {}
+
+def shared_monitor() -> CorridorMonitor:
+    """Process-wide monitor, primed once by replaying data/remittance_events.csv."""
+    with _lock:
+        if "monitor" not in _shared:
+            monitor = CorridorMonitor()
+            events = read_events()
+            monitor.update_many(events["ts"], events["country"], events["client"], events["amount"])
+            _shared["monitor"] = monitor
+        return _shared["monitor"]
+
+def ingest(events: pd.DataFrame, monitor: CorridorMonitor = None):
+    """Feed a batch of events (ts, country, client, amount columns) into the monitor."""
+    monitor = monitor or shared_monitor()
+    with _lock:
+        monitor.update_many(events["ts"], events["country"], events["client"], events["amount"])
+    return monitor
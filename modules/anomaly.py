@@ -0,0 +1,227 @@
+"""
+Online per-account transaction anomaly detection.
+
+Every account keeps constant-size running statistics of its transaction sizes, measured as
+log(1 + |amount|) so that a doubling counts the same at any scale:
+
+- Welford count / mean / M2 over the whole history
+- an exponentially weighted mean and variance (EWMA_ALPHA), for the recent pattern
+- per (account, counterparty) transaction counts, for how usual the counterparty is
+
+A transaction is scored against the state *before* it, then folded in. The score is the larger
+of its upward z-score against the history and against the recent pattern, plus one point when
+the counterparty is new for an account that has at least MIN_HISTORY transactions. Accounts
+with shorter histories are scored 0. Reasons are a uint8 bitmask (see reasons()).
+
+State is held in flat arrays indexed by dense account and pair ids: about 36 bytes per
+account and 4 per account-counterparty pair, plus the key dicts. Arrays grow by doubling.
+score() takes one transaction. score_many() takes arrays and gives the same result as calling
+score() row by row: it works in rounds, where round r holds the r-th transaction of each
+account in the batch, so no account appears twice in a round.
+
+    detector = AnomalyDetector()
+    detector.score_many(tx["account"], tx["counterparty"], tx["amount"])   # DataFrame, one row per tx
+    shared_detector().recent_alerts()                                     # AML dashboard
+    anomaly_signal(tx)                                                     # lending risk signal
+"""
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from modules.aml_monitor import KeyIndex, read_events
+
+EWMA_ALPHA = 0.1
+MIN_HISTORY = 10            # prior transactions before an account is scored
+MIN_STD = 0.1               # floor on the log-amount std (about a 10% change)
+Z_ALERT = 3.0               # z-score that counts as a reason
+NEW_COUNTERPARTY_POINTS = 1.0
+RARE_SHARE = 0.02           # counterparty seen on fewer than this share of the account's transactions
+DEFAULT_THRESHOLD = 4.0
+DEFAULT_CAPACITY = 1024
+ALERT_HISTORY = 500
+
+# (bit, reason)
+REASONS = [
+    (0, "Large versus account history"),
+    (1, "Spike versus recent pattern"),
+    (2, "New counterparty"),
+    (3, "Rarely used counterparty"),
+]
+SCORE_COLUMNS = ["score", "z_history", "z_recent", "counterparty_share", "reasons", "flagged"]
+
+def reasons(mask: int) -> list:
+    """Reason strings for one bitmask, in bit order."""
+    return [text for bit, text in REASONS if int(mask) >> bit & 1]
+
+def _grown(arr: np.ndarray, capacity: int) -> np.ndarray:
+    out = np.zeros(capacity, dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+class AnomalyDetector:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.accounts, self.counterparties, self.pairs = KeyIndex(), KeyIndex(), KeyIndex()
+        self.n = np.zeros(capacity, dtype=np.int32)
+        self.mean = np.zeros(capacity)
+        self.m2 = np.zeros(capacity)
+        self.ew_mean = np.zeros(capacity)
+        self.ew_var = np.zeros(capacity)
+        self.pair_count = np.zeros(capacity, dtype=np.int32)
+        self.events = 0
+        self.flagged = 0
+
+    def _ensure(self):
+        for names, attrs in ((self.accounts.names, ("n", "mean", "m2", "ew_mean", "ew_var")),
+                             (self.pairs.names, ("pair_count",))):
+            cap = len(getattr(self, attrs[0]))
+            if len(names) > cap:
+                while cap < len(names):
+                    cap *= 2
+                for a in attrs:
+                    setattr(self, a, _grown(getattr(self, a), cap))
+
+    def _step(self, a, p, x):
+        """Score x for accounts a / pairs p (ints or arrays with no repeated account) and update."""
+        n = self.n[a]
+        mean, ew = self.mean[a], self.ew_mean[a]
+        scored = n >= MIN_HISTORY
+        std = np.sqrt(self.m2[a] / np.maximum(n - 1, 1))
+        z_hist = np.where(scored, np.maximum(x - mean, 0) / np.maximum(std, MIN_STD), 0.0)
+        z_recent = np.where(scored, np.maximum(x - ew, 0) / np.maximum(np.sqrt(self.ew_var[a]), MIN_STD), 0.0)
+        seen = self.pair_count[p]
+        share = seen / np.maximum(n, 1)
+        new_cp = scored & (seen == 0)
+        score = np.maximum(z_hist, z_recent) + NEW_COUNTERPARTY_POINTS * new_cp
+        mask = ((z_hist >= Z_ALERT) * 1 | (z_recent >= Z_ALERT) * 2 | new_cp * 4
+                | (scored & (seen > 0) & (share < RARE_SHARE)) * 8)
+
+        # Welford
+        n1 = n + 1
+        d = x - mean
+        mean1 = mean + d / n1
+        self.m2[a] += d * (x - mean1)
+        self.mean[a] = mean1
+        self.n[a] = n1
+        # EWMA mean / variance, started at the first observation
+        d = x - ew
+        incr = EWMA_ALPHA * d
+        self.ew_mean[a] = np.where(n == 0, x, ew + incr)
+        self.ew_var[a] = np.where(n == 0, 0.0, (1 - EWMA_ALPHA) * (self.ew_var[a] + d * incr))
+        self.pair_count[p] = seen + 1
+        return score, z_hist, z_recent, share, mask
+
+    def _ids(self, account, counterparty):
+        a = self.accounts.codes(account)
+        c = self.counterparties.codes(counterparty)
+        p = self.pairs.codes(a << 32 | c)
+        self._ensure()
+        return a, p
+
+    def score(self, account, counterparty, amount: float) -> dict:
+        """Score one transaction on arrival, then add it to the account's state."""
+        a = self.accounts.id(account)
+        p = self.pairs.id(a << 32 | self.counterparties.id(counterparty))
+        self._ensure()
+        score, z_hist, z_recent, share, mask = self._step(a, p, np.log1p(abs(amount)))
+        flagged = bool(score >= self.threshold)
+        self.events += 1
+        self.flagged += flagged
+        return {"score": float(score), "z_history": float(z_hist), "z_recent": float(z_recent),
+                "counterparty_share": float(share), "reasons": int(mask), "flagged": flagged}
+
+    def score_many(self, account, counterparty, amount) -> pd.DataFrame:
+        """Score a batch in order (as score() row by row); one row per transaction."""
+        x = np.log1p(np.abs(np.asarray(amount, dtype=np.float64)))
+        out = np.zeros((5, len(x)))
+        if len(x):
+            a, p = self._ids(account, counterparty)
+            rank = pd.Series(a).groupby(a).cumcount().to_numpy()
+            order = np.argsort(rank, kind="stable")
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(rank))])
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                idx = order[lo:hi]
+                out[:, idx] = self._step(a[idx], p[idx], x[idx])
+        df = pd.DataFrame(dict(zip(SCORE_COLUMNS[:-1], out)))
+        df["reasons"] = df["reasons"].astype(np.uint8)
+        df["flagged"] = df["score"] >= self.threshold
+        self.events += len(df)
+        self.flagged += int(df["flagged"].sum())
+        return df
+
+    def profile(self, account) -> dict:
+        """Current running statistics of one account (in log-amount units)."""
+        a = self.accounts.ids.get(account)
+        if a is None:
+            return {"transactions": 0}
+        n = int(self.n[a])
+        return {"transactions": n, "mean": float(self.mean[a]),
+                "std": float(np.sqrt(self.m2[a] / max(n - 1, 1))),
+                "ewma": float(self.ew_mean[a]), "ew_std": float(np.sqrt(self.ew_var[a]))}
+
+    def memory_bytes(self) -> int:
+        return sum(arr.nbytes for arr in (self.n, self.mean, self.m2, self.ew_mean, self.ew_var, self.pair_count))
+
+# =========================
+# Lending risk signal
+# =========================
+def anomaly_signal(tx: pd.DataFrame, months: int = 6, threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """
+    Replay a client's normalized transactions (oldest first) through a fresh detector, credits
+    and debits of each account kept apart. Returns the count of flagged transactions in the
+    last `months` months and the scored rows.
+    """
+    tx = tx[tx["amount"].notna()] if not tx.empty else tx     # amounts with no FX rate are not scored
+    if tx.empty:
+        return {"count": 0, "scored": tx.assign(score=[], reasons=[], flagged=[])}
+    tx = tx.sort_values("date", kind="stable")
+    account = tx["account_id"].astype(str) if "account_id" in tx.columns else pd.Series("", index=tx.index)
+    account = account + np.where(tx["amount"].to_numpy() >= 0, ":in", ":out")
+    scores = AnomalyDetector(threshold=threshold).score_many(account, tx["counterparty"].fillna("").astype(str), tx["amount"])
+    scored = tx.assign(**{c: scores[c].to_numpy() for c in ("score", "reasons", "flagged")})
+    recent = scored["date"] > scored["date"].max() - pd.DateOffset(months=months)
+    return {"count": int((scored["flagged"] & recent).sum()), "scored": scored}
+
+# =========================
+# Shared detector for the Streamlit modules
+# =========================
+class RemittanceAnomalies:
+    """Detector over the remittance feed, keeping the most recent flagged events."""
+    def __init__(self, detector: AnomalyDetector = None):
+        self.detector = detector or AnomalyDetector()
+        self.alerts = deque(maxlen=ALERT_HISTORY)
+
+    def ingest(self, events: pd.DataFrame) -> pd.DataFrame:
+        """Score a batch of events (account, counterparty, amount, ...) in arrival order."""
+        scores = self.detector.score_many(events["account"], events["counterparty"], events["amount"])
+        scored = events.reset_index(drop=True).join(scores)
+        self.alerts.extend(scored[scored["flagged"]].to_dict("records"))
+        return scored
+
+    def recent_alerts(self, top: int = None) -> pd.DataFrame:
+        """Flagged events, newest first, with reasons spelled out."""
+        df = pd.DataFrame(list(self.alerts)[::-1][:top])
+        if df.empty:
+            return df
+        df["reasons"] = df["reasons"].map(lambda m: ", ".join(reasons(m)))
+        return df
+
+_lock = threading.Lock()
+_shared = {}
+
+def shared_detector() -> RemittanceAnomalies:
+    """Process-wide detector, primed once by replaying data/remittance_events.csv."""
+    with _lock:
+        if "detector" not in _shared:
+            feed = RemittanceAnomalies()
+            feed.ingest(read_events().sort_values("ts", kind="stable"))
+            _shared["detector"] = feed
+        return _shared["detector"]
+
+def ingest(events: pd.DataFrame) -> pd.DataFrame:
+    """Score a batch of events with the shared detector."""
+    feed = shared_detector()
+    with _lock:
+        return feed.ingest(events)
@@ -0,0 +1,90 @@
+"""
+CBUAE checklist rule engine.
+
+The checklist's "Automated (Y/N)" column decides which controls are automated; each is keyed by
+its "System Field ID (suggested)". RULES declares, per field ID, the metric conditions that satisfy
+it; compile_checklist() turns every checklist row into a vectorized predicate over a metrics
+table (one row per obligor, columns as produced by lending_assistant.obligor_metrics / the batch
+underwriter), so a whole portfolio is evaluated with a handful of column comparisons.
+
+Conditions are (metric column, operator, threshold); a string threshold is looked up in the
+policy dict (min_dscr, max_inflow_vol, ...). An automated control with no rule in RULES, or whose
+metric column is missing, evaluates to False: the control is automatable but the data to pass it
+is not available yet. Manual ("N") controls evaluate to <NA>.
+"""
+import operator
+
+import pandas as pd
+
+FIELD_COL = "System Field ID (suggested)"
+AUTOMATED_COL = "Automated (Y/N)"
+
+_OPS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+RULES = {
+    "uw.dscr_value": [("dscr_proxy", ">=", "min_dscr"), ("status", "!=", "Decline")],
+    "exp.single_obligor_pct": [("single_obligor_pct", "<=", 25.0)],
+    "ls.ltv_ratio": [("ltv_ratio", "<=", "max_ltv")],
+    "mon.continuous_monitoring": [("n_tx", ">", 0)],
+    "mon.ewi_status": [("bounced_txn_6m", "<=", "max_bounced_txn_6m"),
+                       ("inflow_volatility", "<=", "max_inflow_vol")],
+}
+
+def _compile_rule(conditions):
+    def predicate(metrics: pd.DataFrame, policies: dict) -> pd.Series:
+        ok = pd.Series(True, index=metrics.index)
+        for col, op, threshold in conditions:
+            if isinstance(threshold, str):
+                threshold = policies.get(threshold)
+            if col not in metrics.columns or threshold is None:
+                return pd.Series(False, index=metrics.index)
+            ok &= _OPS[op](metrics[col], threshold).fillna(False).astype(bool)
+        return ok
+    return predicate
+
+def _pending(metrics: pd.DataFrame, policies: dict) -> pd.Series:
+    """Automated control without a rule yet: not passed."""
+    return pd.Series(False, index=metrics.index)
+
+_COMPILED = {fid: _compile_rule(conds) for fid, conds in RULES.items()}
+
+def compile_checklist(chk: pd.DataFrame):
+    """
+    [(field_id, predicate or None)] in checklist order; None marks a manual control. Without an
+    "Automated (Y/N)" column, the controls that have a rule are the automated ones.
+    """
+    fids = chk[FIELD_COL].astype(str) if FIELD_COL in chk.columns else pd.Series([""] * len(chk))
+    if AUTOMATED_COL not in chk.columns:
+        return [(fid, _COMPILED.get(fid)) for fid in fids]
+    automated = chk[AUTOMATED_COL].astype(str).str.strip().str.upper().str.startswith("Y")
+    return [(fid, _COMPILED.get(fid, _pending) if auto else None) for fid, auto in zip(fids, automated)]
+
+def evaluate_checklist(chk: pd.DataFrame, metrics: pd.DataFrame, policies: dict, compiled=None) -> pd.DataFrame:
+    """
+    One row per obligor (metrics index), one column per checklist field ID. Automated controls
+    are True/False, manual ones <NA>.
+    """
+    compiled = compiled if compiled is not None else compile_checklist(chk)
+    cols = {}
+    for fid, predicate in compiled:
+        if predicate is None:
+            cols[fid] = pd.Series(pd.NA, index=metrics.index, dtype="boolean")
+        else:
+            cols[fid] = predicate(metrics, policies).astype("boolean")
+    return pd.DataFrame(cols, index=metrics.index)
+
+def checklist_summary(results: pd.DataFrame) -> pd.DataFrame:
+    """Per obligor: automated controls passed / automated total / manual controls outstanding."""
+    automated = results.notna()
+    return pd.DataFrame({
+        "auto_passed": results.fillna(False).astype(bool).sum(axis=1),
+        "auto_total": automated.sum(axis=1),
+        "manual": (~automated).sum(axis=1),
+    })
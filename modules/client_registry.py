@@ -0,0 +1,147 @@
+"""
+Process-wide registry of the clients.json book.
+
+The book is parsed once per process (again only when the file changes) into read-only
+array-backed columns instead of one nested dict per client: text fields are categorical codes
+over a shared vocabulary, products and cars are flattened arrays with per-client offsets. On top
+of the columns the registry keeps two indexes:
+
+- by_role   rm_role -> sorted client ids (int32)
+- by_name   client name -> id (first client of that name)
+
+Sessions only hold ids; record(i) materializes one client in the clients.json shape when a
+page needs it, so per-session memory does not grow with the book. Ids are positions in the
+file, so anything cached by id must also be keyed by the registry's version (the file's
+mtime and size), which changes when the book is reloaded.
+
+    reg = load_client_registry()
+    ids = reg.ids_for_role("Retail RM / Community RM")
+    client = reg.record(reg.find("Allison Hill"))
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CLIENTS_PATH = Path(__file__).resolve().parent.parent / "data" / "clients.json"
+DEFAULT_ROLE = "General RM"
+BREAKDOWN_KEYS = ("income_score", "product_mix_score", "remittance_behavior_score")
+
+_cache = {}
+
+def _codes(values):
+    """(int32 codes, tuple of categories) of a list of strings, categories in first-seen order."""
+    codes, cats = pd.factorize(pd.Series(values, dtype=object), sort=False)
+    return _frozen(codes.astype(np.int32)), tuple(cats)
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a = np.ascontiguousarray(a)
+    a.setflags(write=False)
+    return a
+
+def _offsets(lengths) -> np.ndarray:
+    return _frozen(np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)]))
+
+class ClientRegistry:
+    __slots__ = ("names", "monthly_income", "segment", "risk_score", "rm_role", "risk_breakdown",
+                 "products", "product_offsets", "car_model", "car_fuel", "car_year", "car_offsets",
+                 "by_role", "by_name", "version", "_vocab")
+
+    def __init__(self, clients: list, version=None):
+        n = len(clients)
+        self.version = version
+        self.names = tuple(c["name"] for c in clients)
+        self.monthly_income = _frozen(np.array([c.get("monthly_income", 0) for c in clients], dtype=np.int64))
+        self._vocab = {}
+        self.segment = self._encode("segment", [c.get("segment", "") for c in clients])
+        self.risk_score = self._encode("risk_score", [c.get("risk_score", "") for c in clients])
+        self.rm_role = self._encode("rm_role", [c.get("rm_role", DEFAULT_ROLE) for c in clients])
+        bd = [c.get("risk_breakdown") for c in clients]
+        # -1 marks a missing score so record() can leave it out, as in the source
+        self.risk_breakdown = _frozen(np.array([[(b or {}).get(k, -1) for k in BREAKDOWN_KEYS] for b in bd],
+                                               dtype=np.int8).reshape(n, len(BREAKDOWN_KEYS)))
+
+        products = [p for c in clients for p in c.get("products", [])]
+        self.products = self._encode("products", products)
+        self.product_offsets = _offsets([len(c.get("products", [])) for c in clients])
+        cars = [car for c in clients for car in c.get("cars", [])]
+        self.car_model = self._encode("car_model", [car["model"] for car in cars])
+        self.car_fuel = self._encode("car_fuel", [car["fuel"] for car in cars])
+        self.car_year = _frozen(np.array([car["year"] for car in cars], dtype=np.int16))
+        self.car_offsets = _offsets([len(c.get("cars", [])) for c in clients])
+
+        roles = self._vocab["rm_role"]
+        order = np.argsort(self.rm_role, kind="stable").astype(np.int32)
+        bounds = np.searchsorted(self.rm_role[order], np.arange(len(roles) + 1))
+        self.by_role = {roles[r]: _frozen(order[bounds[r]:bounds[r + 1]]) for r in range(len(roles))}
+        self.by_name = {}
+        for i, name in enumerate(self.names):
+            self.by_name.setdefault(name, i)
+
+    def _encode(self, field: str, values: list) -> np.ndarray:
+        codes, cats = _codes(values)
+        self._vocab[field] = cats
+        return codes
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def roles(self) -> list:
+        return sorted(self.by_role)
+
+    def ids_for_role(self, role) -> np.ndarray:
+        return self.by_role.get(role, np.zeros(0, dtype=np.int32))
+
+    def find(self, name):
+        """Client id for a name, or None."""
+        return self.by_name.get(name)
+
+    def value(self, field: str, i: int):
+        """One categorical field (segment, risk_score, rm_role) of client i."""
+        return self._vocab[field][getattr(self, field)[i]]
+
+    def record(self, i: int) -> dict:
+        """Client i in the clients.json record shape."""
+        p0, p1 = self.product_offsets[i], self.product_offsets[i + 1]
+        c0, c1 = self.car_offsets[i], self.car_offsets[i + 1]
+        products, models, fuels = self._vocab["products"], self._vocab["car_model"], self._vocab["car_fuel"]
+        return {
+            "name": self.names[i],
+            "monthly_income": int(self.monthly_income[i]),
+            "products": [products[k] for k in self.products[p0:p1]],
+            "segment": self.value("segment", i),
+            "risk_score": self.value("risk_score", i),
+            "cars": [{"model": models[m], "fuel": fuels[f], "year": int(y)}
+                     for m, f, y in zip(self.car_model[c0:c1], self.car_fuel[c0:c1], self.car_year[c0:c1])],
+            "risk_breakdown": {k: int(v) for k, v in zip(BREAKDOWN_KEYS, self.risk_breakdown[i]) if v >= 0},
+            "rm_role": self.value("rm_role", i),
+        }
+
+    def num_products(self) -> np.ndarray:
+        return np.diff(self.product_offsets)
+
+    def owns_any_car(self, models) -> np.ndarray:
+        """Per client: does any of its cars have one of the given models."""
+        models = set(models)
+        wanted = np.isin(self.car_model, [k for k, m in enumerate(self._vocab["car_model"]) if m in models])
+        seen = np.concatenate([[0], np.cumsum(wanted)])
+        return seen[self.car_offsets[1:]] > seen[self.car_offsets[:-1]]
+
+def load_client_registry(path: Path = CLIENTS_PATH) -> ClientRegistry:
+    try:
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        key = None
+    hit = _cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    clients = []
+    if key is not None:
+        with open(path, encoding="utf-8") as f:
+            clients = json.load(f)
+    registry = ClientRegistry(clients, version=key)
+    _cache[path] = (key, registry)
+    return registry
@@ -0,0 +1,101 @@
+"""
+Small memoized computation graph for Streamlit pages.
+
+Streamlit reruns the whole script on every widget change. Registering the expensive steps as
+graph nodes means a rerun only recomputes the nodes whose inputs actually changed:
+
+    g = ComputeGraph()
+    g.add("load", load_fn, params=("client_id",))
+    g.add("clean", clean_fn, deps=("load",))
+    g.run(client_id="C1")        # start a rerun with the current widget values
+    g.get("clean")               # evaluates load -> clean, or returns the memoized values
+
+A node's key is a hash of its own parameter values and the content fingerprints of its
+dependencies' outputs, so an upstream recompute that yields the same data does not invalidate
+anything downstream. Each evaluation is logged as a hit or miss with its duration.
+"""
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+def fingerprint(value) -> str:
+    """Stable content hash for DataFrames, arrays, containers and plain values."""
+    h = hashlib.sha1()
+    _feed(h, value)
+    return h.hexdigest()
+
+def _feed(h, value):
+    if isinstance(value, pd.DataFrame):
+        h.update(repr((list(value.columns), value.shape)).encode())
+        if len(value):
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(repr((value.name, len(value))).encode())
+        if len(value):
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value, key=repr):
+            h.update(repr(k).encode())
+            _feed(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for v in value:
+            _feed(h, v)
+        h.update(b"]")
+    else:
+        h.update(repr(value).encode())
+
+class ComputeGraph:
+    def __init__(self):
+        self._nodes = {}    # name -> (fn, deps, params)
+        self._memo = {}     # name -> (key, value, fingerprint)
+        self._params = {}
+        self._done = set()
+        self.log = []       # [{"node", "status", "ms"}] for the current run
+
+    def add(self, name, fn, deps=(), params=()):
+        """fn(*dep_values, **{p: run-param value for p in params})"""
+        self._nodes[name] = (fn, tuple(deps), tuple(params))
+        self._memo.pop(name, None)
+        return self
+
+    def run(self, **params):
+        """Start a rerun with new parameter values; nodes are evaluated lazily by get()."""
+        self._params = params
+        self._done = set()
+        self.log = []
+        return self
+
+    def get(self, name):
+        return self._evaluate(name)[0]
+
+    def _evaluate(self, name):
+        if name in self._done:
+            _, value, fp = self._memo[name]
+            return value, fp
+        fn, deps, params = self._nodes[name]
+        dep_results = [self._evaluate(d) for d in deps]
+        kwargs = {p: self._params[p] for p in params}
+        key = fingerprint((name, [fp for _, fp in dep_results], kwargs))
+        t0 = time.perf_counter()
+        cached = self._memo.get(name)
+        if cached is not None and cached[0] == key:
+            status, value, fp = "hit", cached[1], cached[2]
+        else:
+            status = "miss"
+            value = fn(*[v for v, _ in dep_results], **kwargs)
+            fp = fingerprint(value)
+            self._memo[name] = (key, value, fp)
+        self.log.append({"node": name, "status": status, "ms": (time.perf_counter() - t0) * 1000})
+        self._done.add(name)
+        return value, fp
+
+    def stats(self) -> pd.DataFrame:
+        return pd.DataFrame(self.log, columns=["node", "status", "ms"])
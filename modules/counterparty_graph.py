@@ -0,0 +1,296 @@
+"""
+Client <-> counterparty transaction graph.
+
+Every (client, counterparty) pair seen in the transactions is one edge carrying its transaction
+count, inflow (counterparty pays the client: a buyer) and outflow (the client pays the
+counterparty: a supplier or beneficiary). Edges live in flat arrays indexed by dense ids and
+are updated in place as transactions arrive (add_transactions); the CSR-style adjacency in
+both directions and the connected components are rebuilt lazily, only after the graph changed.
+
+Components are labelled with a vectorized union-find over the edge arrays (hook the larger
+root onto the smaller, then jump pointers until every edge has one root), so the cost is a
+few passes over the edges and never a pairwise scan of clients. Counterparties that many
+clients deal with (payroll, utilities, big banks: hubs) would join everyone into one component,
+so components() leaves out counterparties with more than max_clients clients.
+
+    graph = load_book_graph()                       # every obligor's transactions
+    graph.hubs(top=10)                              # counterparties by number of clients
+    graph.clusters(flow="out")                      # clients sharing suppliers / beneficiaries
+    graph.concentration("TL-2020-1234567")          # the client's counterparties across the book
+    shared_remittance_graph().clusters()            # AML: senders sharing beneficiaries
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from modules.aml_monitor import KeyIndex, read_events
+
+HUB_MIN_CLIENTS = 10        # counterparties with more clients than this are hubs for components()
+DEFAULT_CAPACITY = 1024
+FLOWS = ("any", "in", "out")
+
+def _grown(arr: np.ndarray, capacity: int) -> np.ndarray:
+    out = np.zeros(capacity, dtype=arr.dtype)
+    out[:len(arr)] = arr
+    return out
+
+def _csr(rows: np.ndarray, n_rows: int):
+    """(indptr, order): edges of row r are order[indptr[r]:indptr[r + 1]]."""
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, order
+
+def connected_labels(u: np.ndarray, v: np.ndarray, n_nodes: int) -> np.ndarray:
+    """Smallest node id of each node's component, for the undirected edges u[i] - v[i]."""
+    label = np.arange(n_nodes)
+    while True:
+        lu, lv = label[u], label[v]
+        diff = lu != lv
+        if not diff.any():
+            return label
+        lo, hi = np.minimum(lu[diff], lv[diff]), np.maximum(lu[diff], lv[diff])
+        np.minimum.at(label, hi, lo)
+        while True:
+            jumped = label[label]
+            if np.array_equal(jumped, label):
+                break
+            label = jumped
+
+class CounterpartyGraph:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.clients, self.counterparties, self._edge_keys = KeyIndex(), KeyIndex(), KeyIndex()
+        self.edge_client = np.zeros(capacity, dtype=np.int32)
+        self.edge_cp = np.zeros(capacity, dtype=np.int32)
+        self.edge_tx = np.zeros(capacity, dtype=np.int64)
+        self.edge_in = np.zeros(capacity)
+        self.edge_out = np.zeros(capacity)
+        self.cp_clients = np.zeros(capacity, dtype=np.int32)
+        self.version = 0
+        self._cache = {}
+
+    @property
+    def n_edges(self) -> int:
+        return len(self._edge_keys.names)
+
+    def _ensure(self):
+        for n, attrs in ((self.n_edges, ("edge_client", "edge_cp", "edge_tx", "edge_in", "edge_out")),
+                         (len(self.counterparties.names), ("cp_clients",))):
+            cap = len(getattr(self, attrs[0]))
+            if n > cap:
+                while cap < n:
+                    cap *= 2
+                for a in attrs:
+                    setattr(self, a, _grown(getattr(self, a), cap))
+
+    def add_transactions(self, client, counterparty, amount):
+        """Fold a batch of transactions into the edges; rows with a blank counterparty are skipped."""
+        counterparty = pd.Series(counterparty, dtype=object).fillna("").astype(str).str.strip().to_numpy()
+        keep = counterparty != ""
+        if not keep.any():
+            return self
+        amount = np.asarray(amount, dtype=np.float64)[keep]
+        c = self.clients.codes(np.asarray(client, dtype=object)[keep])
+        k = self.counterparties.codes(counterparty[keep])
+        first_new = self.n_edges
+        e = self._edge_keys.codes(c << 32 | k)
+        self._ensure()
+        ids, first = np.unique(e, return_index=True)
+        fresh = ids >= first_new
+        ids, first = ids[fresh], first[fresh]
+        self.edge_client[ids] = c[first]
+        self.edge_cp[ids] = k[first]
+        np.add.at(self.cp_clients, k[first], 1)
+        np.add.at(self.edge_tx, e, 1)
+        np.add.at(self.edge_in, e, np.maximum(amount, 0))
+        np.add.at(self.edge_out, e, np.maximum(-amount, 0))
+        self.version += 1
+        self._cache.clear()
+        return self
+
+    def _edges(self):
+        n = self.n_edges
+        return self.edge_client[:n], self.edge_cp[:n]
+
+    def _adjacency(self, by: str):
+        """CSR over edges grouped by "client" or "counterparty", cached until the next update."""
+        key = ("csr", by)
+        if key not in self._cache:
+            client, cp = self._edges()
+            rows, n_rows = (client, len(self.clients.names)) if by == "client" else (cp, len(self.counterparties.names))
+            self._cache[key] = _csr(rows, n_rows)
+        return self._cache[key]
+
+    def _client_edges(self, client) -> np.ndarray:
+        i = self.clients.ids.get(client)
+        if i is None:
+            return np.zeros(0, dtype=np.int64)
+        indptr, order = self._adjacency("client")
+        return order[indptr[i]:indptr[i + 1]]
+
+    # =========================
+    # Views
+    # =========================
+    def hubs(self, top: int = 20) -> pd.DataFrame:
+        """Counterparties by number of clients, then volume."""
+        n_cp = len(self.counterparties.names)
+        _, cp = self._edges()
+        n = self.n_edges
+        df = pd.DataFrame({
+            "counterparty": self.counterparties.names,
+            "clients": self.cp_clients[:n_cp],
+            "transactions": np.bincount(cp, weights=self.edge_tx[:n], minlength=n_cp).astype(np.int64),
+            "inflow": np.bincount(cp, weights=self.edge_in[:n], minlength=n_cp),
+            "outflow": np.bincount(cp, weights=self.edge_out[:n], minlength=n_cp),
+        })
+        df = df.sort_values(["clients", "transactions"], ascending=False, kind="stable")
+        return (df.head(top) if top else df).reset_index(drop=True)
+
+    def components(self, max_clients: int = HUB_MIN_CLIENTS, flow: str = "any"):
+        """
+        (client labels, counterparty labels): component of every client and counterparty, using
+        edges with the given flow ("in": buyers, "out": suppliers, "any") to counterparties with
+        at most max_clients clients. Excluded counterparties are labelled -1.
+        """
+        if flow not in FLOWS:
+            raise ValueError(f"flow must be one of {FLOWS}")
+        key = ("components", max_clients, flow)
+        if key not in self._cache:
+            n_cl, n_cp, n = len(self.clients.names), len(self.counterparties.names), self.n_edges
+            client, cp = self._edges()
+            keep = self.cp_clients[cp] <= (max_clients or np.iinfo(np.int32).max)
+            if flow == "in":
+                keep &= self.edge_in[:n] > 0
+            elif flow == "out":
+                keep &= self.edge_out[:n] > 0
+            label = connected_labels(client[keep], n_cl + cp[keep], n_cl + n_cp)
+            cp_label = label[n_cl:].copy()
+            linked = np.zeros(n_cp, dtype=bool)
+            linked[cp[keep]] = True
+            cp_label[~linked] = -1
+            self._cache[key] = (label[:n_cl], cp_label)
+        return self._cache[key]
+
+    def clusters(self, max_clients: int = HUB_MIN_CLIENTS, flow: str = "any", min_clients: int = 2) -> pd.DataFrame:
+        """
+        Components with at least min_clients clients: their clients, the counterparties two or more
+        of them share, and the component's volume.
+        """
+        cl_label, cp_label = self.components(max_clients, flow)
+        sizes = np.bincount(cl_label, minlength=len(cl_label))
+        big = np.flatnonzero(sizes >= min_clients)
+        if not len(big):
+            return pd.DataFrame(columns=["cluster", "n_clients", "clients", "counterparties", "volume"])
+        client, cp = self._edges()
+        n = self.n_edges
+        in_cluster = np.isin(cp_label[cp], big)
+        volume = np.bincount(cp_label[cp][in_cluster], weights=(self.edge_in[:n] + self.edge_out[:n])[in_cluster],
+                             minlength=len(cl_label))
+        clients = pd.Series(self.clients.names, dtype=object).groupby(cl_label).agg(list)
+        shared = (cp_label >= 0) & (self.cp_clients[:len(cp_label)] >= 2)
+        cps = pd.Series(self.counterparties.names, dtype=object)[shared].groupby(cp_label[shared]).agg(list)
+        df = pd.DataFrame({
+            "cluster": big,
+            "n_clients": sizes[big],
+            "clients": clients.reindex(big).to_numpy(),
+            "counterparties": cps.reindex(big).to_numpy(),
+            "volume": volume[big],
+        })
+        return df.sort_values(["n_clients", "volume"], ascending=False, kind="stable").reset_index(drop=True)
+
+    def shared_counterparties(self, client, max_clients: int = None) -> pd.DataFrame:
+        """Other clients dealing with the same counterparties as client, by number shared."""
+        edges = self._client_edges(client)
+        cps = self.edge_cp[edges]
+        if max_clients:
+            cps = cps[self.cp_clients[cps] <= max_clients]
+        indptr, order = self._adjacency("counterparty")
+        edges = np.concatenate([order[indptr[k]:indptr[k + 1]] for k in cps] + [np.zeros(0, dtype=np.int64)])
+        counts = np.bincount(self.edge_client[edges], minlength=len(self.clients.names))
+        if client in self.clients.ids:
+            counts[self.clients.ids[client]] = 0
+        idx = np.flatnonzero(counts)
+        df = pd.DataFrame({"client": np.asarray(self.clients.names, dtype=object)[idx], "shared": counts[idx]})
+        return df.sort_values("shared", ascending=False, kind="stable").reset_index(drop=True)
+
+    def concentration(self, client) -> pd.DataFrame:
+        """
+        The client's counterparties with their weight in the client's flows and across the book:
+        how many clients share each one and what share of all flows it carries.
+        """
+        edges = self._client_edges(client)
+        cps = self.edge_cp[edges]
+        n = self.n_edges
+        cp_volume = np.bincount(self.edge_cp[:n], weights=self.edge_in[:n] + self.edge_out[:n],
+                                minlength=len(self.counterparties.names))
+        own = self.edge_in[edges] + self.edge_out[edges]
+        df = pd.DataFrame({
+            "counterparty": np.asarray(self.counterparties.names, dtype=object)[cps],
+            "inflow": self.edge_in[edges],
+            "outflow": self.edge_out[edges],
+            "share_of_client": own / max(own.sum(), 1e-9),
+            "book_clients": self.cp_clients[cps],
+            "share_of_book": cp_volume[cps] / max(cp_volume.sum(), 1e-9),
+        })
+        return df.sort_values("share_of_client", ascending=False, kind="stable").reset_index(drop=True)
+
+# =========================
+# Sources
+# =========================
+def book_graph(obligors=None) -> CounterpartyGraph:
+    """
+    Graph of every obligor's own transactions: the transaction store, else the file batch
+    underwriting reads. The shared demo transactions.json only counts for its holder, so it
+    never links unrelated obligors.
+    """
+    from modules import tx_store
+    from modules.lending_assistant import DATA_DIR, normalize_tx, obligors_from_mbp, read_df_csv, read_df_json
+    from modules.lending_batch import find_client_tx_file
+
+    if obligors is None:
+        obligors = obligors_from_mbp(read_df_csv(DATA_DIR / "multi_bank_profile.csv"))
+    graph = CounterpartyGraph()
+    for client_name, client_id in obligors:
+        if tx_store.has_client(client_id):
+            tx = tx_store.load_client_months(client_id, months=0)
+        else:
+            path = find_client_tx_file(client_id, client_name)
+            if path is None:
+                continue
+            tx = normalize_tx(read_df_csv(path) if path.suffix == ".csv" else read_df_json(path))
+        if not tx.empty:
+            graph.add_transactions(np.full(len(tx), client_id, dtype=object), tx["counterparty"], tx["amount"])
+    return graph
+
+_book_cache = {}
+
+def load_book_graph() -> CounterpartyGraph:
+    """Process-wide book graph, rebuilt when the store index or the transaction files change."""
+    from modules.lending_assistant import DATA_DIR, file_version
+    from modules import tx_store
+
+    paths = [tx_store.STORE_DIR / "index.json", DATA_DIR / "multi_bank_profile.csv",
+             *sorted(DATA_DIR.glob("transactions*.json")), *sorted(DATA_DIR.glob("transactions*.csv"))]
+    key = tuple((p.name, file_version(p)) for p in paths)
+    if _book_cache.get("key") != key:
+        _book_cache["graph"] = book_graph()
+        _book_cache["key"] = key
+    return _book_cache["graph"]
+
+_lock = threading.Lock()
+_shared = {}
+
+def shared_remittance_graph() -> CounterpartyGraph:
+    """Process-wide sender <-> beneficiary graph, primed once from data/remittance_events.csv."""
+    with _lock:
+        if "graph" not in _shared:
+            events = read_events()
+            _shared["graph"] = CounterpartyGraph().add_transactions(events["client"], events["counterparty"], -events["amount"])
+        return _shared["graph"]
+
+def ingest(events: pd.DataFrame) -> CounterpartyGraph:
+    """Add a batch of remittance events (client, counterparty, amount) to the shared graph."""
+    graph = shared_remittance_graph()
+    with _lock:
+        return graph.add_transactions(events["client"], events["counterparty"], -events["amount"])
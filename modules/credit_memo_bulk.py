@@ -0,0 +1,89 @@
+"""
+Bulk credit memo generation for the whole book.
+
+Renders one memo per obligor from a precomputed metrics table (the batch underwriter's output)
+with the compiled MEMO_TEMPLATE, in parallel, and streams the results into a .zip archive (one
+Markdown file per obligor) or a single concatenated .md file. Only a bounded number of chunks
+are in flight at any time, so memory does not grow with the size of the book.
+
+    python -m modules.credit_memo_bulk --metrics data/batch/underwriting_....parquet --out memos.zip
+"""
+import argparse
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from modules.lending_assistant import DATA_DIR, _slug, read_df_csv, render_credit_memo
+
+MEMO_SEPARATOR = "\n\n<div style=\"page-break-after: always\"></div>\n\n"
+
+def _render_chunk(records, date):
+    return [(f"credit_memo_{_slug(r['client_id'])}.md", render_credit_memo(r["client_name"], r, date=date))
+            for r in records]
+
+def iter_memos(metrics: pd.DataFrame, max_workers=None, chunk_rows=200, date=None):
+    """Yield (file name, memo text) in table order, rendering chunks across a process pool."""
+    date = date or datetime.today().date().isoformat()
+    records = metrics.to_dict("records")
+    chunks = (records[i:i + chunk_rows] for i in range(0, len(records), chunk_rows))
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        for chunk in chunks:
+            yield from _render_chunk(chunk, date)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_render_chunk, chunk, date))
+            if len(pending) >= 2 * max_workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def write_memos(memos, out: Path) -> int:
+    """Stream memos into out (.zip archive, otherwise one concatenated Markdown file); returns the count."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    if out.suffix == ".zip":
+        with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name, text in memos:
+                zf.writestr(name, text)
+                n += 1
+    else:
+        with open(out, "w", encoding="utf-8") as f:
+            for _, text in memos:
+                if n:
+                    f.write(MEMO_SEPARATOR)
+                f.write(text)
+                n += 1
+    return n
+
+def load_metrics(path: Path) -> pd.DataFrame:
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else read_df_csv(path)
+    # CSV round-trips turn empty strings into NaN
+    return df.fillna({"reasons": "", "loans": "- None detected from transaction patterns."})
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Render credit memos for every obligor in a batch metrics table")
+    ap.add_argument("--metrics", type=Path, default=None,
+                    help="batch underwriting table (.parquet/.csv); runs a fresh batch when omitted")
+    ap.add_argument("--out", type=Path, default=DATA_DIR / "batch" / f"credit_memos_{datetime.now():%Y%m%d_%H%M%S}.zip")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    if args.metrics is not None:
+        metrics = load_metrics(args.metrics)
+    else:
+        from modules.lending_batch import run_batch
+        metrics = run_batch(max_workers=args.workers)
+    started = datetime.now()
+    n = write_memos(iter_memos(metrics, max_workers=args.workers), args.out)
+    print(f"Wrote {n} memos in {(datetime.now() - started).total_seconds():.1f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,37 @@
 import streamlit as st
 import pandas as pd
+from modules import multibank
+from modules.customer_index import load_customer_360
+from modules.identity_index import load_identity_index
+from modules import risk_scoring
+from modules.nba_rules import OUTPUT_COLS
 
 def run():
     st.set_page_config(page_title="Customer 360 View", layout="wide")
     st.title("📊 Customer 360 View – With Risk Profiling & AI")
 
-    @st.cache_data
-    def load_data():
-        lifestyle = pd.DataFrame([
-            {"UAE ID": "784-1234-567890-1", "Client Name": "Fatima Al Mansouri", "Nationality": "UAE",
-             "Property Location": "Dubai Marina", "Property Value": 3100000, "Utility Bill": 1450,
-             "Medical Insurance": "None", "Credit Card Activity": "Air Tickets"},
-            {"UAE ID": "784-9876-543210-2", "Client Name": "Omar Al Fardan", "Nationality": "Expat",
-             "Property Location": "Sharjah Al Khan", "Property Value": 1200000, "Utility Bill": 650,
-             "Medical Insurance": "Yes", "Credit Card Activity": "Online Shopping"},
-            {"UAE ID": "784-2468-135790-3", "Client Name": "Salim Khan", "Nationality": "Expat",
-             "Property Location": "Business Bay", "Property Value": 2150000, "Utility Bill": 980,
-             "Medical Insurance": "None", "Credit Card Activity": "Dining"},
-            {"UAE ID": "784-3698-147025-4", "Client Name": "Laila Hassan", "Nationality": "UAE",
-             "Property Location": "Abu Dhabi Saadiyat", "Property Value": 5800000, "Utility Bill": 1950,
-             "Medical Insurance": "Yes", "Credit Card Activity": "Travel"}
-        ])
-        usage = pd.read_csv("data/multi_bank_profile.csv")
-        return usage, lifestyle
-
-    df_core, df_life = load_data()
+    idx = load_customer_360()
 
     # --- Client Selector
-    uae_ids = sorted(df_life["UAE ID"].unique())
-    selected_id = st.selectbox("Select UAE ID", uae_ids)
+    selected_id = st.selectbox("Select UAE ID", idx["lifestyle"].keys)
 
-    client_core = df_core[df_core["UAE ID"] == selected_id]
-    client_life = df_life[df_life["UAE ID"] == selected_id].iloc[0]
+    client_core = idx["core"].rows(selected_id)
+    client_life = idx["lifestyle"].first(selected_id)
     client_name = client_life["Client Name"]
 
-    # --- Risk Score Logic
-    bank_count = client_core["Bank"].nunique()
-    score = 0
-    reasons = []
-
-    if client_life["Nationality"] == "Expat":
-        score += 2
-        reasons.append("Expat profile (+2)")
-
-    if client_life["Utility Bill"] > 1000:
-        score += 2
-        reasons.append("High utility bill (>AED 1000) (+2)")
-
-    if client_life["Medical Insurance"] == "None":
-        score += 2
-        reasons.append("No medical insurance (+2)")
-
-    if client_life["Property Value"] > 3000000:
-        score += 1
-        reasons.append("High property value (>AED 3M) (+1)")
-
-    if bank_count >= 4:
-        score += 1
-        reasons.append("Fragmented holdings across 4 banks (+1)")
-
-    if score <= 2:
-        level = "🟢 Low"
-    elif score <= 4:
-        level = "🟡 Moderate"
-    else:
-        level = "🔴 High"
+    # --- Risk Score Logic (thresholds apply to this client and to the population view below)
+    with st.expander("⚙️ Risk thresholds"):
+        t1, t2, t3 = st.columns(3)
+        thresholds = {
+            "utility_bill": t1.number_input("High utility bill above (AED)", 0, 10_000,
+                                            risk_scoring.DEFAULT_THRESHOLDS["utility_bill"], 50),
+            "property_value": t2.number_input("High property value above (AED)", 0, 50_000_000,
+                                              risk_scoring.DEFAULT_THRESHOLDS["property_value"], 250_000),
+            "bank_count": t3.number_input("Fragmented holdings from (banks)", 1, 10,
+                                          risk_scoring.DEFAULT_THRESHOLDS["bank_count"], 1),
+        }
+    bank_count = idx["bank_counts"].get(selected_id, 0)
+    score, level, reasons = risk_scoring.risk_profile(client_life, bank_count, thresholds)
 
     # --- UI Output
     st.markdown(f"### 👤 {client_name} ({selected_id})")
@@ -73,65 +40,62 @@ def run():
     st.markdown(f"- **Utility Bill**: AED {client_life['Utility Bill']}")
     st.markdown(f"- **Medical Insurance**: {client_life['Medical Insurance']}")
     st.markdown(f"- **Credit Activity**: {client_life['Credit Card Activity']}")
+    ident = load_identity_index()
+    linked = ident.sources(ident.resolve(selected_id))
+    if linked:
+        st.caption("Linked records: " + ", ".join(f"{name} ({n})" for name, n in linked.items()))
 
     st.markdown("---")
     st.subheader("🛡 Client Risk Profile")
-    st.markdown(f"**Risk Level:** {level}  \n**Score:** {score} / 8")
+    st.markdown(f"**Risk Level:** {level}  \n**Score:** {score} / {risk_scoring.MAX_SCORE}")
     with st.expander("🧠 How This Risk Was Calculated"):
         for r in reasons:
             st.markdown(f"- {r}")
 
+    # --- Population risk: every customer scored in one vectorized pass, reasons built for shown rows only
+    with st.expander("📊 Population Risk (all customers)"):
+        life = idx["lifestyle"].frame
+        pop = risk_scoring.score_population(life, idx["lifestyle_bank_counts"], thresholds)
+        st.bar_chart(pop["level"].value_counts(sort=False))
+        top = pop.sort_values("score", ascending=False, kind="stable").head(50)
+        st.dataframe(pd.DataFrame({
+            "UAE ID": life.loc[top.index, "UAE ID"].astype(str),
+            "Client Name": life.loc[top.index, "Client Name"],
+            "Score": top["score"],
+            "Level": top["level"],
+            "Reasons": [" • ".join(risk_scoring.reasons(m, thresholds)) for m in top["reasons"]],
+        }).reset_index(drop=True), use_container_width=True)
+
     # --- Relationship Summary
     st.markdown("---")
     st.subheader("🏦 Relationship Summary Across Banks")
-    rel_summary = client_core.groupby("Bank")["Products Used"].apply(
-        lambda x: ", ".join(sorted(set(x)))
-    ).reset_index().rename(columns={"Products Used": "Products Held"})
+    rel_summary = idx["relationships"].rows(selected_id)[["Bank", "Products Held"]]
     st.dataframe(rel_summary.reset_index(drop=True), use_container_width=True)
 
+    # --- Live Open Finance data: every bank fetched concurrently, slow banks reported not awaited
+    with st.expander("🔗 Live Open Finance accounts (Nebras)"):
+        live = multibank.fetch_client(selected_id, client_name, bank_timeout=3.0, with_transactions=False)
+        failed = [b for b in live["banks"] if b["status"] != "ok"]
+        if failed and not any(b["accounts"] for b in live["banks"]):
+            st.warning("Open Finance accounts could not be loaded: " + "; ".join(b["error"] or b["status"] for b in failed))
+        elif not live["banks"]:
+            st.info("No Open Finance accounts returned for this client.")
+        else:
+            _, live_accts = multibank.client_frames(live)
+            st.dataframe(multibank.bank_status(live), use_container_width=True)
+            cols = [c for c in ("bank", "product_type", "currency", "balance", "avg_balance_6m") if c in live_accts.columns]
+            st.dataframe(live_accts[cols], use_container_width=True)
+            if not live["complete"]:
+                st.warning("Some banks did not respond in time; their data is missing above.")
+            st.caption(f"Loaded {len(live['banks'])} banks in {live['ms']:.0f} ms")
+
     # --- AI Recommendations
     st.markdown("---")
     st.subheader("🤖 AI Recommendations")
 
-    ai_recos = []
-
-    if client_life["Medical Insurance"] == "None":
-        ai_recos.append({
-            "Recommendation": "Offer Medical & Critical Illness Plan",
-            "Why": "No current medical insurance.",
-            "Logic": "Medical Insurance field = None"
-        })
-
-    if client_life["Property Location"] in ["Dubai Marina", "Abu Dhabi Saadiyat"]:
-        ai_recos.append({
-            "Recommendation": "Recommend Real Estate Investment or REIT",
-            "Why": "High-value property location.",
-            "Logic": "Property > AED 3M in prime area"
-        })
-
-    if client_life["Utility Bill"] > 1000:
-        ai_recos.append({
-            "Recommendation": "Offer Green Energy Efficiency Loan",
-            "Why": "High electricity/water usage.",
-            "Logic": "Utility Bill > AED 1000"
-        })
-
-    if "Air Tickets" in client_life["Credit Card Activity"]:
-        ai_recos.append({
-            "Recommendation": "Recommend Travel Insurance Add-on",
-            "Why": "Frequent air ticket purchases detected.",
-            "Logic": "'Air Tickets' in Credit Card Activity"
-        })
-
-    if client_life["Nationality"] == "UAE":
-        ai_recos.append({
-            "Recommendation": "Suggest National Bonds or Waqf Savings",
-            "Why": "Available only to UAE Nationals.",
-            "Logic": "Nationality = UAE"
-        })
-
-    if ai_recos:
-        ai_df = pd.DataFrame(ai_recos)
+    # every customer's recommendations are computed with the index; this is a lookup
+    ai_df = idx["recommendations"].rows(selected_id)[OUTPUT_COLS]
+    if not ai_df.empty:
         st.dataframe(ai_df.reset_index(drop=True), use_container_width=True)
     else:
         st.success("✅ No AI alerts triggered for this profile.")
@@ -0,0 +1,109 @@
+"""
+Keyed in-memory index over the Customer 360 datasets.
+
+KeyedTable sorts a table once by its key column (stored as a categorical) and keeps the
+[start, stop) row offsets of every key, so fetching one customer's rows is a dictionary lookup
+and a slice: O(rows for that customer), independent of book size.
+
+load_customer_360() builds, once per process and again only when the files change:
+- core           data/multi_bank_profile.csv keyed by UAE ID
+- lifestyle      data/client_lifestyle.csv keyed by UAE ID
+- relationships  per customer and bank, the sorted distinct products held ("Products Held")
+- bank_counts    distinct banks per customer (dict, and an array aligned with the lifestyle rows)
+- recommendations  next-best actions for every customer (nba_rules.CUSTOMER_360_RULES), keyed by UAE ID
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.nba_rules import CUSTOMER_360_RULES
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+KEY = "UAE ID"
+
+_cache = {}
+
+class KeyedTable:
+    def __init__(self, df: pd.DataFrame, key: str = KEY):
+        cat = pd.Categorical(df[key].astype(str))
+        order = np.argsort(cat.codes, kind="stable")
+        frame = df.iloc[order].reset_index(drop=True)
+        frame[key] = pd.Categorical.from_codes(cat.codes[order], categories=cat.categories)
+        counts = np.bincount(cat.codes, minlength=len(cat.categories))
+        self.key = key
+        self.frame = frame
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._pos = {k: i for i, k in enumerate(cat.categories)}
+
+    def __contains__(self, key) -> bool:
+        return key in self._pos
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    @property
+    def keys(self) -> list:
+        """Distinct keys, sorted."""
+        return list(self._pos)
+
+    def span(self, key):
+        """[start, stop) of the key's rows in frame; (0, 0) for an unknown key."""
+        i = self._pos.get(key)
+        return (0, 0) if i is None else (int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def rows(self, key) -> pd.DataFrame:
+        start, stop = self.span(key)
+        return self.frame.iloc[start:stop]
+
+    def first(self, key):
+        """The key's first row as a Series, or None."""
+        start, stop = self.span(key)
+        return self.frame.iloc[start] if stop > start else None
+
+    def count(self, key) -> int:
+        start, stop = self.span(key)
+        return stop - start
+
+def relationship_summary(core: pd.DataFrame, key: str = KEY) -> pd.DataFrame:
+    """[key, Bank, Products Held] with each bank's distinct products sorted and comma-joined."""
+    held = (core[[key, "Bank", "Products Used"]].dropna(subset=["Bank", "Products Used"])
+            .astype({key: str, "Bank": str, "Products Used": str}).drop_duplicates()
+            .sort_values([key, "Bank", "Products Used"], kind="stable"))
+    if held.empty:
+        return pd.DataFrame(columns=[key, "Bank", "Products Held"])
+    ids, banks = held[key].to_numpy(dtype=object), held["Bank"].to_numpy(dtype=object)
+    starts = np.flatnonzero(np.r_[True, (ids[1:] != ids[:-1]) | (banks[1:] != banks[:-1])])
+    # object-array reduceat concatenates each group's "product, " strings in one pass
+    joined = np.add.reduceat(held["Products Used"].to_numpy(dtype=object) + ", ", starts)
+    return pd.DataFrame({key: ids[starts], "Bank": banks[starts], "Products Held": [j[:-2] for j in joined]})
+
+def read_lifestyle(path: Path) -> pd.DataFrame:
+    # "None" is a value of Medical Insurance, not a missing marker
+    return pd.read_csv(path, keep_default_na=False, na_values=[""])
+
+def build_customer_360(core: pd.DataFrame, lifestyle: pd.DataFrame) -> dict:
+    core = core.assign(**{KEY: core[KEY].astype(str)})
+    bank_counts = core.groupby(KEY)["Bank"].nunique()
+    life = KeyedTable(lifestyle)
+    return {
+        "core": KeyedTable(core),
+        "lifestyle": life,
+        "relationships": KeyedTable(relationship_summary(core)),
+        "bank_counts": bank_counts.to_dict(),
+        # aligned with lifestyle.frame, for population-wide scoring
+        "lifestyle_bank_counts": bank_counts.reindex(life.frame[KEY].astype(str)).fillna(0).to_numpy(dtype=int),
+        "recommendations": KeyedTable(CUSTOMER_360_RULES.book(lifestyle.astype({KEY: str}), key=KEY)),
+    }
+
+def load_customer_360(data_dir: Path = DATA_DIR) -> dict:
+    paths = (data_dir / "multi_bank_profile.csv", data_dir / "client_lifestyle.csv")
+    key = tuple((p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None for p in paths)
+    hit = _cache.get(data_dir)
+    if hit and hit[0] == key:
+        return hit[1]
+    core = pd.read_csv(paths[0]) if paths[0].exists() else pd.DataFrame(columns=[KEY, "Client Name", "Bank", "Products Used"])
+    lifestyle = read_lifestyle(paths[1]) if paths[1].exists() else pd.DataFrame(columns=[KEY, "Client Name"])
+    index = build_customer_360(core, lifestyle)
+    _cache[data_dir] = (key, index)
+    return index
@@ -1,17 +1,47 @@
 import streamlit as st
-import json
 import random
 
+import pandas as pd
+
+from modules.client_registry import load_client_registry
+from modules.nba_rules import INSURER_RULES, PAYMENT_SEGMENT_RULES
+
+PREMIUM_CAR_MODELS = ["Ferrari", "BMW 7 Series", "Range Rover", "Land Cruiser"]
+
+_book_cache = {}
+
+def payment_features(registry) -> pd.DataFrame:
+    """One row per registry client: the features the segment rules read."""
+    return pd.DataFrame({
+        "monthly_income": registry.monthly_income,
+        "num_products": registry.num_products(),
+        "owns_premium": registry.owns_any_car(PREMIUM_CAR_MODELS),
+    })
+
+def segment_book(registry) -> pd.DataFrame:
+    """Segment and recommended insurer for every client, indexed by client id."""
+    features = payment_features(registry)
+    features["segment"] = PAYMENT_SEGMENT_RULES.first(features)["Recommendation"]
+    pick = INSURER_RULES.first(features)
+    return pd.DataFrame({"segment": features["segment"], "recommended": pick["Recommendation"],
+                         "reason": pick["Why"]})
+
+def load_segment_book(registry) -> pd.DataFrame:
+    """Segment book of the shared client registry, built once per registry."""
+    if registry not in _book_cache:
+        _book_cache.clear()
+        _book_cache[registry] = segment_book(registry)
+    return _book_cache[registry]
+
 def run_embedded_payments():
     st.header("🚘 Embedded Payments for Vehicle Insurance")
 
-    # Load clients
-    with open("data/clients.json") as f:
-        clients = json.load(f)
+    # Load clients; segments and insurer picks are computed for the whole book at load
+    registry = load_client_registry()
+    book = load_segment_book(registry)
 
-    client_names = [client["name"] for client in clients]
-    selected_name = st.selectbox("Select a Client", client_names)
-    client = next((c for c in clients if c["name"] == selected_name), None)
+    selected_id = st.selectbox("Select a Client", range(len(registry)), format_func=registry.names.__getitem__)
+    client = registry.record(selected_id)
 
     st.subheader("🧾 Client Assets")
     for car in client["cars"]:
@@ -20,38 +50,8 @@ def run_embedded_payments():
     selected_car = random.choice(client["cars"])
     car_desc = f"{selected_car['year']} {selected_car['model']} ({selected_car['fuel']})"
 
-    # ---- Segment Classification ----
-    income = client["monthly_income"]
-    num_products = len(client["products"])
-    premium_car_models = ["Ferrari", "BMW 7 Series", "Range Rover", "Land Cruiser"]
-    owns_premium = any(car["model"] in premium_car_models for car in client["cars"])
-
-    if income > 40000 and num_products >= 3 and owns_premium:
-        segment = "High Net Worth"
-    elif income > 10000 and num_products >= 2:
-        segment = "Affluent"
-    else:
-        segment = "Mass"
-
-    # ---- AI-Powered Recommendation ----
-    if segment == "High Net Worth":
-        recommended = "Orient Insurance"
-        reason = (
-            "You are classified as a High Net Worth client based on income, "
-            "product holdings, and vehicle ownership. Orient offers premium service quality."
-        )
-    elif segment == "Affluent":
-        recommended = "Orient Insurance"
-        reason = (
-            "As an Affluent segment client, you would benefit from balanced coverage "
-            "and faster claims via Orient."
-        )
-    else:
-        recommended = "Noor Takaful"
-        reason = (
-            "As a cost-conscious Mass segment client, Noor Takaful offers better value "
-            "for essential coverage."
-        )
+    # ---- Segment Classification & AI-Powered Recommendation ----
+    recommended, reason = book.loc[selected_id, ["recommended", "reason"]]
 
     # ---- UI Output ----
     st.subheader("🤖 AI Recommendation")
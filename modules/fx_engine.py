@@ -0,0 +1,295 @@
+"""
+FX time-series engine for the remittance agent.
+
+All corridors (AED_INR, AED_PHP, ...: units of the quote currency per 1 AED, so higher is better
+for the sender) live in one pair of [corridor, observation] arrays of dates and rates. Each new
+tick is appended and the corridor's rolling statistics over the last `window` observations are
+updated in place:
+
+- running sums of the rates            -> rolling mean and std
+- running sums of the daily log returns -> volatility (annualized with 252 days)
+- a sorted copy of the window          -> percentile of the latest rate (one searchsorted)
+
+so a tick costs O(window) at most (the shift in the sorted copy) and never rescans the history.
+The sums are recomputed from the window every `window` ticks to keep rounding from drifting.
+A gap of more than MAX_GAP_DAYS between two observations starts the window afresh: statistics
+never mix observations from either side of a hole in the data, and a return over a long gap is
+never annualized as one day's. Until a window holds min_observations (half the window by
+default) there is no timing advice, and the backtest skips those rows.
+
+recommend() turns the latest statistics into "remit today or wait". backtest() replays the same
+timing rule over a whole history with rolling_stats(), which computes every day's window at
+once with sliding windows:
+
+    engine = load_fx_engine()                  # data/fx_trends.csv + data/fx_rates.json
+    engine.tick("AED_INR", "2024-07-12", 23.02)
+    engine.stats("AED_INR")                    # rate, mean, std, percentile, volatility, ...
+    engine.recommend("AED_INR", amount=1000)
+    backtest(*engine.history("AED_INR"))       # per month: rate achieved vs remitting on day one
+"""
+import math
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from modules.fx_history import _pair_currency, load_fx_history
+
+DEFAULT_WINDOW = 30
+REMIT_PERCENTILE = 70       # latest rate at or above this percentile of the window: remit today
+WAIT_PERCENTILE = 30        # at or below: wait for the rate to come back towards the mean
+TRADING_DAYS = 252
+MAX_GAP_DAYS = 5            # longer gaps between observations restart the rolling window
+DEFAULT_CAPACITY = 256
+
+class FXEngine:
+    def __init__(self, window: int = DEFAULT_WINDOW, capacity: int = DEFAULT_CAPACITY, min_observations: int = None):
+        self.window = window
+        self.min_observations = min_observations or _min_observations(window)
+        self.pairs = []
+        self._row = {}
+        self.dates = np.zeros((0, capacity), dtype="datetime64[D]")
+        self.rates = np.zeros((0, capacity))
+        self.n = np.zeros(0, dtype=np.int64)
+        # rolling state per corridor; start is the first observation after the last gap
+        self.start = np.zeros(0, dtype=np.int64)
+        self._sum = np.zeros(0)
+        self._sumsq = np.zeros(0)
+        self._ret_sum = np.zeros(0)
+        self._ret_sumsq = np.zeros(0)
+        self._sorted = np.zeros((0, window))
+
+    def _corridor(self, pair: str) -> int:
+        i = self._row.get(pair)
+        if i is None:
+            if _pair_currency(pair) is None:
+                raise ValueError(f"not an AED_XXX corridor: {pair}")
+            i = self._row[pair] = len(self.pairs)
+            self.pairs.append(pair)
+            self.dates = np.vstack([self.dates, np.zeros((1, self.dates.shape[1]), dtype=self.dates.dtype)])
+            self.rates = np.vstack([self.rates, np.zeros((1, self.rates.shape[1]))])
+            self._sorted = np.vstack([self._sorted, np.zeros((1, self.window))])
+            for a in ("n", "start", "_sum", "_sumsq", "_ret_sum", "_ret_sumsq"):
+                setattr(self, a, np.append(getattr(self, a), 0))
+        return i
+
+    def _grow(self):
+        cap = self.dates.shape[1]
+        self.dates = np.hstack([self.dates, np.zeros_like(self.dates)])
+        self.rates = np.hstack([self.rates, np.zeros((len(self.pairs), cap))])
+
+    def tick(self, pair: str, date, rate: float):
+        """Append one observation (dates in order per corridor) and update the rolling statistics."""
+        i = self._corridor(pair)
+        t = int(self.n[i])
+        if t == self.dates.shape[1]:
+            self._grow()
+        day = np.datetime64(date, "D")
+        if t and day - self.dates[i, t - 1] > np.timedelta64(MAX_GAP_DAYS, "D"):
+            self.start[i] = t
+            self._sum[i] = self._sumsq[i] = self._ret_sum[i] = self._ret_sumsq[i] = 0.0
+        self.dates[i, t] = day
+        self.rates[i, t] = rate
+        self.n[i] = t + 1
+        w = self.window
+        s = t - int(self.start[i])          # observations since the last gap
+        k = min(s, w)                       # window size before this tick
+        srt = self._sorted[i]
+        total, sq, r_total, r_sq = self._sum[i], self._sumsq[i], self._ret_sum[i], self._ret_sumsq[i]
+        if s >= w:
+            old = self.rates[i, t - w]
+            j = srt[:k].searchsorted(old)
+            srt[j:k - 1] = srt[j + 1:k]
+            k -= 1
+            total -= old
+            sq -= old * old
+            # the return leaving the window is the one into its oldest observation
+            r_old = math.log(self.rates[i, t - w + 1] / old)
+            r_total -= r_old
+            r_sq -= r_old * r_old
+        j = srt[:k].searchsorted(rate)
+        srt[j + 1:k + 1] = srt[j:k].copy()
+        srt[j] = rate
+        total += rate
+        sq += rate * rate
+        if s:
+            r = math.log(rate / self.rates[i, t - 1])
+            r_total += r
+            r_sq += r * r
+        self._sum[i], self._sumsq[i], self._ret_sum[i], self._ret_sumsq[i] = total, sq, r_total, r_sq
+        if (s + 1) % w == 0:
+            self._resum(i)
+        return self
+
+    def tick_many(self, pair: str, dates, rates):
+        for d, r in zip(dates, np.asarray(rates, dtype=float).tolist()):
+            self.tick(pair, d, r)
+        return self
+
+    def _resum(self, i: int):
+        win = self.rates[i, max(self.start[i], self.n[i] - self.window):self.n[i]]
+        ret = np.diff(np.log(win))
+        self._sum[i], self._sumsq[i] = win.sum(), (win * win).sum()
+        self._ret_sum[i], self._ret_sumsq[i] = ret.sum(), (ret * ret).sum()
+
+    def history(self, pair: str):
+        """(dates, rates) of one corridor, oldest first (views, not copies)."""
+        i = self._row[pair]
+        return self.dates[i, :self.n[i]], self.rates[i, :self.n[i]]
+
+    def stats(self, pair: str) -> dict:
+        """Latest rate and its rolling statistics over the last `window` observations since the last gap."""
+        i = self._row[pair]
+        n = int(self.n[i])
+        if not n:
+            return {"pair": pair, "observations": 0}
+        k = min(n - int(self.start[i]), self.window)
+        rate = float(self.rates[i, n - 1])
+        mean = self._sum[i] / k
+        std = np.sqrt(max(self._sumsq[i] / k - mean * mean, 0.0))
+        kr = k - 1
+        ret_mean = self._ret_sum[i] / kr if kr else 0.0
+        vol = np.sqrt(max(self._ret_sumsq[i] / kr - ret_mean * ret_mean, 0.0)) if kr else 0.0
+        return {
+            "pair": pair,
+            "date": pd.Timestamp(self.dates[i, n - 1]),
+            "rate": rate,
+            "mean": float(mean),
+            "std": float(std),
+            "percentile": float(100 * np.searchsorted(self._sorted[i, :k], rate, side="right") / k),
+            "volatility_ann": float(vol * np.sqrt(TRADING_DAYS)),
+            "observations": n,
+            "window": k,
+        }
+
+    def snapshot(self) -> pd.DataFrame:
+        """One row of stats() per corridor."""
+        return pd.DataFrame([self.stats(p) for p in self.pairs])
+
+    def recommend(self, pair: str, amount: float = 0.0) -> dict:
+        """Remit today / wait / no strong signal, from the latest rate's place in its window."""
+        s = self.stats(pair)
+        if not s["observations"]:
+            return {**s, "action": "No data", "reason": f"No rates for {pair}."}
+        if s["window"] < self.min_observations:
+            return {**s, "action": "Not enough history", "amount_out": amount * s["rate"],
+                    "reason": f"Only {s['window']} observation(s) since the last gap in the rates; timing advice "
+                              f"needs {self.min_observations}. Remit as needed."}
+        return {**s, **timing_advice(s["rate"], s["mean"], s["percentile"], s["window"]),
+                "amount_out": amount * s["rate"]}
+
+def _min_observations(window: int) -> int:
+    return max(2, window // 2)
+
+def timing_advice(rate: float, mean: float, percentile: float, window: int) -> dict:
+    """Action and reason for a rate at the given percentile of its window."""
+    if percentile >= REMIT_PERCENTILE:
+        return {"action": "Remit today",
+                "reason": f"Today's rate ranks at percentile {percentile:.0f} of the last {window} observations, "
+                          f"{100 * (rate / mean - 1):+.2f}% against their mean."}
+    if percentile <= WAIT_PERCENTILE:
+        return {"action": "Wait",
+                "reason": f"Today's rate ranks at percentile {percentile:.0f} of the last {window} observations; "
+                          f"the mean would give {100 * (mean / rate - 1):+.2f}% more of the receiving currency. "
+                          f"Consider a rate alert at {mean:.4f}."}
+    return {"action": "No strong signal",
+            "reason": f"Today's rate is mid-range (percentile {percentile:.0f} of the last {window} observations); "
+                      "remit as needed or split the amount."}
+
+# =========================
+# Batch statistics and backtest
+# =========================
+def _gaps(dates) -> np.ndarray:
+    """Positions that start a new window: the first observation after each gap of more than MAX_GAP_DAYS."""
+    if dates is None:
+        return np.zeros(0, dtype=np.int64)
+    return np.flatnonzero(np.diff(np.asarray(dates, dtype="datetime64[D]")) > np.timedelta64(MAX_GAP_DAYS, "D")) + 1
+
+def _windows(rates: np.ndarray, window: int):
+    """(sliding windows [n, window] NaN-padded before the start, window sizes, percentile of each rate)."""
+    n = len(rates)
+    win = sliding_window_view(np.concatenate([np.full(window - 1, np.nan), rates]), window)
+    k = np.minimum(np.arange(1, n + 1), window)
+    return win, k, 100 * (win <= rates[:, None]).sum(axis=1) / k
+
+def rolling_stats(rates, window: int = DEFAULT_WINDOW, dates=None) -> pd.DataFrame:
+    """
+    The statistics stats() reports, for every observation at once (same warm-up rules). With
+    dates, the window restarts after each gap of more than MAX_GAP_DAYS, as in tick().
+    """
+    rates = np.asarray(rates, dtype=float)
+    n = len(rates)
+    if not n:
+        return pd.DataFrame(columns=["mean", "std", "percentile", "volatility_ann", "window"])
+    gaps = _gaps(dates)
+    if len(gaps):
+        return pd.concat([rolling_stats(seg, window) for seg in np.split(rates, gaps)], ignore_index=True)
+    win, k, pct = _windows(rates, window)
+    mean = np.nansum(win, axis=1) / k
+    std = np.sqrt(np.maximum(np.nansum(win * win, axis=1) / k - mean * mean, 0.0))
+    ret = np.diff(np.log(win), axis=1)
+    kr = k - 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ret_mean = np.nansum(ret, axis=1) / kr
+        vol = np.sqrt(np.maximum(np.nansum(ret * ret, axis=1) / kr - ret_mean * ret_mean, 0.0))
+    vol = np.where(kr > 0, vol, 0.0)
+    return pd.DataFrame({"mean": mean, "std": std, "percentile": pct, "volatility_ann": vol * np.sqrt(TRADING_DAYS),
+                         "window": k})
+
+def backtest(dates, rates, window: int = DEFAULT_WINDOW, remit_percentile: float = REMIT_PERCENTILE,
+             period: str = "M", min_observations: int = None) -> pd.DataFrame:
+    """
+    Timing rule per period (default monthly): remit on the first day the rate reaches
+    remit_percentile of its rolling window, else on the period's last day. One row per period
+    with the rate achieved, the day-one rate and the gain of the rule over remitting on day one.
+    Days whose window holds fewer than min_observations (after the start or a gap) are skipped.
+    """
+    dates = pd.DatetimeIndex(np.asarray(dates, dtype="datetime64[ns]"))
+    rates = np.asarray(rates, dtype=float)
+    cols = ["period", "day_one_rate", "rule_rate", "remit_date", "gain_pct"]
+    if not len(rates):
+        return pd.DataFrame(columns=cols)
+    # percentile and window size per day, restarting after gaps as rolling_stats() does
+    parts = [_windows(seg, window)[1:] for seg in np.split(rates, _gaps(dates))]
+    k, pct = (np.concatenate(a) for a in zip(*parts))
+    ready = k >= (min_observations or _min_observations(window))
+    if not ready.all():
+        dates, rates, pct = dates[ready], rates[ready], pct[ready]
+    if not len(rates):
+        return pd.DataFrame(columns=cols)
+    periods = dates.to_period(period)
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    ends = np.r_[starts[1:], len(rates)] - 1
+    t = np.arange(len(rates))
+    first_hit = np.minimum.reduceat(np.where(pct >= remit_percentile, t, len(rates)), starts)
+    chosen = np.where(first_hit <= ends, first_hit, ends)
+    return pd.DataFrame({
+        "period": periods[starts].astype(str),
+        "day_one_rate": rates[starts],
+        "rule_rate": rates[chosen],
+        "remit_date": dates[chosen],
+        "gain_pct": 100 * (rates[chosen] / rates[starts] - 1),
+    })
+
+def backtest_summary(bt: pd.DataFrame) -> dict:
+    if bt.empty:
+        return {"periods": 0, "avg_gain_pct": 0.0, "win_rate": 0.0}
+    return {"periods": len(bt), "avg_gain_pct": float(bt["gain_pct"].mean()),
+            "win_rate": float((bt["gain_pct"] > 0).mean())}
+
+# =========================
+# Loading
+# =========================
+_cache = {}
+
+def load_fx_engine(window: int = DEFAULT_WINDOW) -> FXEngine:
+    """Engine over every AED_XXX corridor in the FX history; rebuilt only when the files change."""
+    hist = load_fx_history()
+    hit = _cache.get(window)
+    if hit and hit[0] is hist:
+        return hit[1]
+    engine = FXEngine(window)
+    for ccy, h in hist.groupby("currency", sort=True):
+        engine.tick_many(f"AED_{ccy}", h["date"], 1.0 / h["aed_per_unit"].to_numpy())
+    _cache[window] = (hist, engine)
+    return engine
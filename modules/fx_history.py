@@ -0,0 +1,121 @@
+"""
+FX rate history and as-of conversion of transactions to AED.
+
+Rates are held per currency as sorted (date, AED per unit) arrays built from:
+- data/fx_trends.csv   daily AED_XXX columns (XXX per 1 AED)
+- data/fx_rates.json   {"as_of": "YYYY-MM-DD", "AED_XXX": {"today": .., "last_month": ..}} spot quotes,
+                       dated as_of and as_of - 30 days (the file's modification date without as_of)
+- AED_PEGS             fixed pegs (USD and the GCC currencies pegged to it)
+
+convert_to_aed() looks each transaction up with np.searchsorted against its currency's dates,
+so the cost is O(n log m) per currency with no sort or merge of the transaction frame.
+"""
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# AED per unit of currency for currencies with a fixed peg
+AED_PEGS = {
+    "AED": 1.0,
+    "USD": 3.6725,
+    "SAR": 3.6725 / 3.75,
+    "QAR": 3.6725 / 3.64,
+    "OMR": 3.6725 / 0.3845,
+    "BHD": 3.6725 / 0.376,
+}
+
+_cache = {}
+
+def _pair_currency(col: str):
+    """'AED_INR' -> 'INR' (quote currency per 1 AED)."""
+    parts = str(col).upper().split("_")
+    return parts[1] if len(parts) == 2 and parts[0] == "AED" else None
+
+def load_fx_history(data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """Long table [date, currency, aed_per_unit] sorted by currency and date; re-read only when the files change."""
+    trends, spot = data_dir / "fx_trends.csv", data_dir / "fx_rates.json"
+    key = tuple((p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None for p in (trends, spot))
+    hit = _cache.get(data_dir)
+    if hit and hit[0] == key:
+        return hit[1]
+
+    frames = []
+    if trends.exists():
+        wide = pd.read_csv(trends, parse_dates=["Date"])
+        for col in wide.columns:
+            ccy = _pair_currency(col)
+            if ccy:
+                frames.append(pd.DataFrame({"date": wide["Date"], "currency": ccy, "aed_per_unit": 1.0 / wide[col]}))
+    if spot.exists():
+        quotes_by_pair = json.loads(spot.read_text(encoding="utf-8"))
+        as_of = quotes_by_pair.pop("as_of", None)
+        as_of = (pd.Timestamp(as_of) if as_of else pd.Timestamp(spot.stat().st_mtime, unit="s")).normalize()
+        rows = []
+        for pair, quotes in quotes_by_pair.items():
+            ccy = _pair_currency(pair)
+            if not ccy:
+                continue
+            if "last_month" in quotes:
+                rows.append((as_of - timedelta(days=30), ccy, 1.0 / quotes["last_month"]))
+            if "today" in quotes:
+                rows.append((as_of, ccy, 1.0 / quotes["today"]))
+        frames.append(pd.DataFrame(rows, columns=["date", "currency", "aed_per_unit"]))
+    hist = (pd.concat(frames, ignore_index=True) if frames
+            else pd.DataFrame(columns=["date", "currency", "aed_per_unit"]))
+    # a spot quote on a day the trends file also covers replaces that day's close
+    hist = (hist.dropna().drop_duplicates(["currency", "date"], keep="last")
+            .sort_values(["currency", "date"], kind="stable").reset_index(drop=True))
+    _cache[data_dir] = (key, hist)
+    return hist
+
+def convert_to_aed(tx: pd.DataFrame, fx: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Convert `amount` to AED at the rate valid on each transaction's date (latest rate on or before
+    it; the earliest known rate for older dates). Adds orig_amount, orig_currency and fx_rate and
+    sets currency to "AED", so converting twice is a no-op. Rows in a currency with no peg and no
+    history keep their currency and orig_amount but get amount and fx_rate NaN, so AED totals
+    leave them out instead of adding foreign amounts as AED (see unconverted_currencies()).
+    """
+    if tx.empty or "currency" not in tx.columns or "orig_currency" in tx.columns:
+        return tx
+    # factorize so per-currency work touches the few distinct codes, not millions of strings
+    codes, uniques = pd.factorize(tx["currency"].fillna("AED"))
+    uniques = np.array([str(u).upper() for u in uniques], dtype=object)
+    if (uniques == "AED").all():
+        return tx.assign(orig_amount=tx["amount"], orig_currency="AED", fx_rate=1.0, currency="AED")
+    fx = load_fx_history() if fx is None else fx
+
+    rate = np.full(len(tx), np.nan)
+    dates = tx["date"].to_numpy(dtype="datetime64[ns]")
+    for i, c in enumerate(uniques):
+        mask = codes == i
+        if c in AED_PEGS:
+            rate[mask] = AED_PEGS[c]
+            continue
+        h = fx[fx["currency"] == c]
+        if h.empty:
+            continue
+        h_dates = h["date"].to_numpy(dtype="datetime64[ns]")
+        idx = np.clip(np.searchsorted(h_dates, dates[mask], side="right") - 1, 0, len(h_dates) - 1)
+        rate[mask] = h["aed_per_unit"].to_numpy(dtype=float)[idx]
+    ccy = uniques[codes]
+
+    amount = tx["amount"].to_numpy(dtype=float)
+    out = tx.copy()
+    out["orig_amount"] = amount
+    out["orig_currency"] = ccy
+    out["fx_rate"] = rate
+    out["amount"] = amount * rate
+    out["currency"] = np.where(np.isnan(rate), ccy, "AED")
+    return out
+
+def unconverted_currencies(tx: pd.DataFrame) -> list:
+    """Currencies convert_to_aed() left unconverted (no peg, no rate history), sorted."""
+    if tx.empty or "fx_rate" not in tx.columns:
+        return []
+    return sorted(tx.loc[tx["fx_rate"].isna(), "currency"].astype(str).unique())
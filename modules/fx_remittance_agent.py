@@ -2,17 +2,50 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from modules.fx_engine import backtest, backtest_summary, load_fx_engine, rolling_stats
+
 def run_fx_agent():
     st.header("💱 FX Remittance AI Agent")
 
-    st.subheader("FX Rate Trend (AED to INR)")
-    df = pd.read_csv("data/fx_trends.csv")
-    st.line_chart(df.set_index("Date"))
+    # All corridors and their rolling statistics, rebuilt only when the FX files change
+    engine = load_fx_engine()
+    if not engine.pairs:
+        st.warning("No FX rates found in fx_trends.csv or fx_rates.json.")
+        return
+    pair = st.selectbox("Corridor", engine.pairs, format_func=lambda p: p.replace("_", " → "))
+    ccy = pair.split("_")[1]
+
+    st.subheader(f"FX Rate Trend (AED to {ccy})")
+    dates, rates = engine.history(pair)
+    trend = pd.DataFrame({pair: rates, f"{engine.window}-obs mean": rolling_stats(rates, engine.window, dates)["mean"].to_numpy()},
+                         index=pd.DatetimeIndex(dates, name="Date"))
+    st.line_chart(trend)
 
     st.subheader("Remittance Recommendation")
     amount = st.number_input("Monthly Remittance Amount (AED)", value=1000)
-    st.write("Today's AED/INR rate: 23.10")
-    st.write("✅ Better than last month. Consider remitting today.")
+    rec = engine.recommend(pair, amount)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric(f"Today's AED/{ccy}", f"{rec['rate']:.4f}", f"{rec['rate'] - rec['mean']:+.4f} vs mean")
+    c2.metric("Percentile in window", f"{rec['percentile']:.0f}")
+    c3.metric("Volatility (ann.)", f"{rec['volatility_ann']:.1%}")
+    c4.metric(f"You receive ({ccy})", f"{rec['amount_out']:,.2f}")
+    if rec["action"] == "Remit today":
+        st.write(f"✅ {rec['action']}. {rec['reason']}")
+    elif rec["action"] == "Wait":
+        st.write(f"⏳ {rec['action']}. {rec['reason']}")
+    else:
+        st.write(f"➖ {rec['action']}. {rec['reason']}")
+    st.caption(f"As of {rec['date']:%Y-%m-%d} • {rec['window']} of {rec['observations']} observations in the window")
+
+    with st.expander("📈 Timing rule backtest"):
+        bt = backtest(dates, rates, engine.window)
+        summary = backtest_summary(bt)
+        st.dataframe(bt, use_container_width=True)
+        st.caption(f"{summary['periods']} months • average gain vs remitting on the first day "
+                   f"{summary['avg_gain_pct']:+.2f}% • better in {summary['win_rate']:.0%} of months")
+
+    with st.expander("🌍 All corridors"):
+        st.dataframe(engine.snapshot(), use_container_width=True)
 
     st.subheader("Provider Comparison")
     providers = {"Wise": 18.5, "Lulu Exchange": 22.0, "Mashreq": 21.7}
@@ -0,0 +1,166 @@
+"""
+Cross-source customer identity index.
+
+Every data file keys customers its own way: clients.json and wealth_clients.json by name,
+client_profile_summary.csv by UAE ID / Client ID / Client Name, multi_bank_profile.csv and
+client_lifestyle.csv by UAE ID (a Trade License number for corporates). IdentityIndex maps all of
+these keys to one internal integer customer id and keeps, per dataset, its rows grouped by that
+id with [start, stop) offsets, so resolving a customer and fetching its rows anywhere are
+dictionary lookups and slices.
+
+Linking: rows with identifier columns (UAE ID, Client ID) are joined on those; rows of a
+name-only source join the first customer already known under the same normalized name, or
+start a new customer. Two identified customers that share a name stay separate.
+
+    ident = load_identity_index()           # once per process, rebuilt when a file changes
+    cid = ident.resolve("784-1234-567890-1")   # or a Client ID, Trade License or name
+    ident.rows("clients", cid)                 # that customer's clients.json records
+"""
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# (dataset, file, identifier columns, name column); identified sources first
+SOURCES = [
+    ("profile_summary", "client_profile_summary.csv", ["UAE ID", "Client ID"], "Client Name"),
+    ("multi_bank_profile", "multi_bank_profile.csv", ["UAE ID"], "Client Name"),
+    ("lifestyle", "client_lifestyle.csv", ["UAE ID"], "Client Name"),
+    ("clients", "clients.json", [], "name"),
+    ("wealth", "wealth_clients.json", [], "name"),
+]
+
+_cache = {}
+
+def normalize_name(name) -> str:
+    return re.sub(r"\s+", " ", str(name)).strip().casefold()
+
+def _read(path: Path):
+    if not path.exists():
+        return None
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    # keep_default_na=False: "None" is a value in these files, not a missing marker
+    return pd.read_csv(path, keep_default_na=False, na_values=[""])
+
+class IdentityIndex:
+    def __init__(self, datasets: dict, sources=SOURCES):
+        """datasets: {dataset name: DataFrame or list of records}; missing names are skipped."""
+        self._by_key = {}       # identifier (UAE ID, Client ID, Trade License) -> id
+        self._by_name = {}      # normalized name -> first id seen under it
+        self._names = []        # id -> display name
+        self._ids = []          # id -> primary identifier ("" when name-only)
+        self.datasets = {}
+        self._offsets = {}
+        for name, _, id_cols, name_col in sources:
+            data = datasets.get(name)
+            if data is None:
+                continue
+            frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+            if frame.empty:
+                row_ids = np.zeros(0, dtype=np.int64)
+            else:
+                id_cols = [c for c in id_cols if c in frame.columns]
+                row_ids = self._assign(frame, id_cols, name_col)
+            self._group(name, data, row_ids)
+
+    def _new(self, display_name, primary="") -> int:
+        cid = len(self._names)
+        self._names.append(display_name)
+        self._ids.append(primary)
+        return cid
+
+    def _assign(self, frame: pd.DataFrame, id_cols: list, name_col: str) -> np.ndarray:
+        """Internal id of every row; registers new customers and keys."""
+        names = frame[name_col].astype(str) if name_col in frame.columns else pd.Series([""] * len(frame), index=frame.index)
+        if not id_cols:
+            # name-only source: one lookup per distinct name
+            ids = {}
+            for n in pd.unique(names):
+                key = normalize_name(n)
+                cid = self._by_name.get(key)
+                if cid is None:
+                    cid = self._by_name[key] = self._new(n)
+                ids[n] = cid
+            return names.map(ids).to_numpy(dtype=np.int64)
+
+        keys = frame[id_cols].where(frame[id_cols].notna(), "").astype(str).apply(lambda c: c.str.strip())
+        distinct = pd.concat([keys, names.rename("_name")], axis=1).drop_duplicates(subset=id_cols)
+        ids = {}
+        for row in distinct.itertuples(index=False):
+            values, n = [v for v in row[:-1] if v], row[-1]
+            cid = next((self._by_key[v] for v in values if v in self._by_key), None)
+            if cid is None:
+                cid = self._new(n, values[0] if values else "")
+                self._by_name.setdefault(normalize_name(n), cid)
+            for v in values:
+                self._by_key.setdefault(v, cid)
+            ids[tuple(row[:-1])] = cid
+        return np.fromiter((ids[k] for k in keys.itertuples(index=False, name=None)), dtype=np.int64, count=len(keys))
+
+    def _group(self, name: str, data, row_ids: np.ndarray):
+        order = np.argsort(row_ids, kind="stable")
+        counts = np.bincount(row_ids, minlength=len(self._names)) if len(row_ids) else np.zeros(len(self._names), dtype=np.int64)
+        self._offsets[name] = np.concatenate([[0], np.cumsum(counts)])
+        if isinstance(data, pd.DataFrame):
+            self.datasets[name] = data.iloc[order].reset_index(drop=True)
+        else:
+            self.datasets[name] = [data[i] for i in order]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def resolve(self, key):
+        """Internal id for a UAE ID, Client ID, Trade License or client name; None if unknown."""
+        if key is None:
+            return None
+        key = str(key)
+        cid = self._by_key.get(key.strip())
+        return cid if cid is not None else self._by_name.get(normalize_name(key))
+
+    def name(self, cid: int) -> str:
+        return self._names[cid]
+
+    def primary_id(self, cid: int) -> str:
+        """The customer's first identifier (UAE ID or Trade License); "" for name-only customers."""
+        return self._ids[cid]
+
+    def span(self, dataset: str, cid) -> tuple:
+        """[start, stop) of the customer's rows in datasets[dataset]; (0, 0) if none."""
+        offsets = self._offsets.get(dataset)
+        if offsets is None or cid is None or not 0 <= cid < len(offsets) - 1:
+            return (0, 0)
+        return int(offsets[cid]), int(offsets[cid + 1])
+
+    def rows(self, dataset: str, cid):
+        """The customer's rows: a DataFrame slice for tables, a list of records for JSON sources."""
+        start, stop = self.span(dataset, cid)
+        data = self.datasets.get(dataset)
+        if data is None:
+            return []
+        return data.iloc[start:stop] if isinstance(data, pd.DataFrame) else data[start:stop]
+
+    def first(self, dataset: str, cid):
+        """The customer's first row (Series or record), or None."""
+        rows = self.rows(dataset, cid)
+        return (rows.iloc[0] if isinstance(rows, pd.DataFrame) else rows[0]) if len(rows) else None
+
+    def sources(self, cid) -> dict:
+        """{dataset: number of rows} for every dataset the customer appears in."""
+        spans = {name: self.span(name, cid) for name in self._offsets}
+        return {name: stop - start for name, (start, stop) in spans.items() if stop > start}
+
+def load_identity_index(data_dir: Path = DATA_DIR) -> IdentityIndex:
+    paths = [data_dir / file for _, file, _, _ in SOURCES]
+    key = tuple((p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None for p in paths)
+    hit = _cache.get(data_dir)
+    if hit and hit[0] == key:
+        return hit[1]
+    index = IdentityIndex({name: _read(p) for (name, *_), p in zip(SOURCES, paths)})
+    _cache[data_dir] = (key, index)
+    return index
@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap
 from pathlib import Path
 from datetime import datetime
 import re
+import string
+import time
+from modules.checklist_rules import RULES as CHECKLIST_RULES, compile_checklist
+from modules.compute_graph import ComputeGraph
+from modules.fx_history import convert_to_aed, unconverted_currencies
+from modules.nebras_server import holds_shared_data
 
 # =========================
 # Paths & helpers
@@ -13,15 +21,13 @@ DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 def _slug(s: str) -> str:
     return re.sub(r"[^A-Za-z0-9\-]+", "_", str(s)).strip("_")
 
-@st.cache_data
-def load_df_json(path: Path) -> pd.DataFrame:
+def read_df_json(path: Path) -> pd.DataFrame:
     try:
         return pd.read_json(path)
     except Exception:
         return pd.DataFrame()
 
-@st.cache_data
-def load_df_csv(path: Path) -> pd.DataFrame:
+def read_df_csv(path: Path) -> pd.DataFrame:
     """
     Robust CSV loader for Excel-exported files.
     Tries utf-8-sig (BOM), then utf-8, uses python engine and skips bad lines.
@@ -35,15 +41,34 @@ def load_df_csv(path: Path) -> pd.DataFrame:
             continue
     return pd.DataFrame()
 
-@st.cache_data
-def file_exists(path: Path) -> bool:
-    return path.exists()
+def file_version(path: Path):
+    """(mtime_ns, size) of a file, None when it does not exist."""
+    try:
+        st_ = path.stat()
+    except OSError:
+        return None
+    return (st_.st_mtime_ns, st_.st_size)
+
+# Cached variants for the Streamlit page; headless callers (batch runs) use the read_* functions.
+# The file version is part of the cache key, so an edited file is re-read on the next call.
+@st.cache_data(max_entries=64)
+def _load_df_json(path: Path, version) -> pd.DataFrame:
+    return read_df_json(path)
+
+@st.cache_data(max_entries=64)
+def _load_df_csv(path: Path, version) -> pd.DataFrame:
+    return read_df_csv(path)
+
+def load_df_json(path: Path) -> pd.DataFrame:
+    return _load_df_json(path, file_version(path))
+
+def load_df_csv(path: Path) -> pd.DataFrame:
+    return _load_df_csv(path, file_version(path))
 
 # =========================
 # Data loading (by client)
 # =========================
-@st.cache_data
-def list_clients_from_mbp(mbp: pd.DataFrame):
+def obligors_from_mbp(mbp: pd.DataFrame):
     """Return sorted list of (client_name, client_id) tuples from multi_bank_profile.csv."""
     if mbp.empty:
         return []
@@ -68,52 +93,58 @@ def list_clients_from_mbp(mbp: pd.DataFrame):
     pairs = sorted(pairs, key=lambda x: str(x[0]))
     return [(p[0], str(p[1])) for p in pairs]
 
+@st.cache_data
+def list_clients_from_mbp(mbp: pd.DataFrame):
+    return obligors_from_mbp(mbp)
+
+def tx_paths_for_client(client_id: str, client_name: str):
+    """
+    Candidate transaction files for a client, most specific first. The shared demo
+    transactions.json is a candidate only for its holder, the rule the Nebras stand-in applies.
+    """
+    paths = [
+        DATA_DIR / f"transactions_{client_id}.json",
+        DATA_DIR / f"transactions_{_slug(client_name)}.json",
+    ]
+    if holds_shared_data(client_id, client_name, DATA_DIR):
+        paths.append(DATA_DIR / "transactions.json")
+    return paths
+
 def try_load_of_files_for_client(client_id: str, client_name: str):
     """
-    Tries to load client-specific OF files if present:
-    - transactions_{id}.json or transactions_{slug}.json, else transactions.json
-    - account_summary_{id}.json or account_summary_{slug}.json, else account_summary.json
+    Loads the client's Open Finance data:
+    - last 6 months from the columnar tx_store (python -m modules.tx_store import), else
+    - every bank's transactions, fetched concurrently from the Nebras AISP API (modules.multibank),
+      which serves transactions_{id|slug}.json / account_summary_{id|slug}.json or the shared files
+    - accounts with their bank's fetch status (ok / timeout / error)
     - checklist fixed name
+    - messages for fetches that returned nothing (API unreachable or failing): the data is then empty
     """
+    from modules import multibank, tx_store
+    from modules.nebras_api import NebrasAPIError
+
     # Multi-bank profile is shared
     mbp = load_df_csv(DATA_DIR / "multi_bank_profile.csv")
 
-    # Transactions
-    tx_paths = [
-        DATA_DIR / f"transactions_{client_id}.json",
-        DATA_DIR / f"transactions_{_slug(client_name)}.json",
-        DATA_DIR / "transactions.json",
-    ]
+    # Transactions: columnar store first (last 6 months, no JSON parsing), then all banks via the API
     tx = pd.DataFrame()
-    for p in tx_paths:
-        if file_exists(p):
-            tx = load_df_json(p)
-            if not tx.empty:
-                break
-
-    # Account summary
-    acct_paths = [
-        DATA_DIR / f"account_summary_{client_id}.json",
-        DATA_DIR / f"account_summary_{_slug(client_name)}.json",
-        DATA_DIR / "account_summary.json",
-    ]
-    acct = pd.DataFrame()
-    # account_summary might be an object (dict) not a table; keep raw JSON as dict if needed
+    if tx_store.has_client(client_id):
+        tx = tx_store.load_client_months(client_id, months=6)
+    # revalidate: this runs when the page saw the data change, so cached API responses may be stale
     try:
-        import json
-        for p in acct_paths:
-            if p.exists():
-                # read raw JSON
-                raw = json.loads(p.read_text(encoding="utf-8"))
-                acct = pd.json_normalize(raw.get("accounts", raw))  # normalize to table if possible
-                break
-    except Exception:
-        acct = load_df_json(DATA_DIR / "account_summary.json")
+        fetched = multibank.fetch_client(client_id, client_name, with_transactions=tx.empty, revalidate=True)
+    except (NebrasAPIError, OSError) as e:
+        fetched = {"banks": [{"bank": "Open Finance API", "status": "error", "ms": 0.0, "error": str(e),
+                              "accounts": [], "transactions": []}]}
+    api_tx, acct = multibank.client_frames(fetched)
+    errors = [f"{b['bank']}: {b['error']}" for b in fetched["banks"] if b["status"] != "ok" and not b["accounts"]]
+    if tx.empty:
+        tx = api_tx
 
     # Checklist (single shared file)
     chk = load_df_csv(DATA_DIR / "CBUAE_Corporate_Lending_Checklist.csv")
 
-    return tx, mbp, acct, chk
+    return tx, mbp, acct, chk, errors
 
 # =========================
 # Feature engineering
@@ -149,13 +180,25 @@ def monthly_aggregates(tx: pd.DataFrame) -> pd.DataFrame:
     m["net"] = m["inflow"] - m["outflow"]
     return m.reset_index()
 
-def bounced_indicator(tx: pd.DataFrame) -> int:
+BOUNCE_HINTS = ["BOUNC", "RETURN", "UNPAID", "RD CHQ", "CHEQUE RETURN", "RJCT", "RTO"]
+_BOUNCE_RE = re.compile("|".join(re.escape(h) for h in BOUNCE_HINTS))
+
+def _text_col(tx: pd.DataFrame, col: str) -> pd.Series:
+    if col in tx.columns:
+        return tx[col].fillna("").astype(str)
+    return pd.Series("", index=tx.index)
+
+def bounced_mask(tx: pd.DataFrame) -> pd.Series:
+    desc = (_text_col(tx, "description") + " " + _text_col(tx, "type")).str.upper()
+    return desc.str.contains(_BOUNCE_RE)
+
+def bounced_indicator(tx: pd.DataFrame, state=None, months: int = None) -> int:
+    """Bounced/returned transactions; read from a monthly_state.MonthlyState when one is given."""
+    if state is not None:
+        return state.bounced(months)
     if tx.empty:
         return 0
-    desc = (tx.get("description", pd.Series([""]*len(tx))).fillna("")
-            + " " + tx.get("type", pd.Series([""]*len(tx))).fillna("")).str.upper()
-    hints = ["BOUNC", "RETURN", "UNPAID", "RD CHQ", "CHEQUE RETURN", "RJCT", "RTO"]
-    return int(desc.apply(lambda s: any(h in s for h in hints)).sum())
+    return int(bounced_mask(tx).sum())
 
 def inflow_volatility(monthly: pd.DataFrame) -> float:
     if monthly.empty or monthly["inflow"].mean() == 0:
@@ -168,54 +211,67 @@ BANK_KEYWORDS = [
     "EMI","LOAN","FINANCE","MORTGAGE","OD","TFC","INSTALLMENT","INSTAL"
 ]
 EMI_HINTS = ["EMI","E.M.I","INSTAL","INSTALLMENT","EASY PAY","LOAN REPAY","MORT","FINANCE"]
+# Same substring semantics as the keyword lists above, compiled once
+LOAN_HINT_RE = re.compile("|".join(re.escape(k) for k in BANK_KEYWORDS + EMI_HINTS))
+
+LOAN_COLUMNS = ["lender","product","emi","currency","estimated_outstanding","evidence"]
+
+def _lender_token(s: str) -> str:
+    for k in BANK_KEYWORDS:
+        if k in s: return k
+    return "OTHER"
 
 def detect_external_loans(tx_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Infer loans at other banks from recurring debits that mention a bank or EMI keyword.
+    Keyword matching runs once per distinct description/counterparty text, and the EMI mode,
+    median payment gap and amortized outstanding are computed per lender with groupby/array ops.
+    """
     if tx_df.empty:
-        return pd.DataFrame(columns=["lender","product","emi","currency","estimated_outstanding","evidence"])
-    df = tx_df.copy()
-    df["desc_union"] = (df.get("description","").astype(str) + " " + df.get("counterparty","").astype(str)).str.upper()
-    debits = df[df["amount"] < 0].copy()
-    def hit(s): return any(k in s for k in BANK_KEYWORDS) or any(h in s for h in EMI_HINTS)
-    debits = debits[debits["desc_union"].apply(hit)]
+        return pd.DataFrame(columns=LOAN_COLUMNS)
+    debits = tx_df[tx_df["amount"] < 0]
     if debits.empty:
-        return pd.DataFrame(columns=["lender","product","emi","currency","estimated_outstanding","evidence"])
-    def lender_token(s):
-        for k in BANK_KEYWORDS:
-            if k in s: return k
-        return "OTHER"
-    debits["lender"] = debits["desc_union"].apply(lender_token)
-    rows = []
-    for lender, grp in debits.groupby("lender"):
-        grp = grp.sort_values("date")
-        grp["amt10"] = (grp["amount"].abs() / 10.0).round() * 10
-        counts = grp["amt10"].value_counts()
-        if counts.empty:
-            continue
-        emi = float(counts.index[0])
-        dates = pd.to_datetime(grp["date"])
-        if len(dates) >= 3:
-            diffs = dates.diff().dt.days.dropna()
-            monthlyish = (abs(diffs.median() - 30) <= 6)
-            gap_txt = f"{diffs.median():.1f}d"
-        else:
-            monthlyish = False
-            gap_txt = "n/a"
-        product = "TERM LOAN" if monthlyish else "REVOLVING/OD?"
-        outstanding = np.nan
-        if monthlyish:
-            r = 0.12/12
-            n = 24
-            outstanding = emi * (1 - (1+r)**(-n)) / r
-        evidence = f"{len(grp)} debits; median gap {gap_txt}; top debit≈{emi:,.0f}"
-        rows.append({
-            "lender": lender,
-            "product": product,
-            "emi": round(emi,2),
-            "currency": "AED",
-            "estimated_outstanding": None if np.isnan(outstanding) else round(float(outstanding),2),
-            "evidence": evidence
-        })
-    return pd.DataFrame(rows)
+        return pd.DataFrame(columns=LOAN_COLUMNS)
+    desc_union = (_text_col(debits, "description") + " " + _text_col(debits, "counterparty")).str.upper()
+    codes, uniques = pd.factorize(desc_union)
+    uniques = pd.Series(uniques, dtype=object)
+    hit_u = uniques.str.contains(LOAN_HINT_RE).to_numpy()
+    lender_u = np.array([_lender_token(s) if h else "" for s, h in zip(uniques, hit_u)], dtype=object)
+    keep = hit_u[codes]
+    if not keep.any():
+        return pd.DataFrame(columns=LOAN_COLUMNS)
+
+    d = pd.DataFrame({
+        "lender": lender_u[codes[keep]],
+        "date": pd.to_datetime(debits["date"].to_numpy()[keep]),
+        "amt10": np.round(np.abs(debits["amount"].to_numpy(dtype=float)[keep]) / 10.0) * 10,
+    })
+    d = d.sort_values(["lender", "date"], kind="stable").reset_index(drop=True)
+    d["pos"] = np.arange(len(d))
+
+    # EMI = most frequent rounded debit per lender; ties go to the earliest-dated amount
+    modes = (d.groupby(["lender", "amt10"], sort=False)["pos"].agg(["size", "min"]).reset_index()
+             .sort_values(["lender", "size", "min"], ascending=[True, False, True], kind="stable")
+             .drop_duplicates("lender").set_index("lender")["amt10"])
+
+    d["gap"] = d.groupby("lender", sort=False)["date"].diff().dt.days
+    per = d.groupby("lender").agg(n=("pos", "size"), median_gap=("gap", "median"))
+    per["emi"] = modes.reindex(per.index).to_numpy(dtype=float)
+    per.loc[per["n"] < 3, "median_gap"] = np.nan
+    monthlyish = ((per["median_gap"] - 30).abs() <= 6).to_numpy()
+
+    r, n = 0.12 / 12, 24
+    emi = per["emi"].to_numpy()
+    outstanding = np.where(monthlyish, emi * (1 - (1 + r) ** (-n)) / r, np.nan)
+    gap_txt = [f"{g:.1f}d" if not np.isnan(g) else "n/a" for g in per["median_gap"].to_numpy()]
+    return pd.DataFrame({
+        "lender": per.index.to_numpy(),
+        "product": np.where(monthlyish, "TERM LOAN", "REVOLVING/OD?"),
+        "emi": np.round(emi, 2),
+        "currency": "AED",
+        "estimated_outstanding": [None if np.isnan(o) else round(float(o), 2) for o in outstanding],
+        "evidence": [f"{cnt} debits; median gap {g}; top debit≈{e:,.0f}" for cnt, g, e in zip(per["n"], gap_txt, emi)],
+    })
 
 def eligible_term_cap_from_cashflows(avg_inflow, avg_outflow, target_dscr=1.5, apr=0.12, tenor_months=24):
     ebitda_proxy = max(0.0, avg_inflow - avg_outflow)
@@ -250,43 +306,278 @@ def compute_eligibility(ratios, of_signals, policies, tier1_capital_aed, exposur
     max_cap = min(policy_cap, max(term_cap, wc_cap))
     return status, reasons, {"single_obligor_pct": single_obligor_pct, "policy_cap": policy_cap, "max_cap": max_cap}
 
-def build_credit_memo(borrower_name, metrics):
-    md = []
-    md.append(f"# Credit Proposal — {borrower_name}")
-    md.append(f"**Date:** {datetime.today().date().isoformat()}\n")
-    md.append("## Open Finance Insights (3m)")
-    md.append(f"- Average inflow: AED {metrics['avg_inflow']:,.0f}")
-    md.append(f"- Average outflow: AED {metrics['avg_outflow']:,.0f}")
-    md.append(f"- Net cash flow: AED {metrics['net_cashflow']:,.0f}")
-    md.append(f"- Inflow volatility (std/mean): {metrics['inflow_volatility']:.2f}")
-    md.append(f"- Bounced transactions (3m): {metrics['bounced_txn_6m']}\n")
-    md.append("## External Loans (Detected)")
-    if metrics["loans_df"].empty:
-        md.append("- None detected from transaction patterns.")
-    else:
-        for _, r in metrics["loans_df"].iterrows():
-            md.append(f"- {r['lender']} — {r['product']} — EMI ~ AED {r['emi']:,.0f} — "
-                      f"Outstanding est: {('AED ' + format(r['estimated_outstanding'], ',.0f')) if pd.notnull(r['estimated_outstanding']) else 'n/a'} "
-                      f"({r['evidence']})")
-    md.append("\n## Eligibility & Policy")
-    md.append(f"- Status: **{metrics['status']}**")
-    if metrics["reasons"]:
-        md.append("- Reasons:")
-        for r in metrics["reasons"]:
-            md.append(f"  - {r}")
-    else:
-        md.append("- All core checks passed.")
-    md.append(f"- Eligible amount (term): AED {metrics['eligible_new']:,.0f}")
-    md.append(f"- Policy cap (25% Tier 1): AED {metrics['policy_cap']:,.0f}\n")
-    md.append("## Recommendation (Demo)")
-    if metrics["status"] == "Decline":
-        md.append("- Decline at this time; consider deleveraging or reducing single-obligor exposure.")
-    elif metrics["status"] == "Conditional":
-        md.append("- Approve conditionally with covenants (min DSCR, balance maintenance), and review mitigants.")
+# =========================
+# Policy sensitivity grid
+# =========================
+STATUS_LABELS = ["Eligible", "Conditional", "Decline"]
+
+def eligibility_grid(snapshot, policies, tier1_capital_aed, internal_utilized=0.0,
+                     dscr_levels=None, aprs=None, tenors=None) -> dict:
+    """
+    Vectorized counterpart of eligible_term_cap_from_cashflows + compute_eligibility over a
+    (min DSCR × APR × tenor) grid. Arrays are shaped (len(dscr_levels), len(aprs), len(tenors));
+    status is an int8 index into STATUS_LABELS. Other policy limits are taken from `policies`.
+    """
+    dscr_levels = np.linspace(0.5, 3.0, 50) if dscr_levels is None else np.asarray(dscr_levels, dtype=float)
+    aprs = np.linspace(0.02, 0.30, 30) if aprs is None else np.asarray(aprs, dtype=float)
+    tenors = np.arange(6, 61) if tenors is None else np.asarray(tenors, dtype=float)
+    d = dscr_levels[:, None, None]
+    r = aprs[None, :, None] / 12.0
+    n = tenors[None, None, :]
+
+    avg_in, avg_out, inflow_vol = snapshot["avg_in"], snapshot["avg_out"], snapshot["inflow_vol"]
+    loans_df = snapshot["loans_df"]
+    ext_outstanding = float(loans_df["estimated_outstanding"].fillna(0).sum()) if not loans_df.empty else 0.0
+    ext_monthly_emi = float(loans_df["emi"].fillna(0).sum()) if not loans_df.empty else 0.0
+    ebitda_proxy = max(0.0, avg_in - avg_out)
+
+    # term cap: PV of the monthly service affordable at each DSCR, over each APR/tenor annuity
+    monthly_service = ebitda_proxy / np.maximum(1e-9, d) / 12.0
+    safe_r = np.where(r > 0, r, 1.0)
+    annuity = np.where(r > 0, (1 - (1 + safe_r) ** (-n)) / safe_r, n)
+    term_cap = monthly_service * annuity if ebitda_proxy > 0 else np.zeros(np.broadcast_shapes(d.shape, r.shape, n.shape))
+    wc_cap = wc_limit_from_flows(avg_in, inflow_vol)
+
+    exposure = internal_utilized + ext_outstanding
+    policy_cap = 0.25 * tier1_capital_aed
+    max_cap = np.minimum(policy_cap, np.maximum(term_cap, wc_cap))
+    eligible_new = np.maximum(0.0, max_cap - exposure)
+
+    # status: only the DSCR check varies across the grid; the rest are scalar flags
+    dscr_proxy = (ebitda_proxy / 12.0) / max(1.0, ext_monthly_emi)
+    leverage_proxy = exposure / max(1.0, ebitda_proxy)
+    scalar_conditional = (leverage_proxy > policies["max_leverage"]
+                          or inflow_vol > policies["max_inflow_vol"]
+                          or snapshot["bounced"] > policies["max_bounced_txn_6m"]
+                          or bool(snapshot.get("unconverted")))
+    conditional = (dscr_proxy < d) | scalar_conditional
+    decline = (exposure / max(1.0, tier1_capital_aed)) * 100 > 25.0
+    status = np.where(decline, 2, np.where(conditional, 1, 0)).astype(np.int8)
+    status = np.broadcast_to(status, eligible_new.shape)
+
+    return {
+        "dscr_levels": dscr_levels,
+        "aprs": aprs,
+        "tenors": tenors,
+        "term_cap": term_cap,
+        "eligible_new": eligible_new,
+        "status": status,
+    }
+
+def monthly_snapshot(tx: pd.DataFrame, months: int = 6, state=None) -> dict:
+    """
+    Last-N-month cash-flow figures feeding the eligibility math: averages, volatility, bounces.
+    With a monthly_state.MonthlyState the monthly figures come from its persisted totals instead of
+    re-aggregating `tx`.
+    """
+    if state is not None:
+        m = state.monthly().tail(months)
+        bounced = bounced_indicator(tx, state=state, months=months)
+    elif tx.empty:
+        m = pd.DataFrame(columns=["month", "inflow", "outflow", "net"])
+        bounced = 0
     else:
-        md.append("- Approve within proposed limits and standard covenants.")
-    md.append("\n---\n*This demo memo was generated automatically from Open Finance signals and simple policy rules.*")
-    return "\n".join(md)
+        m = monthly_aggregates(tx).tail(months)
+        bounced = bounced_indicator(tx)
+    return {
+        "monthly": m,
+        "avg_in": float(m["inflow"].mean()) if not m.empty else 0.0,
+        "avg_out": float(m["outflow"].mean()) if not m.empty else 0.0,
+        "inflow_vol": inflow_volatility(m) if not m.empty else 0.0,
+        "bounced": int(bounced),
+        "n_tx": len(tx),
+        "unconverted": unconverted_currencies(tx),
+    }
+
+def cashflow_snapshot(tx: pd.DataFrame, months: int = 6, state=None) -> dict:
+    """Open Finance snapshot: monthly_snapshot() plus the loans detected at other banks."""
+    return {**monthly_snapshot(tx, months, state), "loans_df": detect_external_loans(tx)}
+
+def assess_obligor(snapshot, policies, tier1_capital_aed, internal_utilized=0.0, apr=0.12, tenor_months=24) -> dict:
+    """DSCR/leverage proxies, caps and policy status for one obligor from its cashflow snapshot."""
+    avg_in, avg_out = snapshot["avg_in"], snapshot["avg_out"]
+    loans_df = snapshot["loans_df"]
+    ext_outstanding = float(loans_df["estimated_outstanding"].fillna(0).sum()) if not loans_df.empty else 0.0
+    ext_monthly_emi = float(loans_df["emi"].fillna(0).sum()) if not loans_df.empty else 0.0
+    ebitda_proxy = max(0.0, avg_in - avg_out)
+    denom = max(1.0, ext_monthly_emi)
+    dscr_proxy = (ebitda_proxy / 12.0) / denom
+    leverage_proxy = (ext_outstanding + internal_utilized) / max(1.0, ebitda_proxy)
+    ratios = {"DSCR_proxy": dscr_proxy, "Leverage_proxy": leverage_proxy, "Inflow_volatility": snapshot["inflow_vol"]}
+    of_signals = {"bounced_txn_6m": snapshot["bounced"]}
+    term_cap, _ = eligible_term_cap_from_cashflows(avg_in, avg_out, target_dscr=policies["min_dscr"], apr=apr, tenor_months=tenor_months)
+    wc_cap = wc_limit_from_flows(avg_in, snapshot["inflow_vol"])
+    exposure_to_obligor = internal_utilized + ext_outstanding
+    status, reasons, meta = compute_eligibility(ratios, of_signals, policies, 1.0 * tier1_capital_aed, exposure_to_obligor, term_cap, wc_cap)
+    unconverted = snapshot.get("unconverted") or []
+    if unconverted:
+        # the figures above leave these amounts out, so they cannot support an automatic approval
+        if status == "Eligible":
+            status = "Conditional"
+        reasons.append(f"Manual review: no FX rate for {', '.join(unconverted)}; those amounts are left out of the figures")
+    return {
+        "status": status,
+        "reasons": reasons,
+        "dscr_proxy": dscr_proxy,
+        "leverage_proxy": leverage_proxy,
+        "ext_outstanding": ext_outstanding,
+        "ext_monthly_emi": ext_monthly_emi,
+        "term_cap": term_cap,
+        "wc_cap": wc_cap,
+        "eligible_new": max(0.0, meta["max_cap"] - exposure_to_obligor),
+        **meta,
+    }
+
+def obligor_metrics(snapshot, assessment) -> dict:
+    """Flat metrics row (batch table / checklist rule columns) from a snapshot and its assessment."""
+    return {
+        "avg_inflow": snapshot["avg_in"],
+        "avg_outflow": snapshot["avg_out"],
+        "net_cashflow": snapshot["avg_in"] - snapshot["avg_out"],
+        "inflow_volatility": snapshot["inflow_vol"],
+        "bounced_txn_6m": snapshot["bounced"],
+        "ext_outstanding": assessment["ext_outstanding"],
+        "ext_monthly_emi": assessment["ext_monthly_emi"],
+        "dscr_proxy": assessment["dscr_proxy"],
+        "leverage_proxy": assessment["leverage_proxy"],
+        "term_cap": assessment["term_cap"],
+        "wc_cap": assessment["wc_cap"],
+        "policy_cap": assessment["policy_cap"],
+        "max_cap": assessment["max_cap"],
+        "single_obligor_pct": assessment["single_obligor_pct"],
+        "eligible_new": assessment["eligible_new"],
+        "status": assessment["status"],
+        "reasons": "; ".join(assessment["reasons"]),
+        "loans": memo_loan_lines(snapshot["loans_df"]),
+    }
+
+MEMO_TEMPLATE = string.Template("""# Credit Proposal — $borrower_name
+**Date:** $date
+
+## Open Finance Insights (3m)
+- Average inflow: AED $avg_inflow
+- Average outflow: AED $avg_outflow
+- Net cash flow: AED $net_cashflow
+- Inflow volatility (std/mean): $inflow_volatility
+- Bounced transactions (3m): $bounced_txn_6m
+
+## External Loans (Detected)
+$loans
+
+## Eligibility & Policy
+- Status: **$status**
+$reasons
+- Eligible amount (term): AED $eligible_new
+- Policy cap (25% Tier 1): AED $policy_cap
+
+## Recommendation (Demo)
+- $recommendation
+
+---
+*This demo memo was generated automatically from Open Finance signals and simple policy rules.*""")
+
+MEMO_RECOMMENDATIONS = {
+    "Decline": "Decline at this time; consider deleveraging or reducing single-obligor exposure.",
+    "Conditional": "Approve conditionally with covenants (min DSCR, balance maintenance), and review mitigants.",
+    "Eligible": "Approve within proposed limits and standard covenants.",
+}
+
+def memo_loan_lines(loans_df: pd.DataFrame) -> str:
+    if loans_df.empty:
+        return "- None detected from transaction patterns."
+    return "\n".join(
+        f"- {r['lender']} — {r['product']} — EMI ~ AED {r['emi']:,.0f} — "
+        f"Outstanding est: {('AED ' + format(r['estimated_outstanding'], ',.0f')) if pd.notnull(r['estimated_outstanding']) else 'n/a'} "
+        f"({r['evidence']})"
+        for r in loans_df.to_dict("records")
+    )
+
+def render_credit_memo(borrower_name, metrics, date=None) -> str:
+    """
+    Fill MEMO_TEMPLATE. `metrics` takes either loans_df (a detect_external_loans frame) or loans
+    (pre-rendered lines), and reasons as a list or a "; "-joined string as in the batch table.
+    """
+    reasons = metrics["reasons"]
+    if isinstance(reasons, str):
+        reasons = [r for r in reasons.split("; ") if r]
+    loans = metrics["loans"] if "loans" in metrics else memo_loan_lines(metrics["loans_df"])
+    return MEMO_TEMPLATE.substitute(
+        borrower_name=borrower_name,
+        date=date or datetime.today().date().isoformat(),
+        avg_inflow=f"{metrics['avg_inflow']:,.0f}",
+        avg_outflow=f"{metrics['avg_outflow']:,.0f}",
+        net_cashflow=f"{metrics['net_cashflow']:,.0f}",
+        inflow_volatility=f"{metrics['inflow_volatility']:.2f}",
+        bounced_txn_6m=metrics["bounced_txn_6m"],
+        loans=loans,
+        status=metrics["status"],
+        reasons="- Reasons:\n" + "\n".join(f"  - {r}" for r in reasons) if reasons else "- All core checks passed.",
+        eligible_new=f"{metrics['eligible_new']:,.0f}",
+        policy_cap=f"{metrics['policy_cap']:,.0f}",
+        recommendation=MEMO_RECOMMENDATIONS.get(metrics["status"], MEMO_RECOMMENDATIONS["Eligible"]),
+    )
+
+def build_credit_memo(borrower_name, metrics):
+    return render_credit_memo(borrower_name, metrics)
+
+@st.cache_data
+def evaluate_client_checklist(chk: pd.DataFrame, metrics_row: dict, policies: dict):
+    """Automated checklist flags for one obligor in checklist order (None for manual controls)."""
+    metrics = pd.DataFrame([metrics_row])
+    return [None if pred is None else bool(pred(metrics, policies).iloc[0]) for _, pred in compile_checklist(chk)]
+
+# =========================
+# Page computation graph
+# =========================
+def tx_data_version(client_id: str, client_name: str):
+    """(name, mtime, size) of every source behind the load step; changes when new data lands."""
+    from modules import tx_store
+    summaries = [DATA_DIR / f"account_summary{sfx}.json" for sfx in (f"_{client_id}", f"_{_slug(client_name)}", "")]
+    paths = [tx_store.STORE_DIR / "index.json", *tx_paths_for_client(client_id, client_name), *summaries]
+    return [(p.name, file_version(p)) for p in paths]
+
+def _load_node(client_id, client_name, data_version):
+    tx, _, acct, _, errors = try_load_of_files_for_client(client_id, client_name)
+    return {"tx": tx, "accounts": acct, "errors": errors}
+
+def _normalize_node(loaded):
+    return convert_to_aed(normalize_tx(loaded["tx"]))
+
+def _aggregates_node(tx, client_id):
+    from modules.monthly_state import refresh_client_state
+    return monthly_snapshot(tx, state=refresh_client_state(client_id, tx))
+
+def _anomaly_node(tx):
+    from modules.anomaly import anomaly_signal
+    return anomaly_signal(tx)
+
+def _eligibility_node(aggs, loans_df, policies, tier1_capital, internal_utilized, apr, tenor_months):
+    snap = {**aggs, "loans_df": loans_df}
+    res = assess_obligor(snap, policies, tier1_capital, internal_utilized, apr=apr, tenor_months=tenor_months)
+    return {"assessment": res, "metrics": {"n_tx": aggs["n_tx"], **obligor_metrics(snap, res)}}
+
+def _sensitivity_node(aggs, loans_df, policies, tier1_capital, internal_utilized):
+    t0 = time.perf_counter()
+    grid = eligibility_grid({**aggs, "loans_df": loans_df}, policies, tier1_capital, internal_utilized)
+    return {**grid, "ms": (time.perf_counter() - t0) * 1000}
+
+def _memo_node(elig, client_name, memo_date):
+    return render_credit_memo(client_name, elig["metrics"], date=memo_date)
+
+def build_lending_graph() -> ComputeGraph:
+    """load → normalize → aggregates / loans / anomalies → eligibility → memo (plus the sensitivity grid)."""
+    g = ComputeGraph()
+    g.add("load", _load_node, params=("client_id", "client_name", "data_version"))
+    g.add("normalize", _normalize_node, deps=("load",))
+    g.add("aggregates", _aggregates_node, deps=("normalize",), params=("client_id",))
+    g.add("loans", detect_external_loans, deps=("normalize",))
+    g.add("anomalies", _anomaly_node, deps=("normalize",))
+    g.add("eligibility", _eligibility_node, deps=("aggregates", "loans"),
+          params=("policies", "tier1_capital", "internal_utilized", "apr", "tenor_months"))
+    g.add("sensitivity", _sensitivity_node, deps=("aggregates", "loans"),
+          params=("policies", "tier1_capital", "internal_utilized"))
+    g.add("memo", _memo_node, deps=("eligibility",), params=("client_name", "memo_date"))
+    return g
 
 # =========================
 # Main app
@@ -311,10 +602,6 @@ def run_lending_assistant():
         choice = st.selectbox("Select Client", names, index=idx_default)
         selected_name, selected_id = clients[names.index(choice)]
 
-    # ---- Try to load client-specific OF files; fallback to shared demo ----
-    tx, _, acct, chk = try_load_of_files_for_client(selected_id, selected_name)
-    tx = normalize_tx(tx)
-
     # ---- Controls in main window ----
     st.markdown("### Policy Thresholds & Capacity")
     col1, col2 = st.columns(2)
@@ -338,70 +625,102 @@ def run_lending_assistant():
         "max_bounced_txn_6m": max_bounced_txn_6m,
     }
 
+    # ---- Pipeline: only nodes whose inputs changed since the last rerun are recomputed ----
+    if "lending_graph" not in st.session_state:
+        st.session_state["lending_graph"] = build_lending_graph()
+    graph = st.session_state["lending_graph"].run(
+        client_id=selected_id,
+        client_name=selected_name,
+        data_version=tx_data_version(selected_id, selected_name),
+        policies=policies,
+        tier1_capital=float(tier1_capital),
+        internal_utilized=float(internal_utilized),
+        apr=float(apr),
+        tenor_months=int(tenor_months),
+        memo_date=datetime.today().date().isoformat(),
+    )
+    tx = graph.get("normalize")
+    loaded = graph.get("load")
+    accounts = loaded["accounts"]
+    if loaded["errors"]:
+        st.warning("Open Finance data could not be loaded (" + "; ".join(loaded["errors"])
+                   + "); figures below use whatever data is available.")
+    if "fetch_status" in accounts.columns and (accounts["fetch_status"] != "ok").any():
+        failed = accounts.loc[accounts["fetch_status"] != "ok"].drop_duplicates("bank")
+        st.warning("Partial data: " + ", ".join(f"{b} ({s})" for b, s in zip(failed["bank"], failed["fetch_status"]))
+                   + " did not respond; figures below exclude those banks.")
+    missing = unconverted_currencies(tx)
+    if missing:
+        st.warning(f"No FX rate history for {', '.join(missing)}; those amounts are left out of the AED figures "
+                   "and the obligor needs a manual review.")
+
     # ---- Tabs ----
     tab1, tab2, tab3, tab4 = st.tabs(["Open Finance Snapshot", "Loan Eligibility", "CBUAE Checklist", "Credit Memo"])
 
     # ===== Tab 1 =====
     with tab1:
         st.subheader(f"Open Finance Snapshot — {selected_name}")
+        aggs, loans_df = graph.get("aggregates"), graph.get("loans")
+        avg_in, avg_out = aggs["avg_in"], aggs["avg_out"]
         if tx.empty:
             st.warning("No transactions available for this client. Add a client-specific file like "
                        f"`transactions_{selected_id}.json` or `transactions_{_slug(selected_name)}.json` in /data.")
-            m = pd.DataFrame(columns=["month","inflow","outflow","net"])
-            loans_df = pd.DataFrame()
-            avg_in = avg_out = inflow_vol = 0.0
-            bounced = 0
         else:
-            m = monthly_aggregates(tx).tail(6)
-            avg_in = float(m["inflow"].mean()) if not m.empty else 0.0
-            avg_out = float(m["outflow"].mean()) if not m.empty else 0.0
-            inflow_vol = inflow_volatility(m)
-            bounced = bounced_indicator(tx)
-
             c1, c2, c3, c4, c5 = st.columns(5)
             c1.metric("Avg Inflow (3–6m)", f"AED {int(avg_in):,}")
             c2.metric("Avg Outflow (3–6m)", f"AED {int(avg_out):,}")
             c3.metric("Net Cash Flow", f"AED {int(avg_in-avg_out):,}")
-            c4.metric("Inflow Volatility", f"{inflow_vol:.2f}")
-            c5.metric("Bounced Txns", int(bounced))
+            c4.metric("Inflow Volatility", f"{aggs['inflow_vol']:.2f}")
+            c5.metric("Bounced Txns", int(aggs["bounced"]))
             st.markdown("**Monthly aggregates**")
-            st.dataframe(m, use_container_width=True)
+            st.dataframe(aggs["monthly"], use_container_width=True)
+            anomalies = graph.get("anomalies")
+            with st.expander(f"🧭 Unusual transactions (last 6m): {anomalies['count']}"):
+                from modules.anomaly import MIN_HISTORY, reasons
+                flagged = anomalies["scored"][anomalies["scored"]["flagged"]]
+                if flagged.empty:
+                    st.info("No transaction stands out from its account's history "
+                            f"(accounts are scored after {MIN_HISTORY} transactions each way).")
+                else:
+                    flagged = flagged.assign(reasons=flagged["reasons"].map(lambda m: ", ".join(reasons(m))))
+                    st.dataframe(flagged[["date", "description", "counterparty", "amount", "score", "reasons"]],
+                                 use_container_width=True)
+
+        if not accounts.empty and "fetch_status" in accounts.columns:
+            with st.expander("🏦 Open Finance sources (banks fetched concurrently)"):
+                cols = [c for c in ("bank", "account_id", "product_type", "currency", "balance", "fetch_status", "fetch_ms")
+                        if c in accounts.columns]
+                st.dataframe(accounts[cols], use_container_width=True)
+                from modules.nebras_api import cache_stats
+                cs = cache_stats()
+                st.caption(f"API cache: {cs['hits']} hits • {cs['revalidated']} revalidated • {cs['misses']} misses • "
+                           f"{cs['evictions']} evictions • {cs['bytes'] / 1024:.0f} KB in {cs['entries']} entries")
+
+        with st.expander("🕸 Counterparty concentration across the book"):
+            from modules.counterparty_graph import load_book_graph
+            book = load_book_graph()
+            conc = book.concentration(selected_id)
+            if conc.empty:
+                st.info("No counterparties recorded for this client.")
+            else:
+                st.dataframe(conc, use_container_width=True)
+                suppliers = book.clusters(flow="out")
+                linked = suppliers[suppliers["clients"].map(lambda c: selected_id in c)]
+                if not linked.empty:
+                    st.caption(f"Shares suppliers with {int(linked['n_clients'].iloc[0]) - 1} other obligors: "
+                               + ", ".join(linked["counterparties"].iloc[0]))
 
         st.markdown("#### Loans at Other Banks (Detected)")
-        loans_df = detect_external_loans(tx)
         if loans_df.empty:
             st.info("No external loans detected via EMI/OD patterns.")
         else:
             st.dataframe(loans_df, use_container_width=True)
 
-        st.session_state["avg_in"] = avg_in
-        st.session_state["avg_out"] = avg_out
-        st.session_state["inflow_vol"] = inflow_vol
-        st.session_state["bounced"] = int(bounced)
-        st.session_state["loans_df"] = loans_df
-        st.session_state["selected_client_name"] = selected_name
-
     # ===== Tab 2 =====
     with tab2:
         st.subheader("Loan Eligibility (Policy & Exposure)")
-        avg_in = st.session_state.get("avg_in", 0.0)
-        avg_out = st.session_state.get("avg_out", 0.0)
-        inflow_vol = st.session_state.get("inflow_vol", 0.0)
-        bounced = st.session_state.get("bounced", 0)
-        loans_df = st.session_state.get("loans_df", pd.DataFrame())
-        ext_outstanding = float(loans_df["estimated_outstanding"].fillna(0).sum()) if not loans_df.empty else 0.0
-        ext_monthly_emi = float(loans_df["emi"].fillna(0).sum()) if not loans_df.empty else 0.0
-        ebitda_proxy = max(0.0, avg_in - avg_out)
-        denom = max(1.0, ext_monthly_emi)
-        dscr_proxy = (ebitda_proxy / 12.0) / denom
-        leverage_proxy = (ext_outstanding + internal_utilized) / max(1.0, ebitda_proxy)
-        ratios = {"DSCR_proxy": dscr_proxy, "Leverage_proxy": leverage_proxy, "Inflow_volatility": inflow_vol}
-        of_signals = {"bounced_txn_6m": bounced}
-        term_cap, _ = eligible_term_cap_from_cashflows(avg_in, avg_out, target_dscr=policies["min_dscr"], apr=apr, tenor_months=tenor_months)
-        wc_cap = wc_limit_from_flows(avg_in, inflow_vol)
-        exposure_to_obligor = internal_utilized + ext_outstanding
-        status, reasons, meta = compute_eligibility(ratios, of_signals, policies, 1.0 * tier1_capital, exposure_to_obligor, term_cap, wc_cap)
-        eligible_new = max(0.0, meta["max_cap"] - exposure_to_obligor)
+        res = graph.get("eligibility")["assessment"]
+        status, reasons = res["status"], res["reasons"]
         if status == "Eligible":
             st.success("Eligible")
         elif status == "Conditional":
@@ -413,20 +732,35 @@ def run_lending_assistant():
             for r in reasons: st.write("- " + r)
         else:
             st.write("- All core checks passed")
-        st.metric("Eligible Amount (AED)", f"{int(eligible_new):,}")
-        st.caption(f"Term cap≈ {int(term_cap):,} | WC cap≈ {int(wc_cap):,} | Policy cap (25% Tier1)≈ {int(meta['policy_cap']):,}")
-        st.caption(f"External outstanding≈ {int(ext_outstanding):,} | Internal utilized≈ {int(internal_utilized):,}")
-        st.caption(f"Single obligor (demo): {meta['single_obligor_pct']:.1f}% of Tier 1")
-        st.session_state["elig_status"] = status
-        st.session_state["elig_reasons"] = reasons
-        st.session_state["eligible_new"] = eligible_new
-        st.session_state["policy_cap"] = meta["policy_cap"]
+        st.metric("Eligible Amount (AED)", f"{int(res['eligible_new']):,}")
+        st.caption(f"Term cap≈ {int(res['term_cap']):,} | WC cap≈ {int(res['wc_cap']):,} | Policy cap (25% Tier1)≈ {int(res['policy_cap']):,}")
+        st.caption(f"External outstanding≈ {int(res['ext_outstanding']):,} | Internal utilized≈ {int(internal_utilized):,}")
+        st.caption(f"Single obligor (demo): {res['single_obligor_pct']:.1f}% of Tier 1")
+        with st.expander("📊 Policy sensitivity (min DSCR × APR × tenor)"):
+            grid = graph.get("sensitivity")
+            apr_idx = int(np.abs(grid["aprs"] - apr).argmin())
+            extent = [grid["tenors"][0], grid["tenors"][-1], grid["dscr_levels"][0], grid["dscr_levels"][-1]]
+            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
+            ax1.imshow(grid["status"][:, apr_idx, :], origin="lower", aspect="auto", extent=extent,
+                       cmap=ListedColormap(["#2e7d32", "#f9a825", "#c62828"]), vmin=0, vmax=2)
+            ax1.set_title("Status (green Eligible / amber Conditional / red Decline)")
+            im = ax2.imshow(grid["eligible_new"][:, apr_idx, :] / 1e6, origin="lower", aspect="auto", extent=extent, cmap="viridis")
+            ax2.set_title("Eligible amount (AED m)")
+            fig.colorbar(im, ax=ax2)
+            for ax in (ax1, ax2):
+                ax.set_xlabel("Tenor (months)")
+                ax.set_ylabel("Min DSCR")
+                ax.plot(tenor_months, min_dscr, "wx", markersize=10)
+            st.pyplot(fig)
+            plt.close(fig)
+            st.caption(f"{grid['status'].size:,} scenarios in {grid['ms']:.1f} ms • slice at APR ≈ {grid['aprs'][apr_idx]:.1%} "
+                       f"• ✕ marks the current slider settings")
 
     # ===== Tab 3 =====
     with tab3:
         st.subheader("Compliance Checklist (CBUAE)")
         csv_path = DATA_DIR / "CBUAE_Corporate_Lending_Checklist.csv"
-        exists = file_exists(csv_path)
+        exists = csv_path.exists()
         chk = load_df_csv(csv_path)
         if not exists:
             st.info(f"Checklist CSV not found at: {csv_path}")
@@ -443,52 +777,27 @@ def run_lending_assistant():
                  "Evidence Examples":"Limit calc; Tier 1","Frequency":"Per-transaction","Control Owner":"Risk",
                  "Automated (Y/N)":"Y","System Field ID (suggested)":"exp.single_obligor_pct"}
             ])
-        status = st.session_state.get("elig_status", "Eligible")
-        eligible_new = st.session_state.get("eligible_new", 0.0)
-        policy_cap = st.session_state.get("policy_cap", 0.0)
-        try:
-            ext_emi = float(st.session_state.get("loans_df", pd.DataFrame())["emi"].fillna(0).sum())
-        except Exception:
-            ext_emi = 0.0
-        try:
-            dscr_ok = (((st.session_state.get("avg_in", 0.0) - st.session_state.get("avg_out", 0.0)) / 12.0)
-                       / max(1.0, ext_emi)) >= policies["min_dscr"]
-        except Exception:
-            dscr_ok = False
-        auto_map = {
-            "uw.dscr_value": (status != "Decline") and dscr_ok,
-            "exp.single_obligor_pct": (status != "Decline") and (policy_cap >= 0) and (eligible_new >= 0),
-            "ls.ltv_ratio": False,
-        }
+        flags = evaluate_client_checklist(chk, graph.get("eligibility")["metrics"], policies)
         completed = 0
         total = len(chk)
-        for _, row in chk.iterrows():
+        for i, (row, auto_flag) in enumerate(zip(chk.to_dict("records"), flags)):
             fid = str(row.get("System Field ID (suggested)", ""))
-            auto_flag = auto_map.get(fid, None)
             label = f"{row.get('Section','')} – {row.get('Control','')}: {row.get('Requirement','')}"
-            value = st.checkbox(label, value=bool(auto_flag) if auto_flag is not None else False, key=f"chk_{fid}_{_}")
-            st.caption(f"Evidence: {row.get('Evidence Examples','')} • Owner: {row.get('Control Owner','')} • Freq: {row.get('Frequency','')}")
+            value = st.checkbox(label, value=bool(auto_flag) if auto_flag is not None else False, key=f"chk_{fid}_{i}")
+            automation = ("" if auto_flag is None else " • Automated" if fid in CHECKLIST_RULES
+                          else " • Automated: pending (no system data yet)")
+            st.caption(f"Evidence: {row.get('Evidence Examples','')} • Owner: {row.get('Control Owner','')} • Freq: {row.get('Frequency','')}"
+                       + automation)
             if value: completed += 1
         st.success(f"Checklist completion: {completed}/{total}")
 
     # ===== Tab 4 =====
     with tab4:
         st.subheader("Auto-Generated Credit Memo")
-        memo = build_credit_memo(
-            borrower_name=st.session_state.get("selected_client_name", "Selected Client"),
-            metrics={
-                "avg_inflow": st.session_state.get("avg_in", 0.0),
-                "avg_outflow": st.session_state.get("avg_out", 0.0),
-                "net_cashflow": st.session_state.get("avg_in", 0.0) - st.session_state.get("avg_out", 0.0),
-                "inflow_volatility": st.session_state.get("inflow_vol", 0.0),
-                "bounced_txn_6m": st.session_state.get("bounced", 0),
-                "loans_df": st.session_state.get("loans_df", pd.DataFrame()),
-                "status": st.session_state.get("elig_status", "Eligible"),
-                "reasons": st.session_state.get("elig_reasons", []),
-                "eligible_new": st.session_state.get("eligible_new", 0.0),
-                "policy_cap": st.session_state.get("policy_cap", 0.0),
-            }
-        )
+        memo = graph.get("memo")
         st.markdown(memo)
         st.download_button("⬇️ Download Memo (.md)", data=memo.encode("utf-8"),
                            file_name="credit_memo_demo.md", mime="text/markdown")
+
+    with st.expander("⚙️ Computation graph (this rerun)"):
+        st.dataframe(graph.stats(), use_container_width=True)
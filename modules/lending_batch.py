@@ -0,0 +1,160 @@
+"""
+Headless batch underwriting for the whole book.
+
+Runs the lending_assistant pipeline (load -> normalize -> aggregates -> loan detection ->
+caps -> eligibility) for every obligor in multi_bank_profile.csv across a process pool and
+writes one result table per run, plus a second table with the automated CBUAE checklist controls
+evaluated for every obligor.
+
+    python -m modules.lending_batch --out data/batch/underwriting.parquet --workers 8
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from modules.lending_assistant import (
+    DATA_DIR,
+    assess_obligor,
+    cashflow_snapshot,
+    normalize_tx,
+    obligor_metrics,
+    obligors_from_mbp,
+    read_df_csv,
+    tx_paths_for_client,
+)
+from modules import tx_store
+from modules.checklist_rules import checklist_summary, evaluate_checklist
+from modules.fx_history import convert_to_aed
+from modules.tx_stream import stream_cashflow_snapshot
+
+DEFAULT_POLICIES = {
+    "min_dscr": 1.50,
+    "max_leverage": 3.00,
+    "max_inflow_vol": 0.20,
+    "max_bounced_txn_6m": 0,
+}
+DEFAULT_TIER1_CAPITAL = 1_000_000_000.0
+
+RESULT_COLUMNS = [
+    "client_id", "client_name", "tx_source", "n_tx", "unconverted_ccy",
+    "avg_inflow", "avg_outflow", "net_cashflow", "inflow_volatility", "bounced_txn_6m",
+    "ext_outstanding", "ext_monthly_emi", "dscr_proxy", "leverage_proxy",
+    "term_cap", "wc_cap", "policy_cap", "max_cap", "single_obligor_pct", "eligible_new",
+    "status", "reasons", "loans",
+]
+
+# =========================
+# Per-obligor work unit
+# =========================
+def find_client_tx_file(client_id: str, client_name: str):
+    """Same probing order as the page (client id, slug, shared demo file for its holder); None when nothing exists."""
+    for p in tx_paths_for_client(client_id, client_name):
+        if p.exists() and p.stat().st_size > 0:
+            return p
+    return None
+
+def underwrite_client(obligor, policies=None, tier1_capital_aed=DEFAULT_TIER1_CAPITAL,
+                      internal_utilized=0.0, apr=0.12, tenor_months=24) -> dict:
+    client_name, client_id = obligor
+    policies = policies or DEFAULT_POLICIES
+    path = None if tx_store.has_client(client_id) else find_client_tx_file(client_id, client_name)
+    if path is not None:
+        # streamed so worker memory stays flat on multi-million-row histories
+        snap, acc = stream_cashflow_snapshot(path)
+        n_tx, source = acc.n_tx, path.name
+    elif tx_store.has_client(client_id):
+        tx = convert_to_aed(normalize_tx(tx_store.load_client_months(client_id, months=6)))
+        snap, n_tx, source = cashflow_snapshot(tx), len(tx), "tx_store"
+    else:
+        snap, n_tx, source = cashflow_snapshot(pd.DataFrame()), 0, ""
+    res = assess_obligor(snap, policies, tier1_capital_aed, internal_utilized, apr=apr, tenor_months=tenor_months)
+    return {
+        "client_id": client_id,
+        "client_name": client_name,
+        "tx_source": source,
+        "n_tx": n_tx,
+        # amounts in these currencies are left out of the figures; the status asks for a manual review
+        "unconverted_ccy": ", ".join(snap["unconverted"]),
+        **obligor_metrics(snap, res),
+    }
+
+# =========================
+# Batch driver
+# =========================
+def run_batch(obligors=None, policies=None, tier1_capital_aed=DEFAULT_TIER1_CAPITAL,
+              internal_utilized=0.0, apr=0.12, tenor_months=24, max_workers=None, chunksize=None) -> pd.DataFrame:
+    """Underwrite every obligor (default: all of multi_bank_profile.csv) and return one row per obligor."""
+    if obligors is None:
+        obligors = obligors_from_mbp(read_df_csv(DATA_DIR / "multi_bank_profile.csv"))
+    if not obligors:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    work = partial(underwrite_client, policies=policies or DEFAULT_POLICIES, tier1_capital_aed=tier1_capital_aed,
+                   internal_utilized=internal_utilized, apr=apr, tenor_months=tenor_months)
+    max_workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        # a few chunks per worker keeps IPC overhead low without starving the tail of the run
+        chunksize = max(1, len(obligors) // (max_workers * 4))
+    if max_workers == 1:
+        rows = [work(o) for o in obligors]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(work, obligors, chunksize=chunksize))
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+def write_results(df: pd.DataFrame, out: Path) -> Path:
+    """Parquet when the path asks for it (needs pyarrow), CSV otherwise."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if out.suffix == ".parquet":
+        try:
+            df.to_parquet(out, index=False)
+            return out
+        except ImportError:
+            out = out.with_suffix(".csv")
+    df.to_csv(out, index=False)
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Batch underwriting across all obligors in multi_bank_profile.csv")
+    ap.add_argument("--out", type=Path,
+                    default=DATA_DIR / "batch" / f"underwriting_{datetime.now():%Y%m%d_%H%M%S}.parquet")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--min-dscr", type=float, default=DEFAULT_POLICIES["min_dscr"])
+    ap.add_argument("--max-leverage", type=float, default=DEFAULT_POLICIES["max_leverage"])
+    ap.add_argument("--max-inflow-vol", type=float, default=DEFAULT_POLICIES["max_inflow_vol"])
+    ap.add_argument("--max-bounced", type=int, default=DEFAULT_POLICIES["max_bounced_txn_6m"])
+    ap.add_argument("--tier1", type=float, default=DEFAULT_TIER1_CAPITAL)
+    ap.add_argument("--apr", type=float, default=0.12)
+    ap.add_argument("--tenor", type=int, default=24)
+    args = ap.parse_args(argv)
+
+    policies = {
+        "min_dscr": args.min_dscr,
+        "max_leverage": args.max_leverage,
+        "max_inflow_vol": args.max_inflow_vol,
+        "max_bounced_txn_6m": args.max_bounced,
+    }
+    started = datetime.now()
+    df = run_batch(policies=policies, tier1_capital_aed=args.tier1, apr=args.apr,
+                   tenor_months=args.tenor, max_workers=args.workers)
+    out = write_results(df, args.out)
+    chk = read_df_csv(DATA_DIR / "CBUAE_Corporate_Lending_Checklist.csv")
+    if not chk.empty and not df.empty:
+        controls = evaluate_checklist(chk, df, policies)
+        controls = pd.concat([df[["client_id", "client_name"]], checklist_summary(controls), controls], axis=1)
+        write_results(controls, args.out.with_name(f"{args.out.stem}_checklist{args.out.suffix}"))
+    elapsed = (datetime.now() - started).total_seconds()
+    counts = df["status"].value_counts().to_dict() if not df.empty else {}
+    print(f"Underwrote {len(df)} obligors in {elapsed:.1f}s -> {out} {counts}")
+    flagged = df[df["unconverted_ccy"] != ""] if not df.empty else df
+    if not flagged.empty:
+        print(f"Warning: {len(flagged)} obligors need a manual review: amounts without an FX rate "
+              f"({', '.join(sorted(set(', '.join(flagged['unconverted_ccy']).split(', '))))}) are left out; "
+              "see unconverted_ccy.")
+
+if __name__ == "__main__":
+    main()
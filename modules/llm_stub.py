@@ -0,0 +1,154 @@
+"""
+Local OpenAI-compatible chat stand-in for the RM Copilot.
+
+A small asyncio HTTP/1.1 server that answers the chat completions API the way a hosted model
+would, without a model: the reply is built from the "Next-best actions" listed in the system
+prompt and the client's first name, and streamed word by word as server-sent events. A first
+token delay and a per-token delay make time-to-first-token and queueing measurable.
+
+    GET  /v1/models
+    POST /v1/chat/completions        {"model", "messages", "stream": true|false}
+
+    python -m modules.llm_stub --port 8790 --ttft-ms 300 --token-ms 20
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+import uuid
+
+MODEL = "rm-copilot-stub"
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found"}
+
+def stub_reply(messages: list) -> str:
+    """Deterministic answer from the system prompt's action list and the client's name."""
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    question = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+    actions = re.findall(r"^- (.+)$", system.split("Next-best actions:", 1)[-1], flags=re.M)[:3]
+    name = re.search(r"^Client: (\S+)", system, flags=re.M)
+    first = name.group(1) if name else "there"
+    if not actions:
+        return f"I don't have enough client context to answer \"{question}\"."
+    pitch = f"Hi {first}, our {actions[0]} could be ideal this month."
+    if re.search(r"^Risk category: High", system, flags=re.M):
+        pitch += " (Further checks may apply due to high risk.)"
+    lines = "\n".join(f"- {a}" for a in actions)
+    return f"Suggested Actions:\n{lines}\n\nPitch:\n\"{pitch}\""
+
+class LLMStubServer:
+    def __init__(self, ttft_ms: float = 0.0, token_ms: float = 0.0):
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.stats = {"connections": 0, "requests": 0, "streams": 0}
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _chunk(self, rid: str, delta: dict, finish=None) -> bytes:
+        event = {"id": rid, "object": "chat.completion.chunk", "created": int(time.time()), "model": MODEL,
+                 "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+        data = f"data: {json.dumps(event)}\n\n".encode()
+        return f"{len(data):x}\r\n".encode() + data + b"\r\n"
+
+    async def _stream(self, writer, reply: str):
+        rid = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: keep-alive\r\n\r\n")
+        await writer.drain()
+        if self.ttft_ms:
+            await asyncio.sleep(self.ttft_ms / 1000)
+        writer.write(self._chunk(rid, {"role": "assistant", "content": ""}))
+        for i, token in enumerate(re.findall(r"\S+\s*", reply)):
+            if i and self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+            writer.write(self._chunk(rid, {"content": token}))
+            await writer.drain()
+        writer.write(self._chunk(rid, {}, "stop"))
+        done = b"data: [DONE]\n\n"
+        writer.write(f"{len(done):x}\r\n".encode() + done + b"\r\n0\r\n\r\n")
+        await writer.drain()
+
+    def _complete(self, reply: str) -> dict:
+        return {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion", "created": int(time.time()),
+                "model": MODEL,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(reply.split()), "total_tokens": len(reply.split())}}
+
+    async def _respond(self, writer, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: keep-alive\r\n\r\n".encode() + payload)
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = line.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0)))
+                parts = request_line.decode("latin-1").split()
+                self.stats["requests"] += 1
+                path = parts[1].split("?")[0] if len(parts) == 3 else ""
+                if path.endswith("/models"):
+                    await self._respond(writer, 200, {"object": "list", "data": [{"id": MODEL, "object": "model"}]})
+                elif path.endswith("/chat/completions") and parts[0] == "POST":
+                    try:
+                        req = json.loads(raw or b"{}")
+                        reply = stub_reply(req.get("messages", []))
+                    except (ValueError, AttributeError, TypeError):
+                        await self._respond(writer, 400, {"error": {"message": "invalid request body"}})
+                        continue
+                    if req.get("stream"):
+                        self.stats["streams"] += 1
+                        await self._stream(writer, reply)
+                    else:
+                        if self.ttft_ms:
+                            await asyncio.sleep(self.ttft_ms / 1000)
+                        await self._respond(writer, 200, self._complete(reply))
+                else:
+                    await self._respond(writer, 404, {"error": {"message": f"no route for {path}"}})
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host: str, port: int, ttft_ms: float, token_ms: float):
+    server = await LLMStubServer(ttft_ms, token_ms).start(host, port)
+    print(f"LLM stand-in on http://{host}:{server.port}/v1 (first token {ttft_ms}ms, {token_ms}ms/token)")
+    await server._server.serve_forever()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local OpenAI-compatible chat stand-in")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8790)
+    ap.add_argument("--ttft-ms", type=float, default=0.0)
+    ap.add_argument("--token-ms", type=float, default=0.0)
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.ttft_ms, args.token_ms))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
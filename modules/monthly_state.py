@@ -0,0 +1,110 @@
+"""
+Persisted per-client monthly aggregates with a watermark.
+
+Instead of re-running monthly_aggregates over the whole history on every rerun, each client keeps
+its monthly inflow/outflow/count/bounced totals in data/agg_state/<client>.json together with the
+latest transaction date folded in. A refresh compares each month's row count and net amount in
+the incoming transactions with the stored totals and recomputes only the months that differ:
+new months, rows arriving late on the watermark's day, and rows back-filled into earlier months
+alike. Months outside the incoming transactions are kept as stored.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.lending_assistant import DATA_DIR, _slug
+from modules.tx_stream import MonthlyAccumulator
+
+STATE_DIR = DATA_DIR / "agg_state"
+
+class MonthlyState(MonthlyAccumulator):
+    """MonthlyAccumulator that can be saved, reloaded and refreshed month-by-month."""
+
+    def __init__(self, client_id: str = "", watermark=None):
+        super().__init__()
+        self.client_id = str(client_id)
+        self.watermark = pd.Timestamp(watermark) if watermark else None
+
+    def recompute_months(self, tx: pd.DataFrame, months) -> set:
+        """Replace the totals of `months` with those computed from the rows of `tx` in those months."""
+        months = set(months)
+        if not months:
+            return months
+        in_scope = tx[tx["date"].dt.to_period("M").astype(str).isin(months)]
+        fresh = MonthlyAccumulator().update(in_scope)
+        for m in months:
+            if m in fresh.months:
+                self.months[m] = fresh.months[m]
+            else:
+                self.months.pop(m, None)
+        return months
+
+    def changed_months(self, tx: pd.DataFrame) -> set:
+        """Months of tx whose row count or net amount differs from the stored totals."""
+        month = tx["date"].dt.to_period("M").astype(str)
+        seen = tx["amount"].astype(float).groupby(month).agg(["size", "sum"])
+        changed = set()
+        for m, (count, net) in zip(seen.index, seen.to_numpy()):
+            v = self.months.get(m)
+            if v is None or v[3] != count or not np.isclose(v[0] - v[1], net, rtol=1e-9, atol=1e-6):
+                changed.add(m)
+        return changed
+
+    def refresh(self, tx: pd.DataFrame) -> set:
+        """Recompute the months whose rows changed (see changed_months); returns those months."""
+        if tx.empty:
+            return set()
+        dated = tx[tx["date"].notna()]
+        affected = self.changed_months(dated) if not dated.empty else set()
+        if not affected:
+            return set()
+        self.recompute_months(dated, affected)
+        self.n_tx = int(sum(v[3] for v in self.months.values()))
+        latest = dated["date"].max()
+        self.watermark = latest if self.watermark is None else max(self.watermark, latest)
+        return affected
+
+    # ---- persistence ----
+    def to_dict(self) -> dict:
+        return {
+            "client_id": self.client_id,
+            "watermark": self.watermark.isoformat() if self.watermark is not None else None,
+            "months": {m: v.tolist() for m, v in sorted(self.months.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "MonthlyState":
+        state = cls(d.get("client_id", ""), d.get("watermark"))
+        state.months = {m: np.asarray(v, dtype=float) for m, v in d.get("months", {}).items()}
+        state.n_tx = int(sum(v[3] for v in state.months.values()))
+        return state
+
+def state_path(client_id: str, state_dir: Path = STATE_DIR) -> Path:
+    return state_dir / f"{_slug(client_id)}.json"
+
+def load_state(client_id: str, state_dir: Path = STATE_DIR) -> MonthlyState:
+    path = state_path(client_id, state_dir)
+    if not path.exists():
+        return MonthlyState(client_id)
+    try:
+        return MonthlyState.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    except (ValueError, KeyError):
+        return MonthlyState(client_id)
+
+def save_state(state: MonthlyState, state_dir: Path = STATE_DIR) -> Path:
+    state_dir.mkdir(parents=True, exist_ok=True)
+    path = state_path(state.client_id, state_dir)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(state.to_dict()), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+def refresh_client_state(client_id: str, tx: pd.DataFrame, state_dir: Path = STATE_DIR) -> MonthlyState:
+    """Load the client's state, recompute the months whose rows changed, persist if any did."""
+    state = load_state(client_id, state_dir)
+    if state.refresh(tx):
+        save_state(state, state_dir)
+    return state
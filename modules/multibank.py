@@ -0,0 +1,107 @@
+"""
+Concurrent multi-bank fetch over the Nebras API.
+
+A client's consented accounts are listed once (one bulk call for a whole batch of clients), then
+every bank's account transactions are fetched concurrently: a client loads in the time of its
+slowest bank, not the sum. Each bank gets its own timeout; a bank that times out or errors is
+reported with its status and the other banks' data is still returned; a failed account listing
+is reported the same way, as an "All banks" entry with status "error". A semaphore bounds how
+many banks are in flight across the whole batch.
+
+    res = fetch_client("TL-2020-1234567", "Al Noor Trading LLC", bank_timeout=2.0)
+    res["complete"], [(b["bank"], b["status"], b["ms"]) for b in res["banks"]]
+    tx, accounts = client_frames(res)
+"""
+import asyncio
+import time
+
+import pandas as pd
+
+from modules.nebras_api import DEFAULT_PAGE_SIZE, AsyncNebrasClient, NebrasAPIError, run_sync
+
+DEFAULT_BANK_TIMEOUT = 5.0      # seconds per bank
+DEFAULT_MAX_CONCURRENCY = 8     # banks in flight across the batch
+BULK_CHUNK = 100                # clients per bulk accounts request
+
+async def _fetch_bank(client: AsyncNebrasClient, bank: str, accounts: list, slots: asyncio.Semaphore,
+                      timeout: float, page_size: int, with_transactions: bool) -> dict:
+    res = {"bank": bank, "status": "ok", "ms": 0.0, "error": None, "accounts": accounts, "transactions": []}
+    if not with_transactions:
+        return res
+    async with slots:
+        # the timeout covers this bank's own requests, not the wait for a free slot
+        t0 = time.perf_counter()
+        try:
+            pages = await asyncio.wait_for(
+                asyncio.gather(*(client.account_transactions(a["account_id"], page_size) for a in accounts)), timeout)
+            res["transactions"] = [r for recs in pages for r in recs]
+        except asyncio.TimeoutError:
+            res["status"], res["error"] = "timeout", f"no response within {timeout:g}s"
+        except (NebrasAPIError, OSError) as e:
+            res["status"], res["error"] = "error", str(e)
+        res["ms"] = (time.perf_counter() - t0) * 1000
+    return res
+
+async def _fetch_client(client, client_id, client_name, accounts, slots, timeout, page_size, with_transactions) -> dict:
+    t0 = time.perf_counter()
+    by_bank = {}
+    for a in accounts:
+        by_bank.setdefault(a.get("bank") or "Unknown", []).append(a)
+    banks = await asyncio.gather(*(_fetch_bank(client, bank, accts, slots, timeout, page_size, with_transactions)
+                                   for bank, accts in by_bank.items()))
+    return {
+        "client_id": client_id,
+        "client_name": client_name,
+        "banks": list(banks),
+        "complete": all(b["status"] == "ok" for b in banks),
+        "ms": (time.perf_counter() - t0) * 1000,
+    }
+
+async def fetch_clients_async(client: AsyncNebrasClient, clients, bank_timeout: float = DEFAULT_BANK_TIMEOUT,
+                              max_concurrency: int = DEFAULT_MAX_CONCURRENCY, page_size: int = DEFAULT_PAGE_SIZE,
+                              with_transactions: bool = True) -> dict:
+    """{client_id: result} for [(client_id, client_name)]; accounts come from bulk calls of BULK_CHUNK clients."""
+    clients = list(clients)
+    chunks = [clients[i:i + BULK_CHUNK] for i in range(0, len(clients), BULK_CHUNK)]
+    accounts, failed = {}, {}
+    listings = await asyncio.gather(*(client.bulk_accounts(c) for c in chunks), return_exceptions=True)
+    for chunk, listing in zip(chunks, listings):
+        if isinstance(listing, (NebrasAPIError, OSError, asyncio.TimeoutError)):
+            failed.update({cid: f"account listing failed: {listing}" for cid, _ in chunk})
+        elif isinstance(listing, BaseException):
+            raise listing
+        else:
+            accounts.update(listing)
+    slots = asyncio.Semaphore(max_concurrency)
+    results = await asyncio.gather(*(
+        _fetch_client(client, cid, name, accounts.get(cid, []), slots, bank_timeout, page_size, with_transactions)
+        for cid, name in clients))
+    for r in results:
+        if r["client_id"] in failed:
+            # reported like a failed bank, so callers show partial / missing data instead of crashing
+            r["banks"].append({"bank": "All banks", "status": "error", "ms": 0.0, "error": failed[r["client_id"]],
+                               "accounts": [], "transactions": []})
+            r["complete"] = False
+    return {r["client_id"]: r for r in results}
+
+def fetch_clients(clients, revalidate: bool = False, **kwargs) -> dict:
+    """Synchronous fetch_clients_async on the shared Nebras client (bulk mode for many clients)."""
+    return run_sync(fetch_clients_async, clients, revalidate=revalidate, **kwargs)
+
+def fetch_client(client_id: str, client_name: str = None, revalidate: bool = False, **kwargs) -> dict:
+    return fetch_clients([(client_id, client_name)], revalidate=revalidate, **kwargs)[client_id]
+
+def client_frames(result: dict):
+    """(transactions, accounts) DataFrames for one client result; accounts carry their bank's fetch status."""
+    frames = [pd.DataFrame(b["transactions"]).assign(bank=b["bank"]) for b in result["banks"] if b["transactions"]]
+    tx = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if "date" in tx.columns:
+        tx = tx.sort_values("date", kind="stable").reset_index(drop=True)
+    accounts = pd.json_normalize([{**a, "fetch_status": b["status"], "fetch_ms": round(b["ms"], 1)}
+                                  for b in result["banks"] for a in b["accounts"]])
+    return tx, accounts
+
+def bank_status(result: dict) -> pd.DataFrame:
+    return pd.DataFrame([{"Bank": b["bank"], "Accounts": len(b["accounts"]), "Transactions": len(b["transactions"]),
+                          "Status": b["status"], "ms": round(b["ms"], 1), "Error": b["error"] or ""}
+                         for b in result["banks"]])
@@ -0,0 +1,157 @@
+"""
+Next-best-action rule engine.
+
+Recommendations are declared as rules (conditions, recommendation, why, logic) instead of
+if-chains in each page. Conditions are (feature column, operator, value) tuples, all of which
+must hold; an empty list always holds (a default rule). A RuleSet compiles every rule into a
+vectorized predicate over a features table (one row per client), so the whole book is
+evaluated with a few column comparisons:
+
+    RuleSet.masks(features)      bool array [rule, row]
+    RuleSet.book(features, key)  every fired recommendation, one row per (client, rule)
+    RuleSet.first(features)      the first matching rule per client (segmentations, picks)
+
+Per-client views then look their rows up in the book instead of re-running the rules. As in
+checklist_rules, a condition on a missing feature column evaluates to False.
+"""
+import operator
+
+import numpy as np
+import pandas as pd
+
+_OPS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "in": lambda col, values: col.isin(values),
+    "contains": lambda col, text: col.astype(str).str.contains(text, regex=False),
+}
+
+OUTPUT_COLS = ["Recommendation", "Why", "Logic"]
+
+def _compile_rule(conditions):
+    for _, op, _ in conditions:
+        if op not in _OPS:
+            raise ValueError(f"Unknown rule operator: {op!r}")
+
+    def predicate(features: pd.DataFrame) -> np.ndarray:
+        ok = np.ones(len(features), dtype=bool)
+        for col, op, value in conditions:
+            if col not in features.columns:
+                return np.zeros(len(features), dtype=bool)
+            ok &= _OPS[op](features[col], value).fillna(False).to_numpy(dtype=bool)
+        return ok
+    return predicate
+
+class RuleSet:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self._predicates = [_compile_rule(conditions) for conditions, *_ in self.rules]
+        self._outputs = pd.DataFrame([r[1:] for r in self.rules], columns=OUTPUT_COLS)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def masks(self, features: pd.DataFrame) -> np.ndarray:
+        """[n_rules, n_rows] bool: which rule fires for which row."""
+        if not self.rules:
+            return np.zeros((0, len(features)), dtype=bool)
+        return np.vstack([p(features) for p in self._predicates])
+
+    def book(self, features: pd.DataFrame, key: str = None) -> pd.DataFrame:
+        """
+        All fired recommendations, ordered by row then rule: [key or row, rule, Recommendation,
+        Why, Logic]. key names a features column to carry as the client identifier.
+        """
+        rows, rules = np.nonzero(self.masks(features).T)
+        out = self._outputs.iloc[rules].reset_index(drop=True)
+        ident = features[key].to_numpy()[rows] if key else features.index.to_numpy()[rows]
+        out.insert(0, "rule", rules)
+        out.insert(0, key or "row", ident)
+        return out
+
+    def first(self, features: pd.DataFrame) -> pd.DataFrame:
+        """
+        One row per features row (same index): the first matching rule's outputs, or empty
+        strings and rule -1 when none matches.
+        """
+        m = self.masks(features)
+        hit = m.any(axis=0) if len(m) else np.zeros(len(features), dtype=bool)
+        rule = np.where(hit, m.argmax(axis=0) if len(m) else 0, -1)
+        padded = pd.concat([self._outputs, pd.DataFrame([[""] * len(OUTPUT_COLS)], columns=OUTPUT_COLS)],
+                           ignore_index=True)
+        out = padded.iloc[rule].set_axis(features.index)
+        out.insert(0, "rule", rule)
+        return out
+
+# =========================
+# Rule sets
+# =========================
+# Customer 360: features are the lifestyle table (data/client_lifestyle.csv)
+CUSTOMER_360_RULES = RuleSet([
+    ([("Medical Insurance", "==", "None")],
+     "Offer Medical & Critical Illness Plan", "No current medical insurance.", "Medical Insurance field = None"),
+    ([("Property Location", "in", ["Dubai Marina", "Abu Dhabi Saadiyat"])],
+     "Recommend Real Estate Investment or REIT", "High-value property location.", "Property > AED 3M in prime area"),
+    ([("Utility Bill", ">", 1000)],
+     "Offer Green Energy Efficiency Loan", "High electricity/water usage.", "Utility Bill > AED 1000"),
+    ([("Credit Card Activity", "contains", "Air Tickets")],
+     "Recommend Travel Insurance Add-on", "Frequent air ticket purchases detected.",
+     "'Air Tickets' in Credit Card Activity"),
+    ([("Nationality", "==", "UAE")],
+     "Suggest National Bonds or Waqf Savings", "Available only to UAE Nationals.", "Nationality = UAE"),
+])
+
+# Embedded payments: features from clients.json (monthly_income, num_products, owns_premium); first match wins
+PAYMENT_SEGMENT_RULES = RuleSet([
+    ([("monthly_income", ">", 40000), ("num_products", ">=", 3), ("owns_premium", "==", True)],
+     "High Net Worth", "Income, product holdings and vehicle ownership.",
+     "Income > AED 40K, 3+ products, premium car"),
+    ([("monthly_income", ">", 10000), ("num_products", ">=", 2)],
+     "Affluent", "Income and product holdings.", "Income > AED 10K, 2+ products"),
+    ([], "Mass", "Default segment.", "Otherwise"),
+])
+
+# Embedded payments: insurer pick by segment; first match wins
+INSURER_RULES = RuleSet([
+    ([("segment", "==", "High Net Worth")],
+     "Orient Insurance",
+     "You are classified as a High Net Worth client based on income, "
+     "product holdings, and vehicle ownership. Orient offers premium service quality.",
+     "Segment = High Net Worth"),
+    ([("segment", "==", "Affluent")],
+     "Orient Insurance",
+     "As an Affluent segment client, you would benefit from balanced coverage "
+     "and faster claims via Orient.",
+     "Segment = Affluent"),
+    ([],
+     "Noor Takaful",
+     "As a cost-conscious Mass segment client, Noor Takaful offers better value "
+     "for essential coverage.",
+     "Segment = Mass"),
+])
+
+# Wealth Manager Copilot: advice by risk bucket; features have a "risk" column
+WEALTH_RISK_RULES = RuleSet([
+    ([("risk", "==", "Low")], "Maintain diversified equity exposure, consider fixed income for stability.",
+     "Low risk profile.", "Risk = Low"),
+    ([("risk", "==", "Low")], "Explore long-term retirement planning and estate structuring.",
+     "Low risk profile.", "Risk = Low"),
+    ([("risk", "==", "Low")], "Review insurance cover to match luxury asset growth.",
+     "Low risk profile.", "Risk = Low"),
+    ([("risk", "==", "Medium")], "Increase allocation to bonds or market-neutral strategies.",
+     "Medium risk profile.", "Risk = Medium"),
+    ([("risk", "==", "Medium")], "Revisit FX exposure across remittance and investment flows.",
+     "Medium risk profile.", "Risk = Medium"),
+    ([("risk", "==", "Medium")], "Recommend partial hedging against rate volatility.",
+     "Medium risk profile.", "Risk = Medium"),
+    ([("risk", "==", "High")], "Reduce exposure to volatile instruments (crypto, small caps).",
+     "High risk profile.", "Risk = High"),
+    ([("risk", "==", "High")], "Recommend immediate portfolio rebalancing.",
+     "High risk profile.", "Risk = High"),
+    ([("risk", "==", "High")], "Suggest automated alerts and RM check-ins every 2 weeks.",
+     "High risk profile.", "Risk = High"),
+])
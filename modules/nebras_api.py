@@ -1,9 +1,236 @@
+"""
+Pooled async client for the Nebras Open Finance (AISP) API.
+
+AsyncNebrasClient keeps up to max_connections HTTP/1.1 keep-alive connections open and reuses
+them across requests; transaction endpoints are walked page by page through their cursors.
+get_account_summary() / get_transactions() are the synchronous entry points the Streamlit
+modules use: they run on one background event loop, so the pool survives between reruns.
+
+With a ResponseCache (of_cache), a fresh response is returned without touching the network and
+an expired one is revalidated with If-None-Match; the shared client caches up to
+NEBRAS_CACHE_MB (default 64) of responses, see cache_stats().
+
+NEBRAS_BASE_URL points at the API (e.g. http://127.0.0.1:8765 from `python -m
+modules.nebras_server`). When it is unset, the local stand-in is started in-process over data/;
+NEBRAS_LATENCY_MS and NEBRAS_BANK_LATENCY ("Mashreq=300,FAB=100") then set its simulated latency.
+"""
+import asyncio
+import contextvars
 import json
+import os
+import threading
+from urllib.parse import quote, urlencode, urlsplit
+
+from modules.of_cache import DEFAULT_MAX_BYTES, ResponseCache
+
+API_PREFIX = "/open-finance/v1"
+DEFAULT_PAGE_SIZE = 500
+
+# set for one run_sync call: cached responses are revalidated even when still fresh
+_force_revalidate = contextvars.ContextVar("nebras_force_revalidate", default=False)
+
+class NebrasAPIError(RuntimeError):
+    def __init__(self, status: int, body):
+        super().__init__(f"Nebras API returned {status}: {body}")
+        self.status = status
+        self.body = body
+
+# =========================
+# Async client
+# =========================
+class AsyncNebrasClient:
+    def __init__(self, base_url: str, max_connections: int = 8, timeout: float = 10.0, cache: ResponseCache = None):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.prefix = url.path.rstrip("/") or API_PREFIX
+        self.timeout = timeout
+        self.cache = cache
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle = []     # [(reader, writer)] keep-alive connections ready for reuse
+        self.stats = {"requests": 0, "connections_opened": 0, "reused": 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _connection(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.stats["reused"] += 1
+                return reader, writer, True
+            writer.close()
+        self.stats["connections_opened"] += 1
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return reader, writer, False
+
+    async def _roundtrip(self, reader, writer, target: str, etag: str = None):
+        validator = f"If-None-Match: {etag}\r\n" if etag else ""
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                     f"Accept: application/json\r\n{validator}Connection: keep-alive\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by server")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        return status, headers, json.loads(body) if body else None, len(body)
+
+    async def get(self, path: str, **params):
+        """GET prefix+path with query params; returns the decoded JSON body."""
+        query = urlencode({k: v for k, v in params.items() if v is not None}, doseq=True)
+        target = f"{self.prefix}{path}" + (f"?{query}" if query else "")
+        cached = None
+        if self.cache is not None and self.cache.ttl_for(target) > 0:
+            cached = self.cache.lookup(target, allow_fresh=not _force_revalidate.get())
+            if cached is not None and cached[2]:
+                return cached[0]
+        async with self._slots:
+            for attempt in range(2):
+                reader, writer, reused = await self._connection()
+                try:
+                    status, headers, body, nbytes = await asyncio.wait_for(
+                        self._roundtrip(reader, writer, target, cached[1] if cached else None), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused and attempt == 0:     # the server dropped an idle connection; retry on a fresh one
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                break
+            self.stats["requests"] += 1
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._idle.append((reader, writer))
+        if status == 304 and cached is not None:
+            self.cache.refresh(target)
+            return cached[0]
+        if status != 200:
+            raise NebrasAPIError(status, body)
+        if self.cache is not None and self.cache.ttl_for(target) > 0:
+            self.cache.store(target, body, headers.get("etag"), nbytes)
+        return body
+
+    async def iter_pages(self, path: str, page_size: int = DEFAULT_PAGE_SIZE, **params):
+        cursor = None
+        while True:
+            page = await self.get(path, page_size=page_size, cursor=cursor, **params)
+            yield page["data"]
+            cursor = page["links"]["next"]
+            if not cursor:
+                return
+
+    async def _collect(self, path: str, page_size: int, **params) -> list:
+        records = []
+        async for data in self.iter_pages(path, page_size, **params):
+            records.extend(data)
+        return records
+
+    async def account_summary(self, client_id: str, client_name: str = None) -> dict:
+        return await self.get(f"/clients/{quote(client_id, safe='')}/account-summary", name=client_name)
+
+    async def accounts(self, client_id: str, client_name: str = None) -> list:
+        return (await self.get(f"/clients/{quote(client_id, safe='')}/accounts", name=client_name))["data"]
+
+    async def client_transactions(self, client_id: str, client_name: str = None, page_size: int = DEFAULT_PAGE_SIZE) -> list:
+        return await self._collect(f"/clients/{quote(client_id, safe='')}/transactions", page_size, name=client_name)
+
+    async def account_transactions(self, account_id: str, page_size: int = DEFAULT_PAGE_SIZE) -> list:
+        return await self._collect(f"/accounts/{quote(account_id, safe='')}/transactions", page_size)
+
+    async def bulk_accounts(self, clients) -> dict:
+        """{client_id: [accounts]} for many (client_id, client_name) pairs in one request."""
+        clients = list(clients)
+        body = await self.get("/accounts", client_id=[c for c, _ in clients], name=[n or "" for _, n in clients])
+        return {row["client_id"]: row["accounts"] for row in body["data"]}
+
+    async def transactions_by_account(self, client_id: str, client_name: str = None, page_size: int = DEFAULT_PAGE_SIZE) -> list:
+        """Every account's transactions, fetched concurrently over the pool and concatenated."""
+        accts = await self.accounts(client_id, client_name)
+        pages = await asyncio.gather(*(self.account_transactions(a["account_id"], page_size) for a in accts))
+        return [r for recs in pages for r in recs]
+
+# =========================
+# Shared client for the Streamlit modules
+# =========================
+_lock = threading.Lock()
+_shared = {}    # "loop", "client", "server"
+
+def start_loop(name: str) -> asyncio.AbstractEventLoop:
+    """Event loop running forever on a daemon thread; shared singletons submit work to it."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name=name, daemon=True).start()
+    return loop
+
+async def _start_local_server(latency_ms: float, bank_latency_ms: dict):
+    from modules.nebras_server import NebrasServer
+    return await NebrasServer(latency_ms=latency_ms, bank_latency_ms=bank_latency_ms).start()
+
+def shared_client() -> AsyncNebrasClient:
+    """Process-wide client (and, without NEBRAS_BASE_URL, the in-process stand-in server)."""
+    with _lock:
+        if "client" not in _shared:
+            if "loop" not in _shared:
+                _shared["loop"] = start_loop("nebras-client")
+            loop = _shared["loop"]
+            base_url = os.environ.get("NEBRAS_BASE_URL")
+            if not base_url:
+                latency = float(os.environ.get("NEBRAS_LATENCY_MS", 0))
+                bank_latency = {}
+                for item in filter(None, os.environ.get("NEBRAS_BANK_LATENCY", "").split(",")):
+                    bank, _, ms = item.rpartition("=")
+                    bank_latency[bank.strip()] = float(ms)
+                server = asyncio.run_coroutine_threadsafe(_start_local_server(latency, bank_latency), loop).result()
+                _shared["server"] = server
+                base_url = f"http://127.0.0.1:{server.port}{API_PREFIX}"
+
+            cache = ResponseCache(int(float(os.environ.get("NEBRAS_CACHE_MB", DEFAULT_MAX_BYTES >> 20)) * (1 << 20)))
+
+            async def make():
+                return AsyncNebrasClient(base_url, cache=cache)
+            _shared["client"] = asyncio.run_coroutine_threadsafe(make(), loop).result()
+        return _shared["client"]
+
+def run_sync(coro_fn, *args, revalidate: bool = False, **kwargs):
+    """
+    Run coro_fn(shared client, ...) on the background loop and wait for the result.
+    revalidate=True turns every cache hit into a conditional request (use when the data is known to have changed).
+    """
+    client = shared_client()
+
+    async def call():
+        _force_revalidate.set(revalidate)
+        return await coro_fn(client, *args, **kwargs)
+    return asyncio.run_coroutine_threadsafe(call(), _shared["loop"]).result()
+
+def cache_stats() -> dict:
+    """Hit/miss/revalidation/eviction counters and size of the shared client's response cache."""
+    return shared_client().cache.stats
 
-def get_account_summary():
-    with open("data/account_summary.json") as f:
-        return json.load(f)
+def get_account_summary(client_id: str = "default", client_name: str = None) -> dict:
+    return run_sync(AsyncNebrasClient.account_summary, client_id, client_name)
 
-def get_transactions():
-    with open("data/transactions.json") as f:
-        return json.load(f)
+def get_transactions(client_id: str = "default", client_name: str = None, page_size: int = DEFAULT_PAGE_SIZE) -> list:
+    return run_sync(AsyncNebrasClient.client_transactions, client_id, client_name, page_size)
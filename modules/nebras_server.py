@@ -0,0 +1,296 @@
+"""
+Local stand-in for the Nebras Open Finance (AISP) API.
+
+A small asyncio HTTP/1.1 server over the files in data/, so request fan-out, keep-alive reuse
+and page sizes can be measured before the real API is wired in. Connections are kept alive
+until the client closes them; every response is delayed by a configurable latency.
+
+    GET /open-finance/v1/health
+    GET /open-finance/v1/clients/{client_id}/account-summary?name=
+    GET /open-finance/v1/clients/{client_id}/accounts?name=
+    GET /open-finance/v1/clients/{client_id}/transactions?name=&page_size=&cursor=
+    GET /open-finance/v1/accounts/{account_id}/transactions?page_size=&cursor=
+    GET /open-finance/v1/accounts?client_id=&name=&client_id=&name=...     (bulk: many clients per call)
+
+A client resolves to transactions_{id|slug}.json / account_summary_{id|slug}.json. The shared
+transactions.json / account_summary.json belong only to the account holder named in
+account_summary.json (trade_license_no / account_holder); any other client without files of its
+own has no data: empty account lists and 404 for its summary and transactions. Transaction
+pages are {"data": [...], "links": {"next": cursor or null}, "meta": {"total": n}}; the cursor
+is opaque to callers. Every response carries a content ETag; a request whose If-None-Match
+matches gets an empty 304, so clients can revalidate cached pages cheaply. Per-bank latency (--bank-latency Mashreq=300) is added to the account
+transaction endpoints of that bank's accounts, to simulate one slow bank behind the aggregator.
+
+    python -m modules.nebras_server --port 8765 --latency-ms 40 --jitter-ms 20 --bank-latency Mashreq=300
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import re
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+API_PREFIX = "/open-finance/v1"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+_ROUTES = [
+    ("health", re.compile(r"^/health$")),
+    ("summary", re.compile(r"^/clients/([^/]+)/account-summary$")),
+    ("accounts", re.compile(r"^/clients/([^/]+)/accounts$")),
+    ("client_tx", re.compile(r"^/clients/([^/]+)/transactions$")),
+    ("account_tx", re.compile(r"^/accounts/([^/]+)/transactions$")),
+    ("bulk_accounts", re.compile(r"^/accounts$")),
+]
+
+_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+def _slug(s: str) -> str:
+    return re.sub(r"[^A-Za-z0-9\-]+", "_", str(s)).strip("_")
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    if not raw.startswith("o:"):
+        raise ValueError("bad cursor")
+    return int(raw[2:])
+
+# =========================
+# Data
+# =========================
+class Dataset:
+    """Parsed data files, re-read only when their mtime/size changes."""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self._files = {}
+
+    def _json(self, path: Path):
+        st = path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        hit = self._files.get(path)
+        if hit is None or hit[0] != key:
+            hit = (key, json.loads(path.read_text(encoding="utf-8")))
+            self._files[path] = hit
+        return hit[1]
+
+    def resolve(self, client_id: str, name: str = None):
+        """
+        File key for a client: its id or name slug when a specific file exists, "" when it is the
+        holder of the shared files, else None (no data for this client).
+        """
+        for key in (client_id, _slug(name) if name else None):
+            if key and any((self.data_dir / f"{stem}_{key}.json").exists() for stem in ("transactions", "account_summary")):
+                return key
+        return "" if self.holds_shared(client_id, name) else None
+
+    def holds_shared(self, client_id: str, name: str = None) -> bool:
+        """Whether the client is the holder of the shared files (trade_license_no / account_holder)."""
+        holder = self.summary("")
+        return bool((holder.get("trade_license_no") and client_id == holder["trade_license_no"])
+                    or (name and name == holder.get("account_holder")))
+
+    def _path(self, stem: str, key: str) -> Path:
+        # a client's own file, or the shared one for its holder (key ""): never the shared file for anyone else
+        return self.data_dir / (f"{stem}_{key}.json" if key else f"{stem}.json")
+
+    def summary(self, key: str) -> dict:
+        path = self._path("account_summary", key)
+        return self._json(path) if path.exists() else {}
+
+    def accounts(self, key: str) -> list:
+        accts = self.summary(key).get("accounts", [])
+        return [{"account_id": a.get("iban") or f"{key or 'shared'}-{i}", **a} for i, a in enumerate(accts)]
+
+    def transactions(self, key: str) -> list:
+        """All transactions of a client; records without an account_id belong to its first account."""
+        path = self._path("transactions", key)
+        if not path.exists():
+            return []
+        records = self._json(path)
+        accts = self.accounts(key)
+        default = accts[0]["account_id"] if accts else None
+        if records and "account_id" not in records[0]:
+            for r in records:
+                r["account_id"] = r.get("iban") or default
+        return records
+
+    def find_account(self, account_id: str):
+        """(client file key, account) for an account id, or (None, None)."""
+        for path in sorted(self.data_dir.glob("account_summary*.json"), reverse=True):   # specific files before the shared one
+            key = path.stem[len("account_summary_"):] if path.stem != "account_summary" else ""
+            for a in self.accounts(key):
+                if a["account_id"] == account_id:
+                    return key, a
+        return None, None
+
+_local = {}
+
+def holds_shared_data(client_id: str, client_name: str = None, data_dir: Path = DATA_DIR) -> bool:
+    """Dataset.holds_shared() for in-process readers of data_dir, so they apply the server's ownership rule."""
+    data = _local.get(data_dir)
+    if data is None:
+        data = _local[data_dir] = Dataset(data_dir)
+    return data.holds_shared(client_id, client_name)
+
+def paginate(records: list, cursor: str = None, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+    start = decode_cursor(cursor) if cursor else 0
+    stop = start + page_size
+    return {
+        "data": records[start:stop],
+        "links": {"next": encode_cursor(stop) if stop < len(records) else None},
+        "meta": {"total": len(records)},
+    }
+
+# =========================
+# Server
+# =========================
+class NebrasServer:
+    def __init__(self, data_dir: Path = DATA_DIR, latency_ms: float = 0.0, jitter_ms: float = 0.0, bank_latency_ms: dict = None):
+        self.data = Dataset(data_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bank_latency_ms = bank_latency_ms or {}
+        self.stats = {"connections": 0, "requests": 0, "not_modified": 0}
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def route(self, method: str, target: str):
+        """(status, JSON body, bank serving the request or None) for one request."""
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}, None
+        url = urlsplit(target)
+        if not url.path.startswith(API_PREFIX):
+            return 404, {"error": f"unknown path {url.path}"}, None
+        path = url.path[len(API_PREFIX):]
+        q_all = parse_qs(url.query, keep_blank_values=True)
+        q = {k: v[-1] for k, v in q_all.items()}
+        try:
+            page_size = min(int(q.get("page_size", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+            if page_size < 1:
+                raise ValueError("page_size must be at least 1")
+            for name, pattern in _ROUTES:
+                m = pattern.match(path)
+                if not m:
+                    continue
+                arg = unquote(m.group(1)) if m.groups() else None
+                if name == "health":
+                    return 200, self.stats, None
+                if name == "bulk_accounts":
+                    ids, names = q_all.get("client_id", []), q_all.get("name", [])
+                    names = names + [""] * (len(ids) - len(names))
+                    keys = [self.data.resolve(cid, nm) for cid, nm in zip(ids, names)]
+                    return 200, {"data": [{"client_id": cid, "accounts": self.data.accounts(key) if key is not None else []}
+                                          for cid, key in zip(ids, keys)]}, None
+                if name == "account_tx":
+                    key, acct = self.data.find_account(arg)
+                    if key is None:
+                        return 404, {"error": f"unknown account {arg}"}, None
+                    records = [r for r in self.data.transactions(key) if r.get("account_id") == arg]
+                    return 200, paginate(records, q.get("cursor"), page_size), acct.get("bank")
+                key = self.data.resolve(arg, q.get("name"))
+                if key is None:
+                    if name == "accounts":
+                        return 200, {"data": []}, None
+                    return 404, {"error": f"no Open Finance data for client {arg}"}, None
+                if name == "summary":
+                    return 200, self.data.summary(key), None
+                if name == "accounts":
+                    return 200, {"data": self.data.accounts(key)}, None
+                return 200, paginate(self.data.transactions(key), q.get("cursor"), page_size), None
+        except ValueError as e:
+            return 400, {"error": str(e)}, None
+        return 404, {"error": f"unknown path {url.path}"}, None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = line.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                if int(headers.get("content-length", 0)):
+                    await reader.readexactly(int(headers["content-length"]))
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, body, bank = 400, {"error": "malformed request line"}, None
+                else:
+                    status, body, bank = self.route(parts[0], parts[1])
+                self.stats["requests"] += 1
+
+                delay = self.latency_ms + self.bank_latency_ms.get(bank, 0.0)
+                if self.jitter_ms:
+                    delay += random.uniform(0, self.jitter_ms)
+                if delay:
+                    await asyncio.sleep(delay / 1000)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                payload = json.dumps(body, default=str).encode()
+                etag = f'"{hashlib.sha1(payload).hexdigest()[:20]}"'
+                if status == 200 and headers.get("if-none-match") == etag:
+                    status, payload = 304, b""
+                    self.stats["not_modified"] += 1
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"ETag: {etag}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host: str, port: int, data_dir: Path, latency_ms: float, jitter_ms: float, bank_latency_ms: dict):
+    server = await NebrasServer(data_dir, latency_ms, jitter_ms, bank_latency_ms).start(host, port)
+    print(f"Nebras stand-in on http://{host}:{server.port}{API_PREFIX} (latency {latency_ms}ms ± {jitter_ms}ms)")
+    await server._server.serve_forever()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local Nebras Open Finance API stand-in")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--bank-latency", nargs="*", default=[], metavar="BANK=MS",
+                    help="extra latency for one bank's account endpoints, e.g. Mashreq=300")
+    args = ap.parse_args(argv)
+    bank_latency = {}
+    for item in args.bank_latency:
+        bank, _, ms = item.rpartition("=")
+        bank_latency[bank] = float(ms)
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir, args.latency_ms, args.jitter_ms, bank_latency))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Byte-budgeted TTL/LRU cache for Open Finance responses.
+
+Entries are decoded API responses keyed by request target, sized by their payload bytes and
+evicted least-recently-used first once the byte budget is exceeded. Each resource type has its
+own TTL (transactions change more often than account listings). A fresh entry is served with a
+dictionary lookup; an expired one is kept with its validator (ETag) so the caller can revalidate
+it cheaply and refresh() it on "not modified" instead of downloading the body again.
+
+    cache = ResponseCache(max_bytes=64 << 20)
+    cache.lookup(key) -> (value, etag, fresh) or None
+    cache.store(key, value, etag, nbytes); cache.refresh(key)
+    cache.stats -> hits / misses / revalidated / evictions / entries / bytes
+"""
+import re
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 << 20
+
+# (pattern on the request target, TTL seconds); first match wins
+DEFAULT_TTLS = [
+    (re.compile(r"/health"), 0.0),      # never cached
+    (re.compile(r"/transactions"), 30.0),
+    (re.compile(r"/account-summary"), 120.0),
+    (re.compile(r"/accounts"), 120.0),
+]
+DEFAULT_TTL = 60.0
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, ttls=None, default_ttl: float = DEFAULT_TTL, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self._entries = OrderedDict()   # key -> [value, etag, nbytes, expires_at]
+        self.bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+
+    def ttl_for(self, key: str) -> float:
+        for pattern, ttl in self.ttls:
+            if pattern.search(key):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: str, allow_fresh: bool = True):
+        """
+        (value, etag, fresh) for a cached key, else None. A fresh lookup counts as a hit;
+        allow_fresh=False reports every entry as stale so the caller revalidates it.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        fresh = allow_fresh and self.clock() < entry[3]
+        if fresh:
+            self.counters["hits"] += 1
+        return entry[0], entry[1], fresh
+
+    def refresh(self, key: str):
+        """The origin confirmed the cached value is current: restart its TTL."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[3] = self.clock() + self.ttl_for(key)
+            self.counters["revalidated"] += 1
+
+    def store(self, key: str, value, etag: str = None, nbytes: int = 0):
+        self.invalidate(key)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = [value, etag, nbytes, self.clock() + self.ttl_for(key)]
+        self.bytes += nbytes
+        while self.bytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.bytes -= old[2]
+            self.counters["evictions"] += 1
+
+    def invalidate(self, key: str = None):
+        """Drop one key, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+            self.bytes = 0
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[2]
+
+    @property
+    def stats(self) -> dict:
+        return {**self.counters, "entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes}
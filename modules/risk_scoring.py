@@ -0,0 +1,98 @@
+"""
+Vectorized Customer 360 risk scoring for the whole population.
+
+RISK_RULES is the single definition of the score: each rule has a bit, its points, a reason
+template and a comparison (field, operator, value or threshold). The same comparison evaluates
+a scalar field (one client on the page) or a whole column (every client in one pass). score_population()
+returns score, level and a uint8 bitmask of the rules that fired; reason strings are only
+built by reasons() for the rows actually shown.
+"""
+import operator
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_THRESHOLDS = {
+    "utility_bill": 1000,
+    "property_value": 3_000_000,
+    "bank_count": 4,
+}
+
+class Threshold(str):
+    """A rule value that names a thresholds entry instead of being a literal."""
+
+# (bit, points, reason template, field, operator, value); the bank_count field is passed separately
+RISK_RULES = [
+    (0, 2, "Expat profile (+2)", "Nationality", operator.eq, "Expat"),
+    (1, 2, "High utility bill (>AED {utility_bill}) (+2)", "Utility Bill", operator.gt, Threshold("utility_bill")),
+    (2, 2, "No medical insurance (+2)", "Medical Insurance", operator.eq, "None"),
+    (3, 1, "High property value (>AED {property_value_m:g}M) (+1)", "Property Value", operator.gt,
+     Threshold("property_value")),
+    (4, 1, "Fragmented holdings across {bank_count} banks (+1)", "bank_count", operator.ge, Threshold("bank_count")),
+]
+MAX_SCORE = sum(rule[1] for rule in RISK_RULES)
+
+LEVELS = np.array(["🟢 Low", "🟡 Moderate", "🔴 High"], dtype=object)
+LEVEL_EDGES = [2, 4]     # score <= 2 Low, <= 4 Moderate, else High
+
+def _thresholds(thresholds=None) -> dict:
+    th = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    th["property_value_m"] = th["property_value"] / 1e6
+    return th
+
+def score_population(lifestyle: pd.DataFrame, bank_counts, thresholds=None) -> pd.DataFrame:
+    """
+    One row per lifestyle row: score (int8), level and reason bitmask (uint8).
+    bank_counts is aligned with lifestyle (distinct banks per client).
+    """
+    th = _thresholds(thresholds)
+    cols = {
+        "Nationality": lifestyle["Nationality"].to_numpy(),
+        "Utility Bill": lifestyle["Utility Bill"].to_numpy(dtype=float),
+        "Medical Insurance": lifestyle["Medical Insurance"].to_numpy(),
+        "Property Value": lifestyle["Property Value"].to_numpy(dtype=float),
+        "bank_count": np.asarray(bank_counts),
+    }
+    n = len(lifestyle)
+    score = np.zeros(n, dtype=np.int8)
+    mask = np.zeros(n, dtype=np.uint8)
+    for bit, points, _, field, op, value in RISK_RULES:
+        fired = np.asarray(op(cols[field], th[value] if isinstance(value, Threshold) else value), dtype=bool)
+        score += np.int8(points) * fired
+        mask |= fired.astype(np.uint8) << np.uint8(bit)
+    level = np.searchsorted(LEVEL_EDGES, score, side="left")
+    return pd.DataFrame({
+        "score": score,
+        "level": pd.Categorical.from_codes(level, categories=LEVELS),
+        "reasons": mask,
+    }, index=lifestyle.index)
+
+def reasons(mask: int, thresholds=None) -> list:
+    """Reason strings for one bitmask, in rule order."""
+    th = _thresholds(thresholds)
+    return [template.format(**th) for bit, _, template, *_ in RISK_RULES if int(mask) >> bit & 1]
+
+_profile_rules = {}
+
+def _compiled_rules(thresholds=None) -> list:
+    """[(points, reason, field, operator, value)] with thresholds resolved and reasons formatted, per thresholds."""
+    key = tuple(sorted((thresholds or {}).items()))
+    hit = _profile_rules.get(key)
+    if hit is None:
+        if len(_profile_rules) >= 64:
+            _profile_rules.clear()
+        th = _thresholds(thresholds)
+        hit = _profile_rules[key] = [
+            (points, template.format(**th), field, op, th[value] if isinstance(value, Threshold) else value)
+            for _, points, template, field, op, value in RISK_RULES]
+    return hit
+
+def risk_profile(client_life, bank_count: int, thresholds=None):
+    """(score, level, reasons) for one client record (dict or Series); same rules as score_population."""
+    score, fired = 0, []
+    for points, reason, field, op, value in _compiled_rules(thresholds):
+        if op(bank_count if field == "bank_count" else client_life[field], value):
+            score += points
+            fired.append(reason)
+    return score, LEVELS[bisect_left(LEVEL_EDGES, score)], fired
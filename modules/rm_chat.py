@@ -0,0 +1,268 @@
+"""
+Streaming chat backend for the RM Copilot.
+
+One process-wide ChatBackend owns an AsyncOpenAI client on a background event loop, so every
+Streamlit session shares its connection pool and its limits: at most LLM_MAX_CONCURRENCY
+completions stream at once, up to LLM_MAX_QUEUE more wait their turn, and anything beyond
+that (or any API error before the first token) is answered by simulate_response() instead.
+stream_reply() is a plain generator of text chunks, ready for st.write_stream.
+
+The system prompt for a client (profile, risk breakdown, next-best actions for the RM role) is
+built once per client and risk category and reused for every message. Each request records
+its queue wait, time to first token and total time; see metrics_summary().
+
+LLM_BASE_URL points at any OpenAI-compatible endpoint (LLM_API_KEY / OPENAI_API_KEY, LLM_MODEL).
+When it is unset, the local stand-in (llm_stub) is started in-process; LLM_STUB_TTFT_MS and
+LLM_STUB_TOKEN_MS then set its simulated latency.
+"""
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from modules.client_registry import DEFAULT_ROLE
+from modules.nebras_api import start_loop
+
+ROLE_ACTIONS = {
+    "Private Banker / Wealth RM": [
+        "Offer Wealth Planning Review",
+        "Suggest Premium Takaful",
+        "Invite to Investment Seminar"
+    ],
+    "Loan Sales RM / Mortgage Specialist": [
+        "Promote Home Loan Balance Transfer",
+        "Offer Property Insurance",
+        "Discuss Repricing Options"
+    ],
+    "Remittance RM / FX Sales RM": [
+        "Offer FX Wallet",
+        "Promote Low-Fee Corridor Plan",
+        "Suggest Forward Contract"
+    ],
+    "Credit Card RM / Cards Product Manager": [
+        "Suggest Platinum Card Upgrade",
+        "Offer Cashback Optimization",
+        "Push Summer Travel Offer"
+    ],
+    "Bancassurance RM / Insurance Advisor": [
+        "Recommend Critical Illness Plan",
+        "Offer Term Life Coverage",
+        "Run Retirement Planning Tool"
+    ],
+    "Retail RM / Community RM": [
+        "Invite to Financial Fitness Workshop",
+        "Cross-sell Credit Card",
+        "Offer Digital Savings Goal Tracker"
+    ]
+}
+DEFAULT_ACTIONS = [
+    "Offer Wealth Management Plan",
+    "Suggest Takaful Insurance",
+    "Promote Visa Infinite Card"
+]
+
+HISTORY_TURNS = 6           # earlier chat messages sent along with the new one
+CONTEXT_CACHE_SIZE = 4096
+METRICS_WINDOW = 1000
+
+def simulate_response(client, risk):
+    """Canned reply: three of the role's actions and a one-line pitch."""
+    role = client.get("rm_role", DEFAULT_ROLE)
+    actions = ROLE_ACTIONS.get(role, DEFAULT_ACTIONS)
+
+    pick = random.sample(actions, 3)
+    pitch = f"Hi {client['name'].split()[0]}, our {pick[0]} could be ideal this month."
+    if risk == "High":
+        pitch += " (Further checks may apply due to high risk.)"
+
+    return f"Suggested Actions:\n- {pick[0]}\n- {pick[1]}\n- {pick[2]}\n\nPitch:\n\"{pitch}\""
+
+# =========================
+# Client context
+# =========================
+_contexts = OrderedDict()   # (client key, risk) -> system prompt; the key must identify the client across reloads
+_contexts_lock = threading.Lock()
+
+def build_context(client: dict, risk: str) -> str:
+    role = client.get("rm_role", DEFAULT_ROLE)
+    breakdown = client.get("risk_breakdown", {})
+    cars = ", ".join(f"{c['model']} ({c['fuel']}, {c['year']})" for c in client.get("cars", []))
+    actions = "\n".join(f"- {a}" for a in ROLE_ACTIONS.get(role, DEFAULT_ACTIONS))
+    return (
+        "You are an RM Copilot for a UAE bank. Answer the relationship manager briefly, "
+        "suggest up to three actions and a one-line pitch, and never invent products.\n\n"
+        f"Client: {client['name']}\n"
+        f"Segment: {client.get('segment', '')}\n"
+        f"Monthly income: AED {client.get('monthly_income', 0):,}\n"
+        f"Products: {', '.join(client.get('products', []))}\n"
+        f"Cars: {cars}\n"
+        f"RM role: {role}\n"
+        f"Risk category: {risk}\n"
+        "Risk breakdown: " + ", ".join(f"{k}={v}" for k, v in breakdown.items()) + "\n\n"
+        f"Next-best actions:\n{actions}\n"
+    )
+
+def client_context(key, client: dict, risk: str) -> str:
+    """
+    System prompt for a client, built on first use and cached by (key, risk). key must change
+    when the client it stands for does, e.g. (registry.version, client id).
+    """
+    with _contexts_lock:
+        prompt = _contexts.get((key, risk))
+        if prompt is not None:
+            _contexts.move_to_end((key, risk))
+            return prompt
+    prompt = build_context(client, risk)
+    with _contexts_lock:
+        _contexts[(key, risk)] = prompt
+        while len(_contexts) > CONTEXT_CACHE_SIZE:
+            _contexts.popitem(last=False)
+    return prompt
+
+# =========================
+# Backend
+# =========================
+class QueueFull(RuntimeError):
+    pass
+
+class ChatBackend:
+    def __init__(self, base_url: str, api_key: str, model: str, loop: asyncio.AbstractEventLoop,
+                 max_concurrency: int = 4, max_queue: int = 32, timeout: float = 30.0):
+        self.model = model
+        self.loop = loop
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.waiting = 0
+        self.in_flight = 0
+        self.metrics = deque(maxlen=METRICS_WINDOW)
+        self._slots = asyncio.run_coroutine_threadsafe(self._semaphore(max_concurrency), loop).result()
+        self._client = asyncio.run_coroutine_threadsafe(self._make_client(base_url, api_key, timeout), loop).result()
+
+    async def _semaphore(self, n):
+        return asyncio.Semaphore(n)
+
+    async def _make_client(self, base_url, api_key, timeout):
+        return AsyncOpenAI(base_url=base_url, api_key=api_key, timeout=timeout, max_retries=0)
+
+    async def _complete(self, messages: list, out: queue.Queue, record: dict):
+        if self.waiting >= self.max_queue:
+            raise QueueFull(f"{self.waiting} chat requests already queued")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            record["queue_wait_ms"] = (time.perf_counter() - record["t0"]) * 1000
+            stream = await self._client.chat.completions.create(model=self.model, messages=messages, stream=True)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if "ttft_ms" not in record:
+                        record["ttft_ms"] = (time.perf_counter() - record["t0"]) * 1000
+                    record["chunks"] += 1
+                    out.put(delta)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def _run(self, messages: list, out: queue.Queue, record: dict):
+        try:
+            await asyncio.wait_for(self._complete(messages, out, record), self.timeout)
+        except Exception as exc:            # reported to the reader, which falls back
+            out.put(exc)
+        finally:
+            out.put(None)
+
+    def stream(self, messages: list, fallback=None):
+        """
+        Yield the reply's text chunks as they arrive. When the request is rejected or fails
+        before its first token, yield fallback() instead (if given). Closing the generator
+        cancels the request.
+        """
+        record = {"t0": time.perf_counter(), "chunks": 0, "fallback": False, "error": None}
+        out = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._run(messages, out, record), self.loop)
+        try:
+            while True:
+                item = out.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    record["error"] = f"{type(item).__name__}: {item}"
+                    if record["chunks"] == 0 and fallback is not None:
+                        record["fallback"] = True
+                        yield fallback()
+                    continue
+                yield item
+        finally:
+            future.cancel()
+            record["total_ms"] = (time.perf_counter() - record.pop("t0")) * 1000
+            self.metrics.append(record)
+
+    def metrics_summary(self) -> dict:
+        recent = list(self.metrics)
+        ttft = [r["ttft_ms"] for r in recent if "ttft_ms" in r]
+        wait = [r["queue_wait_ms"] for r in recent if "queue_wait_ms" in r]
+        pct = lambda xs, q: float(np.percentile(xs, q)) if xs else None
+        return {
+            "requests": len(recent),
+            "fallbacks": sum(r["fallback"] for r in recent),
+            "errors": sum(r["error"] is not None for r in recent),
+            "in_flight": self.in_flight,
+            "queued": self.waiting,
+            "ttft_p50_ms": pct(ttft, 50),
+            "ttft_p95_ms": pct(ttft, 95),
+            "queue_wait_p50_ms": pct(wait, 50),
+            "queue_wait_p95_ms": pct(wait, 95),
+        }
+
+# =========================
+# Shared backend for the Streamlit modules
+# =========================
+_lock = threading.Lock()
+_shared = {}    # "loop", "backend", "server"
+
+async def _start_local_stub(ttft_ms: float, token_ms: float):
+    from modules.llm_stub import LLMStubServer
+    return await LLMStubServer(ttft_ms, token_ms).start()
+
+def shared_backend() -> ChatBackend:
+    """Process-wide backend (and, without LLM_BASE_URL, the in-process stand-in)."""
+    with _lock:
+        if "backend" not in _shared:
+            if "loop" not in _shared:
+                _shared["loop"] = start_loop("rm-chat")
+            loop = _shared["loop"]
+            base_url = os.environ.get("LLM_BASE_URL")
+            if not base_url:
+                server = asyncio.run_coroutine_threadsafe(_start_local_stub(
+                    float(os.environ.get("LLM_STUB_TTFT_MS", 0)), float(os.environ.get("LLM_STUB_TOKEN_MS", 0))), loop).result()
+                _shared["server"] = server
+                base_url = f"http://127.0.0.1:{server.port}/v1"
+            _shared["backend"] = ChatBackend(
+                base_url,
+                api_key=os.environ.get("LLM_API_KEY") or os.environ.get("OPENAI_API_KEY") or "local",
+                model=os.environ.get("LLM_MODEL", "rm-copilot-stub"),
+                loop=loop,
+                max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 4)),
+                max_queue=int(os.environ.get("LLM_MAX_QUEUE", 32)),
+                timeout=float(os.environ.get("LLM_TIMEOUT", 30)),
+            )
+        return _shared["backend"]
+
+def stream_reply(client_key, client: dict, risk: str, history: list, question: str):
+    """Text chunks of the copilot's answer to question about client, for st.write_stream."""
+    messages = [{"role": "system", "content": client_context(client_key, client, risk)},
+                *history[-HISTORY_TURNS:], {"role": "user", "content": question}]
+    return shared_backend().stream(messages, fallback=lambda: simulate_response(client, risk))
+
+def metrics_summary() -> dict:
+    return shared_backend().metrics_summary()
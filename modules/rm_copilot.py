@@ -1,38 +1,40 @@
 import streamlit as st
-import json
 import random
 
-# Simulated high-risk corridors and PEP names
-HIGH_RISK_COUNTRIES = ["Iran", "Sudan", "North Korea", "Yemen", "Syria"]
-SIMULATED_PEP_LIST = ["Ahmed Al Falasi", "Zahra Mansoor", "Javed Qureshi"]
+from modules import rm_chat
+from modules.aml_monitor import HIGH_RISK_COUNTRIES
+from modules.client_registry import DEFAULT_ROLE, load_client_registry
+from modules.screening import load_screener
+
+# Simulated corridors use the AML monitor's high-risk list; PEP / sanctions names come from data/watchlist.csv
 
 def run_rm_copilot():
     st.header("🧠 RM Copilot and Chatbot")
 
-    with open("data/clients.json") as f:
-        clients = json.load(f)
+    # Shared, read-only client book; the session only keeps the selected ids
+    registry = load_client_registry()
 
     # Step 1: Select RM Role
-    roles = sorted(set(client.get("rm_role", "General RM") for client in clients))
-    selected_role = st.selectbox("Step 1: Select RM Role", roles)
+    selected_role = st.selectbox("Step 1: Select RM Role", registry.roles)
 
     # Step 2: Select client based on role
-    filtered_clients = [c for c in clients if c.get("rm_role") == selected_role]
-    client_names = [client["name"] for client in filtered_clients]
+    client_ids = registry.ids_for_role(selected_role)
 
-    if not client_names:
+    if not len(client_ids):
         st.warning("No clients found for this RM role.")
         return
 
-    selected_name = st.selectbox("Step 2: Select a Client", client_names)
-    client = next((c for c in filtered_clients if c["name"] == selected_name), None)
+    selected_id = st.selectbox("Step 2: Select a Client", client_ids.tolist(), format_func=registry.names.__getitem__)
+    client = registry.record(selected_id)
+    # ids are positions in clients.json, so a reloaded book must not reuse another client's prompt or chat
+    client_key = (registry.version, selected_id)
 
     # --- Client Profile ---
     st.subheader("📋 Client Profile")
     st.write(f"**Name:** {client['name']}")
     st.write(f"**Income:** AED {client['monthly_income']:,}")
     st.write(f"**Segment:** {client['segment']}")
-    st.write(f"**RM Role:** {client.get('rm_role', 'General RM')}")
+    st.write(f"**RM Role:** {client.get('rm_role', DEFAULT_ROLE)}")
     st.write(f"**Products:** {', '.join(client['products'])}")
     st.write("**Cars:**")
     for car in client["cars"]:
@@ -45,7 +47,9 @@ def run_rm_copilot():
     product_score = client.get("risk_breakdown", {}).get("product_mix_score", 3)
     fx_country = random.choice(HIGH_RISK_COUNTRIES + ["India", "UK", "Philippines"])
     fx_score = 5 if fx_country in HIGH_RISK_COUNTRIES else 2
-    is_pep = client["name"] in SIMULATED_PEP_LIST
+    # fuzzy, transliteration-aware match against the indexed watchlist
+    watch_hits = load_screener().screen(client["name"])
+    is_pep = not watch_hits.empty
     pep_score = 10 if is_pep else 0
     credit_sim = random.randint(550, 850)
     credit_score = 1 if credit_sim > 800 else 3 if credit_sim > 650 else 5
@@ -68,71 +72,32 @@ def run_rm_copilot():
 
     ### 🧮 Total Risk Score: {total_score} → **{risk_cat} Risk**
     """)
+    if is_pep:
+        with st.expander("🔎 Watchlist candidates"):
+            st.dataframe(watch_hits, use_container_width=True)
 
     # --- Chatbot Section ---
     st.divider()
     st.subheader("💬 Ask the RM Copilot")
 
-    if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+    # one conversation per client: another client's questions are never sent with this one's
+    if "chat_histories" not in st.session_state:
+        st.session_state.chat_histories = {}
+    history = st.session_state.chat_histories.setdefault(client_key, [])
+
+    for msg in history:
+        speaker = "user" if msg["role"] == "user" else "assistant"
+        st.chat_message(speaker).write(msg["content"])
 
     user_input = st.chat_input("Ask anything about this client...")
 
     if user_input:
-        st.session_state.chat_history.append({"role": "user", "content": user_input})
-
-        def simulate_response(client, risk):
-            role = client.get("rm_role", "General RM")
-
-            suggestions = {
-                "Private Banker / Wealth RM": [
-                    "Offer Wealth Planning Review",
-                    "Suggest Premium Takaful",
-                    "Invite to Investment Seminar"
-                ],
-                "Loan Sales RM / Mortgage Specialist": [
-                    "Promote Home Loan Balance Transfer",
-                    "Offer Property Insurance",
-                    "Discuss Repricing Options"
-                ],
-                "Remittance RM / FX Sales RM": [
-                    "Offer FX Wallet",
-                    "Promote Low-Fee Corridor Plan",
-                    "Suggest Forward Contract"
-                ],
-                "Credit Card RM / Cards Product Manager": [
-                    "Suggest Platinum Card Upgrade",
-                    "Offer Cashback Optimization",
-                    "Push Summer Travel Offer"
-                ],
-                "Bancassurance RM / Insurance Advisor": [
-                    "Recommend Critical Illness Plan",
-                    "Offer Term Life Coverage",
-                    "Run Retirement Planning Tool"
-                ],
-                "Retail RM / Community RM": [
-                    "Invite to Financial Fitness Workshop",
-                    "Cross-sell Credit Card",
-                    "Offer Digital Savings Goal Tracker"
-                ]
-            }
-
-            actions = suggestions.get(role, [
-                "Offer Wealth Management Plan",
-                "Suggest Takaful Insurance",
-                "Promote Visa Infinite Card"
-            ])
-
-            pick = random.sample(actions, 3)
-            pitch = f"Hi {client['name'].split()[0]}, our {pick[0]} could be ideal this month."
-            if risk == "High":
-                pitch += " (Further checks may apply due to high risk.)"
-
-            return f"Suggested Actions:\n- {pick[0]}\n- {pick[1]}\n- {pick[2]}\n\nPitch:\n\"{pitch}\""
-
-        result = simulate_response(client, risk_cat)
-        st.session_state.chat_history.append({"role": "assistant", "content": result})
-
-    for msg in st.session_state.chat_history:
-        speaker = "user" if msg["role"] == "user" else "assistant"
-        st.chat_message(speaker).write(msg["content"])
+        st.chat_message("user").write(user_input)
+        with st.chat_message("assistant"):
+            # streamed from the shared backend; its canned reply stands in when the model is busy or down
+            result = st.write_stream(rm_chat.stream_reply(client_key, client, risk_cat, history, user_input))
+        history.append({"role": "user", "content": user_input})
+        history.append({"role": "assistant", "content": result})
+
+    with st.expander("⏱ Copilot latency (all sessions)"):
+        st.json(rm_chat.metrics_summary())
@@ -0,0 +1,234 @@
+"""
+PEP / sanctions name screening.
+
+A watchlist (data/watchlist.csv: entry_id, name, list, country, category; one row per name or
+alias) is indexed once. Names are normalized before anything else: case and punctuation are
+dropped, the Arabic article (Al / El / Ul, also as "al-") is removed, and common transliteration
+variants are mapped to one spelling (Mohammed / Muhammad / Mohamed -> muhammad, Abdel -> abdul,
+Yousef / Yusuf -> yusuf, ...). Each name is then indexed two ways:
+
+- character trigrams of the whole normalized name
+- a phonetic key per token (vowels and doubled letters dropped, kh/q -> k, sh -> s, ...)
+
+screen(name) counts, per entry, the trigrams and phonetic keys it shares with the query (one
+np.bincount over the posting lists, very common keys skipped), scores only the best candidates
+exactly and returns those at or above the threshold. screen_book() runs the same over a list
+of names in a process pool, each worker building the index once.
+
+    screener = load_screener()
+    screener.screen("Mohamed Youssef Tikriti")     # -> DataFrame of candidates with scores
+    python -m modules.screening --out hits.csv --workers 8
+"""
+import argparse
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+WATCHLIST_PATH = DATA_DIR / "watchlist.csv"
+DEFAULT_THRESHOLD = 0.80
+
+PARTICLES = {"al", "el", "ul"}
+# transliteration variants -> one spelling (applied per token, before the phonetic key)
+VARIANTS = {
+    "mohammed": "muhammad", "mohammad": "muhammad", "mohamed": "muhammad", "mohamad": "muhammad",
+    "muhammed": "muhammad", "mohammod": "muhammad", "mhd": "muhammad", "md": "muhammad",
+    "ahmed": "ahmad", "ahmet": "ahmad",
+    "abdel": "abdul", "abdal": "abdul", "abdoul": "abdul", "abd": "abdul",
+    "abdalla": "abdullah", "abdulla": "abdullah", "abdallah": "abdullah",
+    "yousef": "yusuf", "youssef": "yusuf", "yousif": "yusuf", "yusef": "yusuf", "yousuf": "yusuf",
+    "hussein": "husayn", "hussain": "husayn", "husain": "husayn", "hosein": "husayn",
+    "khaled": "khalid", "omer": "omar", "umar": "omar", "usama": "osama",
+    "saeed": "said", "sayed": "said", "sayyid": "said", "eid": "id",
+    "ibn": "bin", "ben": "bin",
+    "fatma": "fatima", "fatimah": "fatima", "layla": "laila", "leila": "laila",
+    "nour": "noor", "nur": "noor",
+}
+_DIGRAPHS = [("kh", "k"), ("gh", "g"), ("sh", "s"), ("th", "t"), ("dh", "d"), ("ph", "f"), ("ck", "k"),
+             ("q", "k"), ("ou", "u"), ("oo", "u"), ("ee", "i"), ("ie", "i"), ("ei", "i"), ("y", "i"), ("w", "u")]
+_VOWELS = set("aeiou")
+
+TOP_CANDIDATES = 50     # exactly scored per query
+MAX_POSTING_SHARE = 0.05    # keys on more than this share of entries are skipped when counting
+
+# =========================
+# Normalization
+# =========================
+def tokens(name) -> list:
+    """Normalized tokens: ascii, lower case, particles dropped, variants unified."""
+    s = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode().casefold()
+    s = re.sub(r"\b(al|el|ul)-", " ", s)
+    out = []
+    for t in re.findall(r"[a-z]+", s):
+        if t in PARTICLES:
+            continue
+        out.append(VARIANTS.get(t, t))
+    return out
+
+def phonetic(token: str) -> str:
+    """First letter (any vowel -> a) plus the consonant skeleton, doubled letters collapsed."""
+    if not token:
+        return ""
+    t = token
+    for a, b in _DIGRAPHS:
+        t = t.replace(a, b)
+    head = "a" if t[0] in _VOWELS else t[0]
+    key = [head]
+    for ch in t[1:]:
+        if ch not in _VOWELS and ch != key[-1]:
+            key.append(ch)
+    return "".join(key)
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+def name_score(q_tokens: list, e_tokens: list) -> float:
+    """
+    Similarity in [0, 1]: the better of whole-name trigram overlap and token alignment (exact
+    normalized token 1.0, same phonetic key 0.9, else token trigram overlap when >= 0.6).
+    """
+    if not q_tokens or not e_tokens:
+        return 0.0
+    char = _dice(trigrams(" ".join(q_tokens)), trigrams(" ".join(e_tokens)))
+    e_keys = [phonetic(t) for t in e_tokens]
+    matched = 0.0
+    for t in q_tokens:
+        key, best = phonetic(t), 0.0
+        for et, ek in zip(e_tokens, e_keys):
+            if t == et:
+                best = 1.0
+                break
+            if key == ek:
+                best = max(best, 0.9)
+            else:
+                d = _dice(trigrams(t), trigrams(et))
+                if d >= 0.6:
+                    best = max(best, d)
+        matched += best
+    return max(char, 2 * matched / (len(q_tokens) + len(e_tokens)))
+
+# =========================
+# Index
+# =========================
+class Screener:
+    def __init__(self, watchlist: pd.DataFrame, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.entries = watchlist.reset_index(drop=True)
+        self._tokens = [tokens(n) for n in self.entries["name"].astype(str)]
+        postings = {}
+        for i, toks in enumerate(self._tokens):
+            keys = {f"#{phonetic(t)}" for t in toks} | trigrams(" ".join(toks))
+            for k in keys:
+                postings.setdefault(k, []).append(i)
+        self._postings = {k: np.array(v, dtype=np.int32) for k, v in postings.items()}
+        self._common_above = max(50, int(MAX_POSTING_SHARE * len(self.entries)))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def candidates(self, q_tokens: list) -> np.ndarray:
+        """Entry rows sharing the most keys with the query (phonetic keys weigh 3 trigrams)."""
+        keys = [(k, 1.0) for k in trigrams(" ".join(q_tokens))] + [(f"#{phonetic(t)}", 3.0) for t in q_tokens]
+        hits = [(self._postings[k], w) for k, w in keys if k in self._postings]
+        hits = [(p, w) for p, w in hits if len(p) <= self._common_above] or hits
+        if not hits:
+            return np.zeros(0, dtype=np.int32)
+        ids = np.concatenate([p for p, _ in hits])
+        weights = np.concatenate([np.full(len(p), w) for p, w in hits])
+        counts = np.bincount(ids, weights=weights, minlength=len(self.entries))
+        nonzero = np.flatnonzero(counts)
+        if len(nonzero) > TOP_CANDIDATES:
+            nonzero = nonzero[np.argpartition(counts[nonzero], -TOP_CANDIDATES)[-TOP_CANDIDATES:]]
+        return nonzero
+
+    def screen(self, name, threshold: float = None) -> pd.DataFrame:
+        """Watchlist entries matching name at or above threshold, best first (one row per entry_id)."""
+        threshold = self.threshold if threshold is None else threshold
+        q = tokens(name)
+        rows = self.candidates(q)
+        scores = np.array([name_score(q, self._tokens[i]) for i in rows])
+        keep = scores >= threshold
+        out = self.entries.iloc[rows[keep]].assign(score=np.round(scores[keep], 3))
+        out = out.sort_values("score", ascending=False, kind="stable")
+        if "entry_id" in out.columns:
+            out = out.drop_duplicates("entry_id")
+        return out.reset_index(drop=True)
+
+def read_watchlist(path: Path = WATCHLIST_PATH) -> pd.DataFrame:
+    if not path.exists():
+        return pd.DataFrame(columns=["entry_id", "name", "list", "country", "category"])
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+_cache = {}
+
+def load_screener(path: Path = WATCHLIST_PATH) -> Screener:
+    """Process-wide screener, rebuilt only when the watchlist file changes."""
+    key = (path.stat().st_mtime_ns, path.stat().st_size) if path.exists() else None
+    hit = _cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    screener = Screener(read_watchlist(path))
+    _cache[path] = (key, screener)
+    return screener
+
+# =========================
+# Batch screening
+# =========================
+_worker = {}
+
+def _init_worker(path: Path, threshold: float):
+    _worker["screener"] = Screener(read_watchlist(path), threshold)
+
+def _screen_chunk(names: list) -> list:
+    screener = _worker["screener"]
+    rows = []
+    for name in names:
+        for hit in screener.screen(name).to_dict("records"):
+            rows.append({"client_name": name, **hit})
+    return rows
+
+def screen_book(names, path: Path = WATCHLIST_PATH, threshold: float = DEFAULT_THRESHOLD,
+                max_workers: int = None, chunksize: int = None) -> pd.DataFrame:
+    """One row per (client name, matching watchlist entry) across the whole book."""
+    names = list(dict.fromkeys(names))
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(names) // (max_workers * 4))
+    chunks = [names[i:i + chunksize] for i in range(0, len(names), chunksize)]
+    if max_workers == 1:
+        _init_worker(path, threshold)
+        parts = [_screen_chunk(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(path, threshold)) as pool:
+            parts = list(pool.map(_screen_chunk, chunks))
+    rows = [r for part in parts for r in part]
+    cols = ["client_name", *read_watchlist(path).columns, "score"]
+    return pd.DataFrame(rows, columns=cols)
+
+def main(argv=None):
+    from modules.client_registry import load_client_registry
+
+    ap = argparse.ArgumentParser(description="Screen the client book against a PEP / sanctions watchlist")
+    ap.add_argument("--watchlist", type=Path, default=WATCHLIST_PATH)
+    ap.add_argument("--out", type=Path, default=DATA_DIR / "batch" / "screening_hits.csv")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    names = load_client_registry().names
+    hits = screen_book(names, args.watchlist, args.threshold, args.workers)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    hits.to_csv(args.out, index=False)
+    print(f"Screened {len(set(names))} clients: {hits['client_name'].nunique()} with hits -> {args.out}")
+
+if __name__ == "__main__":
+    main()
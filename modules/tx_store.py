@@ -0,0 +1,169 @@
+"""
+Columnar on-disk transaction store, partitioned by client and month.
+
+Each client gets one directory of NumPy column files sorted by date; index.json records the
+[start, stop) row range of every month, so a month partition is a slice of the client's columns.
+Columns are opened with mmap_mode="r": reading the last N months is one contiguous slice per
+column, with no JSON parsing and no copy of the numeric data.
+
+    data/tx_store/index.json                 client_id -> {"name", "dir", "rows", "months": {"YYYY-MM": [start, stop]}}
+    data/tx_store/<client slug>/{date,amount,description,counterparty,type,currency}.npy
+
+    python -m modules.tx_store import        # convert data/transactions*.json|csv into the store
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from modules.lending_assistant import (
+    DATA_DIR,
+    _slug,
+    normalize_tx,
+    obligors_from_mbp,
+    read_df_csv,
+    read_df_json,
+)
+
+STORE_DIR = DATA_DIR / "tx_store"
+COLUMNS = ["date", "amount", "description", "counterparty", "type", "currency"]
+_STR_COLUMNS = ["description", "counterparty", "type", "currency"]
+
+_index_cache = {}
+
+# =========================
+# Index
+# =========================
+def read_index(store: Path = STORE_DIR) -> dict:
+    """index.json contents, re-read only when the file changes."""
+    path = store / "index.json"
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return {"clients": {}}
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _index_cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    idx = json.loads(path.read_text(encoding="utf-8"))
+    _index_cache[path] = (key, idx)
+    return idx
+
+def _write_index(idx: dict, store: Path):
+    tmp = store / "index.json.tmp"
+    tmp.write_text(json.dumps(idx, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, store / "index.json")
+
+def has_client(client_id: str, store: Path = STORE_DIR) -> bool:
+    return str(client_id) in read_index(store)["clients"]
+
+# =========================
+# Read / write
+# =========================
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if c == "date" else float if c == "amount" else object)
+                         for c in COLUMNS})
+
+def _open_columns(store: Path, entry: dict) -> dict:
+    cdir = store / entry["dir"]
+    return {c: np.load(cdir / f"{c}.npy", mmap_mode="r") for c in COLUMNS}
+
+def load_client_months(client_id: str, months: int = 6, store: Path = STORE_DIR) -> pd.DataFrame:
+    """The client's most recent `months` months (all if 0) as a frame over memory-mapped columns."""
+    entry = read_index(store)["clients"].get(str(client_id))
+    if not entry or not entry["months"]:
+        return _empty_frame()
+    keys = sorted(entry["months"])
+    keys = keys[-months:] if months else keys
+    start, stop = entry["months"][keys[0]][0], entry["months"][keys[-1]][1]
+    cols = _open_columns(store, entry)
+    return pd.DataFrame({c: a[start:stop] for c, a in cols.items()}, copy=False)
+
+def write_client_tx(client_id: str, client_name: str, tx: pd.DataFrame, store: Path = STORE_DIR) -> dict:
+    """
+    Write a normalized transaction frame for one client. Months present in `tx` replace the
+    stored partitions for those months; other stored months are kept.
+    """
+    store.mkdir(parents=True, exist_ok=True)
+    idx = read_index(store)
+    idx = {"clients": dict(idx.get("clients", {}))}
+    entry = idx["clients"].get(str(client_id)) or {"name": client_name, "dir": _slug(client_id), "months": {}}
+    tx = tx.loc[tx["date"].notna(), COLUMNS]
+    new_months = set(tx["date"].dt.to_period("M").astype(str))
+    kept = [m for m in entry["months"] if m not in new_months]
+    if kept:
+        old = load_client_months(client_id, months=0, store=store)
+        old = old[old["date"].dt.to_period("M").astype(str).isin(kept)]
+        tx = pd.concat([old, tx], ignore_index=True)
+    tx = tx.sort_values("date", kind="stable").reset_index(drop=True)
+
+    month_key = tx["date"].dt.to_period("M").astype(str).to_numpy()
+    months = {}
+    if len(tx):
+        bounds = np.flatnonzero(np.r_[True, month_key[1:] != month_key[:-1], True])
+        months = {str(month_key[a]): [int(a), int(b)] for a, b in zip(bounds[:-1], bounds[1:])}
+
+    cdir = store / entry["dir"]
+    cdir.mkdir(parents=True, exist_ok=True)
+    # written to temp names first: readers may still hold maps of the current files
+    arrays = {
+        "date": tx["date"].to_numpy(dtype="datetime64[ns]"),
+        "amount": tx["amount"].to_numpy(dtype=np.float64),
+        **{c: tx[c].fillna("").astype(str).to_numpy(dtype=str) for c in _STR_COLUMNS},
+    }
+    for c, arr in arrays.items():
+        tmp = cdir / f"{c}.tmp.npy"
+        np.save(tmp, arr)
+        os.replace(tmp, cdir / f"{c}.npy")
+    entry = {"name": entry["name"], "dir": entry["dir"], "rows": int(len(tx)), "months": months}
+    idx["clients"][str(client_id)] = entry
+    _write_index(idx, store)
+    return entry
+
+# =========================
+# Importer
+# =========================
+def _read_tx_file(path: Path) -> pd.DataFrame:
+    return read_df_csv(path) if path.suffix == ".csv" else read_df_json(path)
+
+def import_data_dir(data_dir: Path = None, store: Path = STORE_DIR) -> dict:
+    """
+    Convert the JSON/CSV transaction files in data/ into the store.
+    Client-specific files (transactions_{id|slug}.json/.csv) go under their obligor; the shared
+    transactions.json goes under the account holder named in account_summary.json.
+    Returns {client_id: rows imported}.
+    """
+    data_dir = data_dir or DATA_DIR
+    obligors = obligors_from_mbp(read_df_csv(data_dir / "multi_bank_profile.csv"))
+    imported = {}
+    for name, cid in obligors:
+        for stem in (f"transactions_{cid}", f"transactions_{_slug(name)}"):
+            src = next((data_dir / f"{stem}{ext}" for ext in (".json", ".csv") if (data_dir / f"{stem}{ext}").exists()), None)
+            if src is None:
+                continue
+            tx = normalize_tx(_read_tx_file(src))
+            if not tx.empty:
+                write_client_tx(cid, name, tx, store)
+                imported[cid] = len(tx)
+                break
+    shared = data_dir / "transactions.json"
+    acct_path = data_dir / "account_summary.json"
+    if shared.exists() and acct_path.exists():
+        acct = json.loads(acct_path.read_text(encoding="utf-8"))
+        cid = acct.get("trade_license_no")
+        if cid and cid not in imported:
+            tx = normalize_tx(_read_tx_file(shared))
+            if not tx.empty:
+                write_client_tx(cid, acct.get("account_holder", cid), tx, store)
+                imported[cid] = len(tx)
+    return imported
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["import"]:
+        done = import_data_dir()
+        print(f"Imported {sum(done.values())} transactions for {len(done)} clients into {STORE_DIR}")
+    else:
+        print("usage: python -m modules.tx_store import")
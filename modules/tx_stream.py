@@ -0,0 +1,172 @@
+"""
+Streaming ingestion for Open Finance transaction files.
+
+AISP pulls for large corporates can run to millions of rows, so instead of pd.read_json on
+the whole file these helpers read JSON arrays or NDJSON in bounded-size chunks, push each
+chunk through normalize_tx and fold it into running monthly totals. Peak memory is one
+chunk plus one row per month, however long the history is.
+"""
+import json
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from modules.fx_history import convert_to_aed, load_fx_history, unconverted_currencies
+from modules.lending_assistant import (
+    LOAN_HINT_RE,
+    bounced_mask,
+    detect_external_loans,
+    inflow_volatility,
+    normalize_tx,
+)
+
+DEFAULT_CHUNK_ROWS = 50_000
+_READ_BLOCK = 1 << 20
+_WS = re.compile(r"[\s,]*")
+
+# =========================
+# Record readers
+# =========================
+def _iter_json_array(f, block_size=_READ_BLOCK):
+    """Yield the elements of a top-level JSON array without loading the whole document."""
+    dec = json.JSONDecoder()
+    buf = f.read(block_size).lstrip()
+    if not buf.startswith("["):
+        raise ValueError("expected a JSON array")
+    pos = 1
+    eof = False
+    while True:
+        pos = _WS.match(buf, pos).end()
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        if pos >= len(buf) and eof:
+            raise ValueError("unterminated JSON array")
+        try:
+            if pos >= len(buf):
+                raise json.JSONDecodeError("need more data", buf, pos)
+            obj, pos = dec.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            data = f.read(block_size)
+            eof = not data
+            buf = buf[pos:] + data
+            pos = 0
+            continue
+        yield obj
+
+def _iter_ndjson(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+def iter_json_records(path: Path):
+    """Yield transaction dicts from a JSON array file or an NDJSON file (detected from the first byte)."""
+    with open(path, encoding="utf-8") as f:
+        head = f.read(256).lstrip()
+        f.seek(0)
+        if head.startswith("["):
+            yield from _iter_json_array(f)
+        else:
+            yield from _iter_ndjson(f)
+
+def iter_tx_chunks(path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Yield normalized, AED-converted transaction frames of at most chunk_rows rows."""
+    fx = load_fx_history()
+    batch = []
+    for rec in iter_json_records(path):
+        batch.append(rec)
+        if len(batch) >= chunk_rows:
+            yield convert_to_aed(normalize_tx(pd.DataFrame.from_records(batch)), fx)
+            batch = []
+    if batch:
+        yield convert_to_aed(normalize_tx(pd.DataFrame.from_records(batch)), fx)
+
+# =========================
+# Incremental aggregation
+# =========================
+_FIELDS = ["inflow", "outflow", "n_flow", "count", "bounced"]
+
+class MonthlyAccumulator:
+    """Running per-month inflow/outflow/count/bounced totals plus the few debits that look like loan service."""
+
+    def __init__(self):
+        self.months = {}
+        self.n_tx = 0
+        self.unconverted = set()        # currencies left unconverted for want of an FX rate
+        self._loan_rows = []
+
+    def update(self, chunk: pd.DataFrame) -> "MonthlyAccumulator":
+        if chunk.empty:
+            return self
+        self.n_tx += len(chunk)
+        self.unconverted.update(unconverted_currencies(chunk))
+        chunk = chunk[chunk["date"].notna()]
+        amt = chunk["amount"].astype(float)
+        parts = pd.DataFrame({
+            "month": chunk["date"].dt.to_period("M").astype(str),
+            "inflow": amt.where(amt > 0, 0.0),
+            "outflow": (-amt).where(amt < 0, 0.0),
+            "n_flow": (amt.notna() & (amt != 0)).astype(int),
+            "count": 1,
+            "bounced": bounced_mask(chunk).astype(int),
+        }).groupby("month")[_FIELDS].sum()
+        for month, vals in zip(parts.index, parts.to_numpy(dtype=float)):
+            acc = self.months.get(month)
+            if acc is None:
+                self.months[month] = vals
+            else:
+                acc += vals
+
+        debits = chunk[amt < 0]
+        if not debits.empty:
+            union = (debits["description"].fillna("").astype(str) + " "
+                     + debits["counterparty"].fillna("").astype(str)).str.upper()
+            hits = debits[union.str.contains(LOAN_HINT_RE)]
+            if not hits.empty:
+                self._loan_rows.append(hits[["date", "amount", "description", "counterparty", "currency"]])
+        return self
+
+    def monthly(self) -> pd.DataFrame:
+        """Same shape as monthly_aggregates(): month, inflow, outflow, net (sorted by month)."""
+        rows = [(m, v[0], v[1]) for m, v in sorted(self.months.items()) if v[2] > 0]
+        m = pd.DataFrame(rows, columns=["month", "inflow", "outflow"])
+        m["net"] = m["inflow"] - m["outflow"]
+        return m
+
+    def bounced(self, months: int = None) -> int:
+        """Bounced transactions over all months, or over the last `months` months with cash flow."""
+        keys = [k for k in sorted(self.months) if self.months[k][2] > 0] if months else list(self.months)
+        if months:
+            keys = keys[-months:]
+        return int(sum(self.months[k][4] for k in keys))
+
+    def loan_candidates(self) -> pd.DataFrame:
+        if not self._loan_rows:
+            return pd.DataFrame(columns=["date", "amount", "description", "counterparty", "currency"])
+        return pd.concat(self._loan_rows, ignore_index=True)
+
+    def snapshot(self, months: int = 6) -> dict:
+        """Drop-in equivalent of lending_assistant.cashflow_snapshot() for the streamed data."""
+        m = self.monthly().tail(months)
+        avg_in = float(m["inflow"].mean()) if not m.empty else 0.0
+        avg_out = float(m["outflow"].mean()) if not m.empty else 0.0
+        return {
+            "monthly": m,
+            "avg_in": avg_in,
+            "avg_out": avg_out,
+            "inflow_vol": inflow_volatility(m),
+            "bounced": self.bounced(months),
+            "n_tx": self.n_tx,
+            "unconverted": sorted(self.unconverted),
+            "loans_df": detect_external_loans(self.loan_candidates()),
+        }
+
+def stream_cashflow_snapshot(path: Path, months: int = 6, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Stream one transaction file and return (snapshot, accumulator)."""
+    acc = MonthlyAccumulator()
+    for chunk in iter_tx_chunks(path, chunk_rows):
+        acc.update(chunk)
+    return acc.snapshot(months), acc
@@ -1,26 +1,28 @@
 import streamlit as st
 import pandas as pd
 
+from modules.customer_index import KeyedTable
+from modules.identity_index import load_identity_index
+from modules.nba_rules import WEALTH_RISK_RULES
+
+_advice = {}
+
+def advice_book(ident) -> KeyedTable:
+    """Risk-bucket advice for every wealth client, built once per identity index."""
+    if ident not in _advice:
+        _advice.clear()
+        clients = pd.DataFrame(ident.datasets.get("wealth", []), columns=["name", "risk"])
+        _advice[ident] = KeyedTable(WEALTH_RISK_RULES.book(clients, key="name"), key="name")
+    return _advice[ident]
+
 def run_wealth_copilot():
     st.title(" Wealth Manager Copilot")
 
-    # Realistic clients
-    clients = [
-        {"name": "Fatima Al Mansouri", "aum": 4.2, "income": 820, "risk": "Low", "risk_delta": "-1"},
-        {"name": "Omar Al Fardan", "aum": 6.8, "income": 1200, "risk": "Medium", "risk_delta": "0"},
-        {"name": "Salim Khan", "aum": 3.1, "income": 460, "risk": "High", "risk_delta": "+1"},
-        {"name": "Laila Hassan", "aum": 2.7, "income": 510, "risk": "Medium", "risk_delta": "0"},
-        {"name": "Yousef Al Qasimi", "aum": 7.5, "income": 1500, "risk": "Low", "risk_delta": "-2"},
-        {"name": "Zara Noor", "aum": 5.9, "income": 910, "risk": "Medium", "risk_delta": "+1"},
-        {"name": "Ahmed bin Zayed", "aum": 10.2, "income": 2000, "risk": "Low", "risk_delta": "-1"},
-        {"name": "Noor Al Shamsi", "aum": 3.8, "income": 640, "risk": "High", "risk_delta": "+2"},
-        {"name": "Khalid Al Mazrouei", "aum": 9.3, "income": 1300, "risk": "Low", "risk_delta": "-1"},
-        {"name": "Dana Al Suwaidi", "aum": 4.6, "income": 760, "risk": "Medium", "risk_delta": "0"}
-    ]
-
-    client_names = [c["name"] for c in clients]
+    # Realistic clients (data/wealth_clients.json)
+    ident = load_identity_index()
+    client_names = [c["name"] for c in ident.datasets.get("wealth", [])]
     selected_name = st.selectbox("Select Customer", client_names)
-    client = next(c for c in clients if c["name"] == selected_name)
+    client = ident.first("wealth", ident.resolve(selected_name))
 
     st.markdown("### 🧾 Client Overview")
     col1, col2, col3 = st.columns(3)
@@ -41,19 +43,8 @@ def run_wealth_copilot():
     st.markdown("---")
     st.markdown("### 🧮 AI Advisor Mode – Tailored by Risk Profile")
     with st.expander("💡 See AI-Powered Recommendations"):
-
-        if client["risk"] == "Low":
-            st.markdown("- Maintain diversified equity exposure, consider fixed income for stability.")
-            st.markdown("- Explore long-term retirement planning and estate structuring.")
-            st.markdown("- Review insurance cover to match luxury asset growth.")
-        elif client["risk"] == "Medium":
-            st.markdown("- Increase allocation to bonds or market-neutral strategies.")
-            st.markdown("- Revisit FX exposure across remittance and investment flows.")
-            st.markdown("- Recommend partial hedging against rate volatility.")
-        elif client["risk"] == "High":
-            st.markdown("- Reduce exposure to volatile instruments (crypto, small caps).")
-            st.markdown("- Recommend immediate portfolio rebalancing.")
-            st.markdown("- Suggest automated alerts and RM check-ins every 2 weeks.")
+        for advice in advice_book(ident).rows(client["name"])["Recommendation"]:
+            st.markdown(f"- {advice}")
 
     st.markdown("---")
     st.markdown("### 📈 Portfolio Allocation (Mock)")